@@ -1,27 +1,53 @@
 from __future__ import annotations
 
 import os
+import re
 import subprocess
 import sys
+from functools import cache, lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-from rich.console import Console
-from rich.markup import escape as rich_escape
 
-from .commit_check import check_commit_message
 from .commit_template import CommitType, build_commit_message, run_interactive_qa
-from .config import DEFAULT_INCLUDE_EXTENSIONS, DEFAULT_MAX_CONTEXT_LINES, DEFAULT_MAX_DIFF_LINES, Config
+from .config import (
+    _DEFAULT_CACHE_DIR,
+    DEFAULT_INCLUDE_EXTENSIONS,
+    DEFAULT_MAX_CONTEXT_LINES,
+    DEFAULT_MAX_DIFF_LINES,
+    DEFAULT_MIN_REVIEW_LINES,
+    Config,
+)
 from .exceptions import ProviderError, ProviderNotConfiguredError
-from .formatters import format_json, format_markdown, format_terminal
-from .git import GitError, get_commit_file_contents, get_push_diff, get_staged_diff, get_staged_file_contents
-from .llm.base import LLMProvider
-from .llm.enterprise import EnterpriseProvider
-from .llm.ollama import OllamaProvider
-from .llm.openai import OpenAIProvider
-from .reviewer import Reviewer
+from .git import GitError, _run_git, get_commit_file_contents, get_push_diff, get_staged_diff, get_staged_file_contents
 
-console = Console()
+if TYPE_CHECKING:
+    from .llm.base import LLMProvider
+    from .reviewer import Reviewer
+
+# Provider SDKs (openai in particular), the reviewer and the formatters are
+# imported at their call sites: hooks that exit early never pay for them.
+# Status output goes through click, so rich is only loaded by the terminal formatter.
+
+
+# click.style() keyword sets for whole-line messages printed via _echo(). click
+# strips the ANSI codes itself when stdout is not a terminal.
+_BOLD_RED = {"fg": "red", "bold": True}
+_BOLD_YELLOW = {"fg": "yellow", "bold": True}
+_YELLOW = {"fg": "yellow"}
+_GREEN = {"fg": "green"}
+_DIM = {"dim": True}
+_BOLD = {"bold": True}
+
+
+def _echo(text: str, style: dict | None = None) -> None:
+    click.echo(click.style(text, **style) if style else text)
+
+
+def _echo_labeled(label: str, label_style: dict, text: str) -> None:
+    """Print a styled label followed by plain user text."""
+    click.echo(click.style(label, **label_style) + text)
 
 
 def _extract_modified_files(diff: str) -> list[str]:
@@ -35,6 +61,113 @@ def _extract_modified_files(diff: str) -> list[str]:
     return files
 
 
+# Changed lines starting with these are comments. A bare "#" prefix is left out on
+# purpose: in C/C++ it is a preprocessor directive, not a comment.
+_COMMENT_PREFIXES = ("//", "# ")
+_COMMENT_ONLY = frozenset({"#", "*"})
+
+# Block comment lines; code may follow the closing "*/" ("/* fix */ do_thing();").
+_BLOCK_COMMENT_PREFIXES = ("/*", "*/", "* ")
+
+# "# define X 1" is still a directive: "# " only marks a comment when no
+# preprocessor keyword follows it.
+_PREPROCESSOR = re.compile(r"#\s*(?:include|define|undef|ifn?def|if|elif|else|endif|pragma|error|warning|line)\b")
+
+
+def _is_trivial_diff(diff: str, min_lines: int) -> bool:
+    """Return True when the diff adds fewer than ``min_lines`` lines and every
+    added/removed line is blank or a comment, so an LLM review is not worth it.
+
+    A diff without any changed lines (e.g. a pure mode change) is not trivial:
+    there is nothing to judge it by, so it goes through the normal review.
+    """
+    added = changed = 0
+    in_hunk = False
+    for line in diff.splitlines():
+        if line.startswith("@@"):
+            in_hunk = True
+            continue
+        if line.startswith("diff --git "):
+            in_hunk = False
+            continue
+        if not line.startswith(("+", "-")):
+            continue
+        # Outside a hunk "---"/"+++" are the file headers; inside one they are
+        # changed lines that happen to start with "--"/"++" (e.g. "++i;").
+        if not in_hunk and line.startswith(("+++", "---")):
+            continue
+        changed += 1
+        if line[0] == "+":
+            added += 1
+            if added >= min_lines:
+                return False
+        body = line[1:].strip()
+        if body and not _is_comment(body):
+            return False
+    return changed > 0
+
+
+def _is_comment(body: str) -> bool:
+    """Whether a stripped, non-empty changed line holds nothing but a comment."""
+    if body in _COMMENT_ONLY:
+        return True
+    if body.startswith(_BLOCK_COMMENT_PREFIXES):
+        end = body.find("*/", 2 if body.startswith("/*") else 0)
+        return end == -1 or not body[end + 2:].strip()
+    return body.startswith(_COMMENT_PREFIXES) and not _PREPROCESSOR.match(body)
+
+
+def _truncate_lines(text: str, max_lines: int) -> tuple[str, int, bool]:
+    """Keep the first ``max_lines`` lines of ``text`` without splitting it into a list.
+
+    Returns the (possibly truncated) text, the original line count and whether
+    truncation happened.
+    """
+    if max_lines <= 0:
+        return "", text.count("\n") + 1, True
+    pos = -1
+    for found in range(max_lines):
+        pos = text.find("\n", pos + 1)
+        if pos == -1:
+            return text, found + 1, False
+    return text[:pos], text.count("\n", pos) + max_lines, True
+
+
+def _cap_file_diffs(config: Config, diff: str) -> str:
+    """Apply the optional ``review.max_file_lines`` per-file cap to ``diff``."""
+    max_file_raw = config.get("review", "max_file_lines")
+    if not max_file_raw:
+        return diff
+    from .reviewer import cap_file_diffs
+
+    return cap_file_diffs(diff, max(1, int(max_file_raw)))
+
+
+def _get_config() -> Config:
+    """Return this invocation's Config, loading it on first use.
+
+    The instance lives on the root context's ``obj`` so every command of one
+    ``ai-review`` run shares a single parse of the config file.
+    """
+    ctx = click.get_current_context(silent=True)
+    obj = ctx.find_root().obj if ctx is not None else None
+    if not isinstance(obj, dict):
+        return Config()
+    config = obj.get("config")
+    if config is None:
+        config = obj["config"] = Config()
+    return config
+
+
+def _provider_limits(config: Config, provider_name: str) -> dict[str, int]:
+    """Read the per-provider output-token and retry bounds, falling back to defaults."""
+    from .llm.base import DEFAULT_MAX_OUTPUT_TOKENS, DEFAULT_MAX_RETRIES
+
+    max_output_tokens = int(config.get(provider_name, "max_output_tokens") or DEFAULT_MAX_OUTPUT_TOKENS)
+    max_retries = int(config.get(provider_name, "max_retries") or DEFAULT_MAX_RETRIES)
+    return {"max_output_tokens": max(1, max_output_tokens), "max_retries": max(0, max_retries)}
+
+
 def _build_provider(config: Config, cli_provider: str | None, cli_model: str | None) -> LLMProvider:
     provider_name = config.resolve_provider(cli_provider)
     if not provider_name:
@@ -44,12 +177,21 @@ def _build_provider(config: Config, cli_provider: str | None, cli_model: str | N
         )
 
     if provider_name == "ollama":
+        from .llm.http import shared_http_client
+        from .llm.ollama import OllamaProvider
+
         base_url = config.get("ollama", "base_url") or "http://localhost:11434"
         model = cli_model or config.get("ollama", "model") or "codellama"
         timeout = float(config.get("ollama", "timeout") or 120)
-        return OllamaProvider(base_url=base_url, model=model, timeout=timeout)
+        return OllamaProvider(
+            base_url=base_url, model=model, timeout=timeout, client=shared_http_client(),
+            **_provider_limits(config, "ollama"),
+        )
 
     elif provider_name == "openai":
+        from .llm.http import shared_http_client
+        from .llm.openai import OpenAIProvider
+
         token = config.resolve_token("openai")
         if not token:
             env_var = config.get("openai", "api_key_env") or "OPENAI_API_KEY"
@@ -60,9 +202,15 @@ def _build_provider(config: Config, cli_provider: str | None, cli_model: str | N
         model = cli_model or config.get("openai", "model") or "gpt-4o"
         base_url = config.get("openai", "base_url")
         timeout = float(config.get("openai", "timeout") or 120)
-        return OpenAIProvider(api_key=token, model=model, base_url=base_url, timeout=timeout)
+        return OpenAIProvider(
+            api_key=token, model=model, base_url=base_url, timeout=timeout, http_client=shared_http_client(),
+            **_provider_limits(config, "openai"),
+        )
 
     elif provider_name == "enterprise":
+        from .llm.enterprise import EnterpriseProvider
+        from .llm.http import shared_http_client
+
         token = config.resolve_token("enterprise") or ""
         base_url = config.get("enterprise", "base_url")
         if not base_url:
@@ -77,25 +225,61 @@ def _build_provider(config: Config, cli_provider: str | None, cli_model: str | N
         return EnterpriseProvider(
             base_url=base_url, api_path=api_path, model=model,
             auth_type=auth_type, auth_token=token, timeout=timeout,
+            client=shared_http_client(), **_provider_limits(config, "enterprise"),
         )
 
     raise ProviderNotConfiguredError(f"Unknown provider: {provider_name}")
 
 
+# Cached review results and improved commit messages (see reviewer.ReviewCache).
+_REVIEW_CACHE_DIR = _DEFAULT_CACHE_DIR / "reviews"
+
+
+def _prewarm(provider: LLMProvider) -> None:
+    """Start connecting to the provider in the background while local git work continues."""
+    import threading
+
+    threading.Thread(target=provider.prewarm, daemon=True).start()
+
+
+def _review_cache_enabled() -> bool:
+    """False under ``--no-cache`` or AI_REVIEW_NO_CACHE=1."""
+    ctx = click.get_current_context(silent=True)
+    obj = ctx.find_root().obj if ctx is not None else None
+    if isinstance(obj, dict) and obj.get("no_cache"):
+        return False
+    return os.environ.get("AI_REVIEW_NO_CACHE") != "1"
+
+
+def _reviewer(provider: LLMProvider) -> Reviewer:
+    """Build a Reviewer whose answers are cached on disk unless caching is turned off."""
+    from .reviewer import Reviewer, ReviewCache
+
+    cache = None
+    if _review_cache_enabled():
+        cache = ReviewCache(_REVIEW_CACHE_DIR, namespace=provider.cache_namespace)
+    return Reviewer(provider=provider, cache=cache)
+
+
 @click.group(invoke_without_command=True)
 @click.option("--provider", "cli_provider", default=None, help="LLM provider (ollama/openai/enterprise)")
 @click.option("--model", "cli_model", default=None, help="Model name")
 @click.option("--format", "output_format", default="terminal", type=click.Choice(["terminal", "markdown", "json"]))
 @click.option("--verbose", "-v", is_flag=True, help="Enable debug logging.")
 @click.option("--graceful", is_flag=True, help="Don't block on LLM failures (exit 0 instead of 1).")
+@click.option("--no-cache", is_flag=True, help="Always ask the LLM; don't read or write cached reviews.")
 @click.pass_context
-def main(ctx: click.Context, cli_provider: str | None, cli_model: str | None, output_format: str, verbose: bool, graceful: bool) -> None:
+def main(
+    ctx: click.Context, cli_provider: str | None, cli_model: str | None, output_format: str,
+    verbose: bool, graceful: bool, no_cache: bool,
+) -> None:
     """AI-powered code review for Android BSP teams."""
     ctx.ensure_object(dict)
     ctx.obj["cli_provider"] = cli_provider
     ctx.obj["cli_model"] = cli_model
     ctx.obj["output_format"] = output_format
     ctx.obj["graceful"] = graceful
+    ctx.obj["no_cache"] = no_cache
 
     if verbose:
         import logging
@@ -106,82 +290,220 @@ def main(ctx: click.Context, cli_provider: str | None, cli_model: str | None, ou
         _review(ctx)
 
 
+# Written by the pre-commit review, read back by check-commit in the commit-msg
+# hook of the same commit. Keyed by the index tree, so any restage invalidates it,
+# and by the extension filter and line limit the diff was read with, so a reader
+# asking for a different slice of the index misses. Only written when our
+# commit-msg hook is installed to consume it.
+_DIFF_CACHE_NAME = "ai-review-diff.cache"
+
+
+def _in_commit_hook() -> bool:
+    # git exports GIT_INDEX_FILE to the pre-commit and commit-msg hooks.
+    return "GIT_INDEX_FILE" in os.environ
+
+
+def _commit_msg_hook_installed() -> bool:
+    """Whether the commit-msg hook git will run (honouring core.hooksPath) is ours."""
+    try:
+        hook = Path(_run_git("rev-parse", "--git-path", "hooks/commit-msg").strip())
+        return b"ai-review" in hook.read_bytes()
+    except (GitError, OSError):
+        return False
+
+
+def _diff_cache_key(tree: str, extensions: list[str] | None, max_lines: int | None) -> str:
+    exts = ",".join(extensions) if extensions else ""
+    return f"{tree} {exts} {'' if max_lines is None else max_lines}"
+
+
+def _save_staged_diff(diff: str, extensions: list[str] | None = None, max_lines: int | None = None) -> None:
+    """Save ``diff`` as read with ``extensions``; pass ``max_lines`` only if it was cut short."""
+    if not _in_commit_hook() or not _commit_msg_hook_installed():
+        return
+    try:
+        key = _diff_cache_key(_run_git("write-tree").strip(), extensions, max_lines)
+        (Path(_git_dir()) / _DIFF_CACHE_NAME).write_text(f"{key}\n{diff}")
+    except (GitError, OSError):
+        pass
+
+
+def _load_staged_diff(extensions: list[str] | None = None, max_lines: int | None = None) -> str | None:
+    """Return the saved staged diff if it matches the index and the requested slice.
+
+    The cache file is single-use: it is deleted once read, hit or miss.
+    """
+    if not _in_commit_hook():
+        return None
+    try:
+        path = Path(_git_dir()) / _DIFF_CACHE_NAME
+        try:
+            with path.open() as f:
+                key = f.readline().rstrip("\n")
+                if key != _diff_cache_key(_run_git("write-tree").strip(), extensions, max_lines):
+                    return None
+                return f.read()
+        finally:
+            path.unlink(missing_ok=True)
+    except (GitError, OSError):
+        return None
+
+
+def _include_extensions(config: Config) -> list[str] | None:
+    """Return the ``review.include_extensions`` filter, or None to take every file."""
+    ext_raw = config.get("review", "include_extensions")
+    if ext_raw is None:
+        ext_raw = DEFAULT_INCLUDE_EXTENSIONS
+    return [e.strip() for e in ext_raw.split(",") if e.strip()] if ext_raw else None
+
+
+def _write_report(result, output_format: str) -> None:
+    """Write the review report to stdout in ``output_format``."""
+    from .formatters import WRITERS, write_json, write_terminal_plain
+
+    writer = WRITERS[output_format]
+    if writer is WRITERS["terminal"] and not sys.stdout.isatty():
+        writer = write_terminal_plain  # Piped (e.g. CI): skip Rich entirely
+    elif writer is write_json and sys.stdout.isatty():
+        write_json(result, sys.stdout, indent=2)  # Compact JSON is for tools, not people
+        return
+    writer(result, sys.stdout)
+
+
 def _review(ctx: click.Context) -> None:
-    config = Config()
+    config = _get_config()
     deprecation = config.check_deprecated_keys()
     if deprecation:
-        console.print(f"[yellow]{rich_escape(deprecation)}[/]")
+        _echo(deprecation, _YELLOW)
     cli_provider = ctx.obj["cli_provider"]
     cli_model = ctx.obj["cli_model"]
     output_format = ctx.obj["output_format"]
     graceful = ctx.obj.get("graceful", False)
 
-    ext_raw = config.get("review", "include_extensions")
-    if ext_raw is None:
-        ext_raw = DEFAULT_INCLUDE_EXTENSIONS
-    extensions = [e.strip() for e in ext_raw.split(",") if e.strip()] if ext_raw else None
+    extensions = _include_extensions(config)
 
+    max_lines_raw = config.get("review", "max_diff_lines")
+    max_lines = int(max_lines_raw) if max_lines_raw else DEFAULT_MAX_DIFF_LINES
+
+    # Only max_lines + 1 lines are read from git; the rest of a large diff is never loaded.
     try:
-        diff = get_staged_diff(extensions=extensions)
+        diff = get_staged_diff(extensions=extensions, max_lines=max_lines)
     except GitError as e:
-        console.print(f"[bold red]{rich_escape(str(e))}[/]")
+        _echo(str(e), _BOLD_RED)
         sys.exit(1)
 
     if not diff:
         if extensions:
-            console.print(f"[dim]No staged changes matching {rich_escape(', '.join(f'.{e}' for e in extensions))}.[/]")
+            _echo(f"No staged changes matching {', '.join(f'.{e}' for e in extensions)}.", _DIM)
         else:
-            console.print("[dim]No staged changes to review.[/]")
+            _echo("No staged changes to review.", _DIM)
         return
 
     # Truncate large diffs
-    max_lines_raw = config.get("review", "max_diff_lines")
-    max_lines = int(max_lines_raw) if max_lines_raw else DEFAULT_MAX_DIFF_LINES
-    lines = diff.split("\n")
-    if len(lines) > max_lines:
-        console.print(f"[yellow]Warning: diff truncated to {max_lines} lines (original: {len(lines)} lines)[/]")
-        diff = "\n".join(lines[:max_lines]) + f"\n... (truncated: showing first {max_lines} of {len(lines)} lines)"
+    diff, _, truncated = _truncate_lines(diff, max_lines)
+    _save_staged_diff(diff, extensions, max_lines if truncated else None)
+    if truncated:
+        _echo(f"Warning: diff truncated to {max_lines} lines", _YELLOW)
+        diff += f"\n... (truncated: showing first {max_lines} lines)"
+    if not truncated:
+        min_lines_raw = config.get("review", "min_lines")
+        min_lines = int(min_lines_raw) if min_lines_raw else DEFAULT_MIN_REVIEW_LINES
+        if _is_trivial_diff(diff, min_lines):
+            _echo("Trivial diff, skipping AI review.", _DIM)
+            return
+    diff = _cap_file_diffs(config, diff)
 
     custom_rules = config.get("review", "custom_rules")
 
     max_context_raw = config.get("review", "max_context_lines")
     max_context = int(max_context_raw) if max_context_raw else DEFAULT_MAX_CONTEXT_LINES
-    file_contents: dict[str, str] = {}
-    try:
-        file_contents = get_staged_file_contents(extensions=extensions, max_lines=max_context)
-    except GitError:
-        pass
-
     try:
         provider = _build_provider(config, cli_provider, cli_model)
     except ProviderNotConfiguredError as e:
-        console.print(f"[bold red]{rich_escape(str(e))}[/]")
+        _echo(str(e), _BOLD_RED)
         sys.exit(1)
     except ProviderError as e:
         if graceful:
-            console.print(f"[yellow]Warning: LLM provider error: {rich_escape(str(e))}[/]")
+            _echo(f"Warning: LLM provider error: {e}", _YELLOW)
             return
-        console.print(f"[bold red]{rich_escape(str(e))}[/]")
+        _echo(str(e), _BOLD_RED)
         sys.exit(1)
+    reviewer = _reviewer(provider)
+    # The cache lookup is keyed on the file context read below, and a hit sends no
+    # request at all; only warm the connection up front when the cache is off.
+    if not _review_cache_enabled():
+        _prewarm(provider)
 
-    reviewer = Reviewer(provider=provider)
+    file_contents: dict[str, str] = {}
     try:
-        result = reviewer.review_diff(diff, custom_rules=custom_rules, file_contents=file_contents)
-    except ProviderError as e:
-        if graceful:
-            console.print(f"[yellow]Warning: LLM provider error: {rich_escape(str(e))}[/]")
-            return
-        console.print(f"[bold red]{rich_escape(str(e))}[/]")
-        sys.exit(1)
+        file_contents = get_staged_file_contents(extensions=extensions, max_lines=max_context)
+    except GitError:
+        pass
 
-    formatters = {"terminal": format_terminal, "markdown": format_markdown, "json": format_json}
-    output = formatters[output_format](result)
-    click.echo(output)
+    result = reviewer.cached_review(diff, custom_rules=custom_rules, file_contents=file_contents)
+    if result is None:
+        try:
+            result = reviewer.review_diff(diff, custom_rules=custom_rules, file_contents=file_contents)
+        except ProviderError as e:
+            if graceful:
+                _echo(f"Warning: LLM provider error: {e}", _YELLOW)
+                return
+            _echo(str(e), _BOLD_RED)
+            sys.exit(1)
+
+    _write_report(result, output_format)
 
     if result.is_blocked:
         sys.exit(1)
 
 
+# GIT_REFLOG_ACTION prefixes for commits that re-use an existing message. A plain
+# ``git commit --amend`` does not set the variable, so amends are not detected here.
+_REPLAYED_COMMIT_ACTIONS = ("rebase", "cherry-pick")
+
+
+# Read once at import: every ai-review run is its own process, so the value cannot
+# change underneath a command. Tests patch this constant rather than the env.
+_AUTO_ACCEPT_ENV = os.environ.get("AI_REVIEW_AUTO_ACCEPT") == "1"
+
+# git's commit.verbose marker, after the comment character: everything below it
+# is the diff, not the message.
+_SCISSORS = " ------------------------ >8 ------------------------"
+
+
+def _comment_char() -> str:
+    """Return ``core.commentChar``, or ``#`` when it is unset or ``auto``."""
+    try:
+        char = _run_git("config", "core.commentChar").strip()
+    except GitError:
+        return "#"
+    return char if char and char != "auto" else "#"
+
+
+def _read_commit_msg(path: Path) -> str:
+    """Read a commit message file the way git will clean it up.
+
+    The commit-msg hook sees the raw file, comment lines and (with
+    ``commit.verbose``) the full diff included; reading stops at the scissors
+    line so that diff is never loaded.
+    """
+    comment = _comment_char()
+    scissors = comment + _SCISSORS
+    lines = []
+    with path.open(encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith(scissors):
+                break
+            if not line.startswith(comment):
+                lines.append(line)
+    return "".join(lines).strip()
+
+
+def _write_commit_msg(path: str | Path, text: str) -> None:
+    """Replace the commit message file's contents with ``text``."""
+    Path(path).write_text(text)
+
+
 @main.command("check-commit")
 @click.argument("message_file", required=False)
 @click.option("--auto-accept", is_flag=True, help="Auto-accept AI suggestion without prompt.")
@@ -190,57 +512,71 @@ def check_commit(ctx: click.Context, message_file: str | None, auto_accept: bool
     """Check commit message format and optionally improve with AI."""
     if message_file:
         msg_path = Path(message_file)
-        message = msg_path.read_text().strip()
+        message = _read_commit_msg(msg_path)
     else:
         message = click.get_text_stream("stdin").readline().strip()
         msg_path = None
 
     # Step 1: Format check
+    from .commit_check import check_commit_message
+
     result = check_commit_message(message)
     if not result.valid:
-        console.print(f"[bold red]{rich_escape(result.error)}[/]")
+        _echo(result.error, _BOLD_RED)
         sys.exit(1)
-    console.print("[green]Commit message format OK.[/]")
+    _echo("Commit message format OK.", _GREEN)
 
     # Step 2: AI improvement (only when we have a file to update and a provider)
     if msg_path is None:
         return
 
+    # Rebases and cherry-picks replay a message that already passed this hook: skip the LLM round-trip.
+    if os.environ.get("GIT_REFLOG_ACTION", "").startswith(_REPLAYED_COMMIT_ACTIONS):
+        return
+
+    cli_provider = ctx.obj.get("cli_provider") if ctx.obj else None
+    cli_model = ctx.obj.get("cli_model") if ctx.obj else None
+    # Format-only setups (no provider anywhere) never load the config.
+    if not cli_provider and not Config.fast_provider_configured():
+        return
+
     try:
-        config = Config()
-        cli_provider = ctx.obj.get("cli_provider") if ctx.obj else None
-        cli_model = ctx.obj.get("cli_model") if ctx.obj else None
+        config = _get_config()
         provider = _build_provider(config, cli_provider, cli_model)
     except ProviderNotConfiguredError:
         # No provider configured — skip AI improvement silently
         return
 
-    try:
-        diff = get_staged_diff()
-    except GitError:
-        diff = ""
+    # The same slice of the index the pre-commit review read, so its saved copy is reused.
+    extensions = _include_extensions(config)
+    diff = _load_staged_diff(extensions)
+    if diff is None:
+        try:
+            diff = get_staged_diff(extensions=extensions)
+        except GitError:
+            diff = ""
 
     if not diff:
         return
 
     graceful = ctx.obj.get("graceful", False) if ctx.obj else False
 
-    reviewer = Reviewer(provider=provider)
+    reviewer = _reviewer(provider)
     try:
         improved = reviewer.improve_commit_message(message, diff)
     except ProviderError as e:
         if graceful:
-            console.print(f"[yellow]Warning: LLM provider error: {rich_escape(str(e))}[/]")
+            _echo(f"Warning: LLM provider error: {e}", _YELLOW)
         else:
-            console.print(f"[bold red]{rich_escape(str(e))}[/]")
+            _echo(str(e), _BOLD_RED)
         return
 
     if improved and improved.strip() != message:
-        console.print(f"\n[dim]Original:[/]  {rich_escape(message)}")
-        console.print(f"[bold]Suggested:[/] {rich_escape(improved)}")
-        if auto_accept or os.environ.get("AI_REVIEW_AUTO_ACCEPT") == "1":
+        _echo_labeled("\nOriginal:  ", _DIM, message)
+        _echo_labeled("Suggested: ", _BOLD, improved)
+        if auto_accept or _AUTO_ACCEPT_ENV:
             choice = "a"
-            console.print("[dim](non-interactive: auto-accept)[/]")
+            _echo("(non-interactive: auto-accept)", _DIM)
         else:
             choice = click.prompt(
                 "[A]ccept / [E]dit / [S]kip",
@@ -248,13 +584,13 @@ def check_commit(ctx: click.Context, message_file: str | None, auto_accept: bool
                 default="a",
             )
         if choice == "a":
-            msg_path.write_text(improved + "\n")
-            console.print("[green]Commit message updated.[/]")
+            _write_commit_msg(msg_path, improved + "\n")
+            _echo("Commit message updated.", _GREEN)
         elif choice == "e":
             edited = click.edit(improved)
             if edited:
-                msg_path.write_text(edited)
-                console.print("[green]Commit message updated.[/]")
+                _write_commit_msg(msg_path, edited)
+                _echo("Commit message updated.", _GREEN)
         # "s" → do nothing, keep original
 
 
@@ -270,15 +606,12 @@ def generate_commit_msg_cmd(ctx: click.Context, message_file: str, source: str,
         return
 
     graceful = ctx.obj.get("graceful", False) if ctx.obj else False
-    config = Config()
+    config = _get_config()
     deprecation = config.check_deprecated_keys()
     if deprecation:
-        console.print(f"[yellow]{rich_escape(deprecation)}[/]")
+        _echo(deprecation, _YELLOW)
 
-    ext_raw = config.get("review", "include_extensions")
-    if ext_raw is None:
-        ext_raw = DEFAULT_INCLUDE_EXTENSIONS
-    extensions = [e.strip() for e in ext_raw.split(",") if e.strip()] if ext_raw else None
+    extensions = _include_extensions(config)
 
     try:
         diff = get_staged_diff(extensions=extensions)
@@ -290,7 +623,7 @@ def generate_commit_msg_cmd(ctx: click.Context, message_file: str, source: str,
     modified_files = _extract_modified_files(diff)
 
     # Auto-accept mode skips Q&A
-    auto_accept = os.environ.get("AI_REVIEW_AUTO_ACCEPT") == "1"
+    auto_accept = _AUTO_ACCEPT_ENV
 
     # Interactive Q&A if TTY available and not auto-accept
     if sys.stdin.isatty() and not auto_accept:
@@ -308,6 +641,8 @@ def generate_commit_msg_cmd(ctx: click.Context, message_file: str, source: str,
             return
 
         # Optional: AI polishing
+        from .reviewer import Reviewer
+
         try:
             cli_provider = ctx.obj.get("cli_provider") if ctx.obj else None
             cli_model = ctx.obj.get("cli_model") if ctx.obj else None
@@ -327,13 +662,13 @@ def generate_commit_msg_cmd(ctx: click.Context, message_file: str, source: str,
                             fields["description"] = line[len("DESCRIPTION:"):].strip()
         except (ProviderNotConfiguredError, ProviderError) as e:
             if graceful:
-                console.print(f"[yellow]Warning: AI polish skipped — {rich_escape(str(e))}[/]")
+                _echo(f"Warning: AI polish skipped — {e}", _YELLOW)
 
         message = build_commit_message(**fields)
 
-        console.print(f"\n[dim]---[/]")
-        console.print(message)
-        console.print(f"[dim]---[/]\n")
+        _echo("\n---", _DIM)
+        _echo(message)
+        _echo("---\n", _DIM)
 
         choice = click.prompt(
             "[A]ccept / [E]dit / [S]kip",
@@ -341,13 +676,13 @@ def generate_commit_msg_cmd(ctx: click.Context, message_file: str, source: str,
             default="a",
         )
         if choice == "a":
-            Path(message_file).write_text(message + "\n")
-            console.print("[green]Commit message written.[/]")
+            _write_commit_msg(message_file, message + "\n")
+            _echo("Commit message written.", _GREEN)
         elif choice == "e":
             edited = click.edit(message)
             if edited:
-                Path(message_file).write_text(edited)
-                console.print("[green]Commit message written.[/]")
+                _write_commit_msg(message_file, edited)
+                _echo("Commit message written.", _GREEN)
         return
 
     # Non-TTY fallback: auto-generate (old behavior)
@@ -357,15 +692,17 @@ def generate_commit_msg_cmd(ctx: click.Context, message_file: str, source: str,
         provider = _build_provider(config, cli_provider, cli_model)
     except (ProviderNotConfiguredError, ProviderError) as e:
         if graceful:
-            console.print(f"[yellow]Warning: Cannot generate commit message — {rich_escape(str(e))}[/]")
+            _echo(f"Warning: Cannot generate commit message — {e}", _YELLOW)
         return
 
+    from .reviewer import Reviewer
+
     reviewer = Reviewer(provider=provider)
     try:
         description = reviewer.generate_commit_message(diff)
     except ProviderError as e:
         if graceful:
-            console.print(f"[yellow]Warning: Commit message generation failed — {rich_escape(str(e))}[/]")
+            _echo(f"Warning: Commit message generation failed — {e}", _YELLOW)
         return
 
     if not description:
@@ -377,8 +714,8 @@ def generate_commit_msg_cmd(ctx: click.Context, message_file: str, source: str,
     else:
         message = description
 
-    Path(message_file).write_text(message + "\n")
-    console.print(f"[green]Generated: {rich_escape(message)}[/]")
+    _write_commit_msg(message_file, message + "\n")
+    _echo(f"Generated: {message}", _GREEN)
 
 
 @main.command("pre-push")
@@ -392,19 +729,23 @@ def pre_push_cmd(ctx: click.Context) -> None:
     if not stdin_data:
         return
 
-    config = Config()
+    config = _get_config()
     cli_provider = ctx.obj.get("cli_provider") if ctx.obj else None
     cli_model = ctx.obj.get("cli_model") if ctx.obj else None
 
-    ext_raw = config.get("review", "include_extensions")
-    if ext_raw is None:
-        ext_raw = DEFAULT_INCLUDE_EXTENSIONS
-    extensions = [e.strip() for e in ext_raw.split(",") if e.strip()] if ext_raw else None
+    extensions = _include_extensions(config)
 
-    # Collect diffs from all refs being pushed
+    max_lines_raw = config.get("review", "max_diff_lines")
+    max_lines = int(max_lines_raw) if max_lines_raw else DEFAULT_MAX_DIFF_LINES
+
+    # Collect diffs from all refs being pushed. Each ref only reads what is left of
+    # the max_lines budget (plus one line to detect truncation) from git.
     all_diff_parts = []
+    budget = max_lines
     last_local_sha: str | None = None
     for line in stdin_data.split("\n"):
+        if budget < 0:
+            break
         line = line.strip()
         if not line:
             continue
@@ -413,9 +754,10 @@ def pre_push_cmd(ctx: click.Context) -> None:
             continue
         local_ref, local_sha, remote_ref, remote_sha = parts[:4]
         try:
-            diff = get_push_diff(local_sha, remote_sha, extensions=extensions)
+            diff = get_push_diff(local_sha, remote_sha, extensions=extensions, max_lines=budget)
             if diff:
                 all_diff_parts.append(diff)
+                budget -= diff.count("\n") + 1
                 if local_sha and local_sha != "0" * 40:
                     last_local_sha = local_sha
         except GitError:
@@ -423,51 +765,53 @@ def pre_push_cmd(ctx: click.Context) -> None:
 
     all_diff = "\n".join(all_diff_parts)
     if not all_diff:
-        console.print("[dim]No changes to review in push.[/]")
+        _echo("No changes to review in push.", _DIM)
         return
 
     # Truncate large diffs
-    max_lines_raw = config.get("review", "max_diff_lines")
-    max_lines = int(max_lines_raw) if max_lines_raw else DEFAULT_MAX_DIFF_LINES
-    lines = all_diff.split("\n")
-    if len(lines) > max_lines:
-        console.print(f"[yellow]Warning: diff truncated to {max_lines} lines (original: {len(lines)} lines)[/]")
-        all_diff = "\n".join(lines[:max_lines]) + f"\n... (truncated: showing first {max_lines} of {len(lines)} lines)"
+    all_diff, _, truncated = _truncate_lines(all_diff, max_lines)
+    if truncated:
+        _echo(f"Warning: diff truncated to {max_lines} lines", _YELLOW)
+        all_diff += f"\n... (truncated: showing first {max_lines} lines)"
+    all_diff = _cap_file_diffs(config, all_diff)
 
     custom_rules = config.get("review", "custom_rules")
 
     max_context_raw = config.get("review", "max_context_lines")
     max_context = int(max_context_raw) if max_context_raw else DEFAULT_MAX_CONTEXT_LINES
-    file_contents: dict[str, str] = {}
-    if last_local_sha:
-        try:
-            file_contents = get_commit_file_contents(last_local_sha, extensions=extensions, max_lines=max_context)
-        except GitError:
-            pass
-
     try:
         provider = _build_provider(config, cli_provider, cli_model)
     except (ProviderNotConfiguredError, ProviderError) as e:
         if graceful:
-            console.print(f"[yellow]Warning: AI review unavailable — {rich_escape(str(e))}[/]")
+            _echo(f"Warning: AI review unavailable — {e}", _YELLOW)
             return
-        console.print(f"[bold red]{rich_escape(str(e))}[/]")
+        _echo(str(e), _BOLD_RED)
         sys.exit(1)
+    reviewer = _reviewer(provider)
+    # As in the pre-commit review: a cache hit sends no request, so only warm up without one.
+    if not _review_cache_enabled():
+        _prewarm(provider)
 
-    reviewer = Reviewer(provider=provider)
-    try:
-        result = reviewer.review_diff(all_diff, custom_rules=custom_rules, file_contents=file_contents)
-    except ProviderError as e:
-        if graceful:
-            console.print(f"[yellow]Warning: AI review failed — {rich_escape(str(e))}[/]")
-            return
-        console.print(f"[bold red]{rich_escape(str(e))}[/]")
-        sys.exit(1)
+    file_contents: dict[str, str] = {}
+    if last_local_sha:
+        try:
+            file_contents = get_commit_file_contents(last_local_sha, extensions=extensions, max_lines=max_context)
+        except GitError:
+            pass
+
+    result = reviewer.cached_review(all_diff, custom_rules=custom_rules, file_contents=file_contents)
+    if result is None:
+        try:
+            result = reviewer.review_diff(all_diff, custom_rules=custom_rules, file_contents=file_contents)
+        except ProviderError as e:
+            if graceful:
+                _echo(f"Warning: AI review failed — {e}", _YELLOW)
+                return
+            _echo(str(e), _BOLD_RED)
+            sys.exit(1)
 
     output_format = ctx.obj.get("output_format", "terminal") if ctx.obj else "terminal"
-    formatters = {"terminal": format_terminal, "markdown": format_markdown, "json": format_json}
-    output = formatters[output_format](result)
-    click.echo(output)
+    _write_report(result, output_format)
 
     if result.is_blocked:
         sys.exit(1)
@@ -477,25 +821,25 @@ def pre_push_cmd(ctx: click.Context) -> None:
 @click.pass_context
 def health_check_cmd(ctx: click.Context) -> None:
     """Check LLM provider connectivity."""
-    config = Config()
+    config = _get_config()
     cli_provider = ctx.obj.get("cli_provider") if ctx.obj else None
     cli_model = ctx.obj.get("cli_model") if ctx.obj else None
 
     try:
         provider = _build_provider(config, cli_provider, cli_model)
     except ProviderNotConfiguredError as e:
-        console.print(f"[bold red]{rich_escape(str(e))}[/]")
+        _echo(str(e), _BOLD_RED)
         sys.exit(1)
 
     provider_name = config.resolve_provider(cli_provider)
     model = cli_model or config.get(provider_name, "model") or "default"
-    console.print(f"Provider: {rich_escape(provider_name)} ({rich_escape(model)})")
+    _echo(f"Provider: {provider_name} ({model})")
 
     ok, msg = provider.health_check()
     if ok:
-        console.print(f"[green]Status: OK ({rich_escape(msg)})[/]")
+        _echo(f"Status: OK ({msg})", _GREEN)
     else:
-        console.print(f"[bold red]Status: FAILED — {rich_escape(msg)}[/]")
+        _echo(f"Status: FAILED — {msg}", _BOLD_RED)
         sys.exit(1)
 
 
@@ -511,9 +855,9 @@ def config_group() -> None:
 @click.argument("value")
 def config_set(section: str, key: str, value: str) -> None:
     """Set a config value: ai-review config set <section> <key> <value>"""
-    config = Config()
+    config = _get_config()
     config.set(section, key, value)
-    console.print(f"[green]Set {rich_escape(section)}.{rich_escape(key)} = {rich_escape(value)}[/]")
+    _echo(f"Set {section}.{key} = {value}", _GREEN)
 
 
 @config_group.command("get")
@@ -521,40 +865,43 @@ def config_set(section: str, key: str, value: str) -> None:
 @click.argument("key")
 def config_get(section: str, key: str) -> None:
     """Get a config value: ai-review config get <section> <key>"""
-    config = Config()
+    config = _get_config()
     value = config.get(section, key)
     if value is None:
-        console.print(f"[dim]{section}.{key} is not set[/]")
+        _echo(f"{section}.{key} is not set", _DIM)
     else:
-        console.print(value)
+        _echo(str(value))
 
 
 @config_group.command("show")
 @click.argument("section", required=False)
 def config_show(section: str | None) -> None:
     """Show current configuration."""
-    config = Config()
+    config = _get_config()
     data = config._data
 
     if not data:
-        console.print("[dim]No configuration set.[/]")
+        _echo("No configuration set.", _DIM)
         return
 
     if section:
         if section not in data:
-            console.print(f"[dim]Section '{rich_escape(section)}' not found.[/]")
+            _echo(f"Section '{section}' not found.", _DIM)
             return
-        _print_config_section(section, data[section])
+        click.echo("\n".join(_config_section_lines(section, data[section])))
     else:
+        lines: list[str] = []
         for sect_name, sect_data in data.items():
-            _print_config_section(sect_name, sect_data)
-            console.print()
+            lines.extend(_config_section_lines(sect_name, sect_data))
+            lines.append("")
+        click.echo("\n".join(lines))
 
 
-def _print_config_section(name: str, data: dict) -> None:
-    console.print(f"[bold]{rich_escape('[' + name + ']')}[/]")
+def _config_section_lines(name: str, data: dict) -> list[str]:
+    lines = [click.style(f"[{name}]", bold=True)]
     for key, value in data.items():
-        console.print(f"  {rich_escape(key)} = {rich_escape(str(value))}")
+        lines.append(f"  {key} = {value}")
+    return lines
 
 
 # --- Hook management ---
@@ -563,7 +910,11 @@ _GLOBAL_HOOKS_DIR = Path.home() / ".config" / "ai-code-review" / "hooks"
 _TEMPLATE_HOOKS_DIR = Path.home() / ".config" / "ai-code-review" / "template" / "hooks"
 
 
-def _resolve_ai_review_path() -> str:
+# Resolved ai-review path, reused across runs while the interpreter and $PATH match.
+_RESOLVE_CACHE_FILE = _DEFAULT_CACHE_DIR / "resolve-cache.json"
+
+
+def _find_ai_review_path() -> str:
     """Find the absolute path to the ai-review executable."""
     import shutil
 
@@ -581,75 +932,90 @@ def _resolve_ai_review_path() -> str:
     return "ai-review"
 
 
-_HOOK_TYPES = ["pre-commit", "prepare-commit-msg", "commit-msg", "pre-push"]
+def _resolve_cache_key() -> dict:
+    try:
+        python_mtime = os.stat(sys.executable).st_mtime_ns
+    except OSError:
+        python_mtime = None
+    return {"python": sys.executable, "python_mtime": python_mtime, "path_env": os.environ.get("PATH", "")}
 
 
-def _generate_hook_scripts() -> dict[str, str]:
-    """Generate hook scripts with the resolved ai-review path."""
-    ai_review = _resolve_ai_review_path()
-    opt_in_check = """\
+@cache
+def _resolve_ai_review_path() -> str:
+    """Return the ai-review path, skipping the $PATH scan when a cached answer still applies."""
+    import json
+
+    use_cache = os.environ.get("AI_REVIEW_NO_CACHE") != "1"
+    key = _resolve_cache_key()
+    if use_cache:
+        try:
+            cached = json.loads(_RESOLVE_CACHE_FILE.read_bytes())
+            if cached["key"] == key and os.access(cached["path"], os.X_OK):
+                return cached["path"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    path = _find_ai_review_path()
+    if use_cache and os.path.isabs(path):
+        try:
+            _RESOLVE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _RESOLVE_CACHE_FILE.write_text(json.dumps({"key": key, "path": path}))
+        except OSError:
+            pass
+    return path
+
+
+_HOOK_TYPES = ("pre-commit", "prepare-commit-msg", "commit-msg", "pre-push")
+_HOOK_TYPES_SET = frozenset(_HOOK_TYPES)
+_HOOK_TYPE_CHOICE = click.Choice(_HOOK_TYPES)
+
+# Opt-in guard for global hooks: a .ai-review marker file at the repo root.
+_OPT_IN_MARKER = """\
 # opt-in: only run in repos that have a .ai-review marker file
 REPO_ROOT=$(git rev-parse --show-toplevel 2>/dev/null)
 if [ ! -f "$REPO_ROOT/.ai-review" ]; then
     exit 0
 fi"""
-    return {
-        "pre-commit": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful
-""",
-        "prepare-commit-msg": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful generate-commit-msg "$1" "$2" "$3"
-""",
-        "commit-msg": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful check-commit --auto-accept "$1"
-""",
-        "pre-push": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful pre-push
-""",
-    }
 
-
-def _generate_template_hook_scripts() -> dict[str, str]:
-    """Generate hook scripts that use git config --local for opt-in."""
-    ai_review = _resolve_ai_review_path()
-    opt_in_check = """\
+# Opt-in guard for template hooks: git config --local ai-review.enabled.
+_OPT_IN_CONFIG = """\
 # opt-in: check git local config
 enabled=$(git config --local ai-review.enabled 2>/dev/null)
 if [ "$enabled" != "true" ]; then
     exit 0
 fi"""
+
+_HOOK_SCRIPT_HEADER = "#!/usr/bin/env bash\n# Installed by ai-code-review\n{opt_in}\n"
+
+# Per-hook script templates; {opt_in} and {ai_review} are filled in at install time.
+_HOOK_SCRIPT_TEMPLATES = {
+    "pre-commit": _HOOK_SCRIPT_HEADER + "{ai_review} --graceful\n",
+    "prepare-commit-msg": _HOOK_SCRIPT_HEADER + '{ai_review} --graceful generate-commit-msg "$1" "$2" "$3"\n',
+    "commit-msg": _HOOK_SCRIPT_HEADER + '{ai_review} --graceful check-commit --auto-accept "$1"\n',
+    "pre-push": _HOOK_SCRIPT_HEADER + "{ai_review} --graceful pre-push\n",
+}
+
+
+def _render_hook_scripts(opt_in: str) -> dict[str, str]:
+    ai_review = _resolve_ai_review_path()
     return {
-        "pre-commit": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful
-""",
-        "prepare-commit-msg": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful generate-commit-msg "$1" "$2" "$3"
-""",
-        "commit-msg": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful check-commit --auto-accept "$1"
-""",
-        "pre-push": f"""#!/usr/bin/env bash
-# Installed by ai-code-review
-{opt_in_check}
-{ai_review} --graceful pre-push
-""",
+        hook_type: template.format(opt_in=opt_in, ai_review=ai_review)
+        for hook_type, template in _HOOK_SCRIPT_TEMPLATES.items()
     }
 
 
+@cache
+def _generate_hook_scripts() -> dict[str, str]:
+    """Generate hook scripts with the resolved ai-review path."""
+    return _render_hook_scripts(_OPT_IN_MARKER)
+
+
+@cache
+def _generate_template_hook_scripts() -> dict[str, str]:
+    """Generate hook scripts that use git config --local for opt-in."""
+    return _render_hook_scripts(_OPT_IN_CONFIG)
+
+
 @main.group("hook")
 def hook_group() -> None:
     """Manage git hooks (global or per-repo)."""
@@ -659,11 +1025,11 @@ def hook_group() -> None:
 @hook_group.command("install")
 @click.option("--global", "global_install", is_flag=True, help="Install globally via core.hooksPath (all repos).")
 @click.option("--template", "template_install", is_flag=True, help="Install via init.templateDir (recommended for Android).")
-@click.argument("hook_type", required=False, type=click.Choice(_HOOK_TYPES))
+@click.argument("hook_type", required=False, type=_HOOK_TYPE_CHOICE)
 def hook_install(global_install: bool, template_install: bool, hook_type: str | None) -> None:
     """Install git hooks. Use --template for Android multi-repo teams."""
     if global_install and template_install:
-        console.print("[bold red]Cannot use --global and --template together.[/]")
+        _echo("Cannot use --global and --template together.", _BOLD_RED)
         sys.exit(1)
     if template_install:
         _install_template_hooks()
@@ -672,18 +1038,18 @@ def hook_install(global_install: bool, template_install: bool, hook_type: str |
     elif hook_type:
         _install_repo_hook(hook_type)
     else:
-        console.print("[bold red]Specify a hook type, --global, or --template.[/]")
+        _echo("Specify a hook type, --global, or --template.", _BOLD_RED)
         sys.exit(1)
 
 
 @hook_group.command("uninstall")
 @click.option("--global", "global_uninstall", is_flag=True, help="Remove global hooks and core.hooksPath.")
 @click.option("--template", "template_uninstall", is_flag=True, help="Remove template hooks and init.templateDir.")
-@click.argument("hook_type", required=False, type=click.Choice(_HOOK_TYPES))
+@click.argument("hook_type", required=False, type=_HOOK_TYPE_CHOICE)
 def hook_uninstall(global_uninstall: bool, template_uninstall: bool, hook_type: str | None) -> None:
     """Uninstall git hooks."""
     if global_uninstall and template_uninstall:
-        console.print("[bold red]Cannot use --global and --template together.[/]")
+        _echo("Cannot use --global and --template together.", _BOLD_RED)
         sys.exit(1)
     if template_uninstall:
         _uninstall_template_hooks()
@@ -692,124 +1058,165 @@ def hook_uninstall(global_uninstall: bool, template_uninstall: bool, hook_type:
     elif hook_type:
         _uninstall_repo_hook(hook_type)
     else:
-        console.print("[bold red]Specify a hook type, --global, or --template.[/]")
+        _echo("Specify a hook type, --global, or --template.", _BOLD_RED)
         sys.exit(1)
 
 
+def _git_config_dict(scope: str) -> dict[str, str]:
+    """Read every key in one git config scope (``--global``/``--local``) with a single spawn.
+
+    Keys come back as git prints them: section and variable names lowercased.
+    Returns an empty dict when the scope is unavailable (no file, not a repo).
+    """
+    try:
+        raw = _run_git("config", scope, "--list", "-z")
+    except GitError:
+        return {}
+    entries: dict[str, str] = {}
+    for record in raw.split("\0"):
+        if not record:
+            continue
+        key, _, value = record.partition("\n")
+        entries[key] = value
+    return entries
+
+
+def _scan_hooks(hooks_dir: Path) -> dict[str, bool]:
+    """Report which hook types in ``hooks_dir`` are ai-review scripts, with one directory scan."""
+    try:
+        with os.scandir(hooks_dir) as it:
+            entries = {e.name: e.path for e in it if e.name in _HOOK_TYPES_SET}
+    except (FileNotFoundError, NotADirectoryError):
+        entries = {}
+    installed = {}
+    for hook_type in _HOOK_TYPES:
+        path = entries.get(hook_type)
+        if path is None:
+            installed[hook_type] = False
+            continue
+        # Bytes, not text: no decoding, and a hook manager may call ai-review anywhere in it.
+        try:
+            installed[hook_type] = b"ai-review" in Path(path).read_bytes()
+        except OSError:
+            installed[hook_type] = False
+    return installed
+
+
+def _hook_state_lines(hooks_dir: Path) -> list[str]:
+    """One status line per hook type: installed if the file mentions ai-review."""
+    lines = []
+    for hook_type, installed in _scan_hooks(hooks_dir).items():
+        if installed:
+            lines.append(click.style(f"  {hook_type}: installed", fg="green"))
+        else:
+            lines.append(click.style(f"  {hook_type}: not installed", dim=True))
+    return lines
+
+
+_NOT_CONFIGURED = click.style("  not configured", dim=True)
+
+
 @hook_group.command("status")
 def hook_status() -> None:
     """Show installed hooks (template, global, and current repo)."""
-    import subprocess
+    global_config = _git_config_dict("--global")
+    local_config = _git_config_dict("--local")
+    # Plain ANSI via click.style (stripped by click.echo when not a tty) and one
+    # write: status output has no user markup, so Rich's parse/layout pass buys nothing.
+    lines: list[str] = []
 
     # Template hooks status
-    console.print("[bold]Template hooks:[/]")
-    try:
-        result = subprocess.run(
-            ["git", "config", "--global", "init.templateDir"],
-            capture_output=True, text=True,
-        )
-        template_path = result.stdout.strip()
-        if template_path:
-            console.print(f"  init.templateDir = {template_path}")
-            hooks_dir = Path(template_path) / "hooks"
-            for hook_type in _HOOK_TYPES:
-                hook_path = hooks_dir / hook_type
-                if hook_path.exists() and "ai-review" in hook_path.read_text():
-                    console.print(f"  [green]{hook_type}: installed[/]")
-                else:
-                    console.print(f"  [dim]{hook_type}: not installed[/]")
-        else:
-            console.print("  [dim]not configured[/]")
-    except (subprocess.CalledProcessError, OSError):
-        console.print("  [dim]not configured[/]")
+    lines.append(click.style("Template hooks:", bold=True))
+    template_path = global_config.get("init.templatedir", "").strip()
+    if template_path:
+        lines.append(f"  init.templateDir = {template_path}")
+        try:
+            lines.extend(_hook_state_lines(Path(template_path) / "hooks"))
+        except OSError:
+            lines.append(_NOT_CONFIGURED)
+    else:
+        lines.append(_NOT_CONFIGURED)
 
     # Global hooks status
-    console.print("\n[bold]Global hooks:[/]")
-    try:
-        result = subprocess.run(
-            ["git", "config", "--global", "core.hooksPath"],
-            capture_output=True, text=True,
-        )
-        hooks_path = result.stdout.strip()
-        if hooks_path:
-            console.print(f"  core.hooksPath = {hooks_path}")
-            hooks_dir = Path(hooks_path)
-            for hook_type in _HOOK_TYPES:
-                hook_path = hooks_dir / hook_type
-                if hook_path.exists() and "ai-review" in hook_path.read_text():
-                    console.print(f"  [green]{hook_type}: installed[/]")
-                else:
-                    console.print(f"  [dim]{hook_type}: not installed[/]")
-        else:
-            console.print("  [dim]not configured[/]")
-    except (subprocess.CalledProcessError, OSError):
-        console.print("  [dim]not configured[/]")
+    lines.append("\n" + click.style("Global hooks:", bold=True))
+    hooks_path = global_config.get("core.hookspath", "").strip()
+    if hooks_path:
+        lines.append(f"  core.hooksPath = {hooks_path}")
+        try:
+            lines.extend(_hook_state_lines(Path(hooks_path)))
+        except OSError:
+            lines.append(_NOT_CONFIGURED)
+    else:
+        lines.append(_NOT_CONFIGURED)
 
     # Current repo status
-    console.print("\n[bold]Current repo:[/]")
+    lines.append("\n" + click.style("Current repo:", bold=True))
+    enabled = local_config.get("ai-review.enabled", "").strip()
+    if enabled:
+        lines.append(f"  ai-review.enabled = {enabled}")
+    else:
+        lines.append(click.style("  ai-review.enabled: not set", dim=True))
     try:
-        # Check ai-review.enabled
-        result = subprocess.run(
-            ["git", "config", "--local", "ai-review.enabled"],
-            capture_output=True, text=True,
-        )
-        enabled = result.stdout.strip()
-        if enabled:
-            console.print(f"  ai-review.enabled = {enabled}")
-        else:
-            console.print("  [dim]ai-review.enabled: not set[/]")
+        git_dir = _git_dir()
+    except GitError:
+        lines.append(click.style("  not in a git repository", dim=True))
+    else:
+        lines.extend(_hook_state_lines(Path(git_dir) / "hooks"))
 
-        # Check repo hooks
-        hooks_dir = _get_repo_hooks_dir()
-        for hook_type in _HOOK_TYPES:
-            hook_path = hooks_dir / hook_type
-            if hook_path.exists() and "ai-review" in hook_path.read_text():
-                console.print(f"  [green]{hook_type}: installed[/]")
-            else:
-                console.print(f"  [dim]{hook_type}: not installed[/]")
-    except SystemExit:
-        console.print("  [dim]not in a git repository[/]")
+    click.echo("\n".join(lines))
 
 
 @hook_group.command("enable")
 def hook_enable() -> None:
     """Enable AI review for current repo (sets git config --local)."""
-    import subprocess
-
     try:
-        from .git import _run_git
-        _run_git("rev-parse", "--git-dir")
-    except (subprocess.CalledProcessError, OSError, GitError):
-        console.print("[bold red]Not in a git repository.[/]")
+        _git_dir()
+    except GitError:
+        _echo("Not in a git repository.", _BOLD_RED)
         sys.exit(1)
 
-    subprocess.run(
-        ["git", "config", "--local", "ai-review.enabled", "true"],
-        check=True,
-    )
-    console.print("[green]AI review enabled for this repo.[/]")
+    try:
+        _run_git("config", "--local", "ai-review.enabled", "true")
+    except GitError as e:
+        _echo(str(e), _BOLD_RED)
+        sys.exit(1)
+    _echo("AI review enabled for this repo.", _GREEN)
 
 
 @hook_group.command("disable")
 def hook_disable() -> None:
     """Disable AI review for current repo (unsets git config --local)."""
-    import subprocess
-
     try:
-        from .git import _run_git
-        _run_git("rev-parse", "--git-dir")
-    except (subprocess.CalledProcessError, OSError, GitError):
-        console.print("[bold red]Not in a git repository.[/]")
+        _git_dir()
+    except GitError:
+        _echo("Not in a git repository.", _BOLD_RED)
         sys.exit(1)
 
     try:
-        subprocess.run(
-            ["git", "config", "--local", "--unset", "ai-review.enabled"],
-            check=True, capture_output=True,
-        )
-        console.print("[green]AI review disabled for this repo.[/]")
-    except subprocess.CalledProcessError:
-        console.print("[dim]AI review was not enabled for this repo.[/]")
+        _run_git("config", "--local", "--unset", "ai-review.enabled")
+    except GitError:
+        # git exits 5 when the key is not set
+        _echo("AI review was not enabled for this repo.", _DIM)
+    else:
+        _echo("AI review disabled for this repo.", _GREEN)
+
+
+def _write_hook(hook_path: Path, script: str) -> None:
+    """Write an executable hook script; the mode is set on the open fd before any data lands."""
+    fd = os.open(hook_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    with os.fdopen(fd, "w") as f:
+        # fchmod covers both the umask and a pre-existing non-executable file.
+        os.fchmod(fd, 0o755)
+        f.write(script)
+
+
+def _remove_hook(hook_path: Path) -> bool:
+    """Delete a hook file, returning False if it was not there (no separate exists() stat)."""
+    try:
+        hook_path.unlink()
+    except FileNotFoundError:
+        return False
+    return True
 
 
 def _install_global_hooks() -> None:
@@ -819,18 +1226,17 @@ def _install_global_hooks() -> None:
     _GLOBAL_HOOKS_DIR.mkdir(parents=True, exist_ok=True)
     for hook_type, script in hook_scripts.items():
         hook_path = _GLOBAL_HOOKS_DIR / hook_type
-        hook_path.write_text(script)
-        hook_path.chmod(0o755)
-        console.print(f"  [green]Created {hook_path}[/]")
+        _write_hook(hook_path, script)
+        _echo(f"  Created {hook_path}", _GREEN)
 
     subprocess.run(
         ["git", "config", "--global", "core.hooksPath", str(_GLOBAL_HOOKS_DIR)],
         check=True,
     )
-    console.print(f"\n[green]Global hooks installed.[/]")
-    console.print(f"[dim]core.hooksPath → {_GLOBAL_HOOKS_DIR}[/]")
-    console.print("[dim]Hooks only activate in repos with a .ai-review marker file.[/]")
-    console.print("[dim]Enable a repo: touch /path/to/repo/.ai-review[/]")
+    _echo("\nGlobal hooks installed.", _GREEN)
+    _echo(f"core.hooksPath → {_GLOBAL_HOOKS_DIR}", _DIM)
+    _echo("Hooks only activate in repos with a .ai-review marker file.", _DIM)
+    _echo("Enable a repo: touch /path/to/repo/.ai-review", _DIM)
 
 
 def _uninstall_global_hooks() -> None:
@@ -838,18 +1244,17 @@ def _uninstall_global_hooks() -> None:
 
     for hook_type in _HOOK_TYPES:
         hook_path = _GLOBAL_HOOKS_DIR / hook_type
-        if hook_path.exists():
-            hook_path.unlink()
-            console.print(f"  [green]Removed {hook_path}[/]")
+        if _remove_hook(hook_path):
+            _echo(f"  Removed {hook_path}", _GREEN)
 
-    try:
-        subprocess.run(
-            ["git", "config", "--global", "--unset", "core.hooksPath"],
-            check=True, capture_output=True,
-        )
-        console.print("[green]Global hooks uninstalled (core.hooksPath cleared).[/]")
-    except subprocess.CalledProcessError:
-        console.print("[dim]core.hooksPath was not set.[/]")
+    res = subprocess.run(
+        ["git", "config", "--global", "--unset", "core.hooksPath"],
+        check=False, capture_output=True,
+    )
+    if res.returncode == 0:
+        _echo("Global hooks uninstalled (core.hooksPath cleared).", _GREEN)
+    else:
+        _echo("core.hooksPath was not set.", _DIM)
 
 
 def _install_template_hooks() -> None:
@@ -861,28 +1266,27 @@ def _install_template_hooks() -> None:
         capture_output=True, text=True,
     )
     if check.stdout.strip():
-        console.print(f"[bold yellow]Warning: core.hooksPath is set to {check.stdout.strip()}[/]")
-        console.print("[yellow]core.hooksPath overrides .git/hooks/ — template hooks won't run.[/]")
-        console.print("[yellow]Run 'ai-review hook uninstall --global' first.[/]")
+        _echo(f"Warning: core.hooksPath is set to {check.stdout.strip()}", _BOLD_YELLOW)
+        _echo("core.hooksPath overrides .git/hooks/ — template hooks won't run.", _YELLOW)
+        _echo("Run 'ai-review hook uninstall --global' first.", _YELLOW)
 
     hook_scripts = _generate_template_hook_scripts()
     _TEMPLATE_HOOKS_DIR.mkdir(parents=True, exist_ok=True)
     for hook_type, script in hook_scripts.items():
         hook_path = _TEMPLATE_HOOKS_DIR / hook_type
-        hook_path.write_text(script)
-        hook_path.chmod(0o755)
-        console.print(f"  [green]Created {hook_path}[/]")
+        _write_hook(hook_path, script)
+        _echo(f"  Created {hook_path}", _GREEN)
 
     template_dir = _TEMPLATE_HOOKS_DIR.parent
     subprocess.run(
         ["git", "config", "--global", "init.templateDir", str(template_dir)],
         check=True,
     )
-    console.print(f"\n[green]Template hooks installed.[/]")
-    console.print(f"[dim]init.templateDir → {template_dir}[/]")
-    console.print("[dim]New clones will auto-copy hooks to .git/hooks/[/]")
-    console.print("[dim]Existing repos: run 'git init' to copy hooks[/]")
-    console.print("[dim]Enable a repo: git config --local ai-review.enabled true[/]")
+    _echo("\nTemplate hooks installed.", _GREEN)
+    _echo(f"init.templateDir → {template_dir}", _DIM)
+    _echo("New clones will auto-copy hooks to .git/hooks/", _DIM)
+    _echo("Existing repos: run 'git init' to copy hooks", _DIM)
+    _echo("Enable a repo: git config --local ai-review.enabled true", _DIM)
 
 
 def _uninstall_template_hooks() -> None:
@@ -890,46 +1294,55 @@ def _uninstall_template_hooks() -> None:
 
     for hook_type in _HOOK_TYPES:
         hook_path = _TEMPLATE_HOOKS_DIR / hook_type
-        if hook_path.exists():
-            hook_path.unlink()
-            console.print(f"  [green]Removed {hook_path}[/]")
+        if _remove_hook(hook_path):
+            _echo(f"  Removed {hook_path}", _GREEN)
 
-    try:
-        subprocess.run(
-            ["git", "config", "--global", "--unset", "init.templateDir"],
-            check=True, capture_output=True,
-        )
-        console.print("[green]Template hooks uninstalled (init.templateDir cleared).[/]")
-    except subprocess.CalledProcessError:
-        console.print("[dim]init.templateDir was not set.[/]")
+    res = subprocess.run(
+        ["git", "config", "--global", "--unset", "init.templateDir"],
+        check=False, capture_output=True,
+    )
+    if res.returncode == 0:
+        _echo("Template hooks uninstalled (init.templateDir cleared).", _GREEN)
+    else:
+        _echo("init.templateDir was not set.", _DIM)
 
 
 def _install_repo_hook(hook_type: str) -> None:
     hooks_dir = _get_repo_hooks_dir()
     hook_path = hooks_dir / hook_type
     hook_scripts = _generate_hook_scripts()
-    hook_path.write_text(hook_scripts[hook_type])
-    hook_path.chmod(0o755)
-    console.print(f"[green]Installed {hook_type} hook in current repo.[/]")
+    _write_hook(hook_path, hook_scripts[hook_type])
+    _echo(f"Installed {hook_type} hook in current repo.", _GREEN)
 
 
 def _uninstall_repo_hook(hook_type: str) -> None:
     hooks_dir = _get_repo_hooks_dir()
     hook_path = hooks_dir / hook_type
-    if hook_path.exists():
-        hook_path.unlink()
-        console.print(f"[green]Removed {hook_type} hook.[/]")
+    if _remove_hook(hook_path):
+        _echo(f"Removed {hook_type} hook.", _GREEN)
     else:
-        console.print(f"[dim]{hook_type} hook is not installed.[/]")
+        _echo(f"{hook_type} hook is not installed.", _DIM)
+
+
+@lru_cache(maxsize=8)
+def _git_dir_for(cwd: str) -> str:
+    return _run_git("rev-parse", "--git-dir").strip()
+
+
+def _git_dir() -> str:
+    """Return ``git rev-parse --git-dir``, spawning git once per working directory.
+
+    The answer can be relative to the cwd, so the cache is keyed on it; failures
+    raise GitError and are not cached.
+    """
+    return _git_dir_for(os.getcwd())
 
 
 def _get_repo_hooks_dir() -> Path:
     try:
-        from .git import _run_git
-        git_dir = _run_git("rev-parse", "--git-dir").strip()
-        hooks_dir = Path(git_dir) / "hooks"
+        hooks_dir = Path(_git_dir()) / "hooks"
         hooks_dir.mkdir(exist_ok=True)
         return hooks_dir
     except (subprocess.CalledProcessError, OSError, GitError):
-        console.print("[bold red]Not in a git repository.[/]")
+        _echo("Not in a git repository.", _BOLD_RED)
         sys.exit(1)
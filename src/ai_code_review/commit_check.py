@@ -3,9 +3,9 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 
-_COMMIT_MSG_PATTERN = re.compile(
+_match_commit_subject = re.compile(
     r"^(\[UPDATE\])?\[(BSP|CP|AP)\]\[[A-Z]+\] .+"
-)
+).match
 
 _FORMAT_HINT = (
     "Commit message must match: [CATEGORY][COMPONENT] description\n"
@@ -25,10 +25,13 @@ class CommitCheckResult:
 
 
 def check_commit_message(message: str) -> CommitCheckResult:
-    message = message.strip()
-    if not message:
+    if not message or message.isspace():
         return CommitCheckResult(valid=False, error="Empty commit message.")
-    first_line = message.split("\n")[0].strip()
-    if not _COMMIT_MSG_PATTERN.match(first_line):
+    if message[0].isspace():
+        message = message.lstrip()
+    # Only the subject matters; partition stops at the first newline instead of
+    # splitting the whole body, and anything not starting with "[" skips the regex.
+    first_line = message.partition("\n")[0].rstrip()
+    if not first_line.startswith("[") or not _match_commit_subject(first_line):
         return CommitCheckResult(valid=False, error=_FORMAT_HINT)
     return CommitCheckResult(valid=True)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import os
+import pickle
 import sys
+import tempfile
 from pathlib import Path
 
 if sys.version_info >= (3, 11):
@@ -14,6 +16,14 @@ import tomli_w
 _DEFAULT_CONFIG_DIR = Path.home() / ".config" / "ai-code-review"
 _CONFIG_FILENAME = "config.toml"
 
+# Parsed-config snapshot, reused while the source file's mtime+size are unchanged.
+_DEFAULT_CACHE_DIR = Path.home() / ".cache" / "ai-code-review"
+_CACHE_FILENAME = "config.cache"
+_CACHE_HEADER_PREFIX = b"# content-version: "
+
+# Parsed configs by content version: repeat Config() calls in one process cost one stat.
+_PARSE_CACHE: dict[bytes, dict] = {}
+
 # Default extensions to review (Android BSP: C/C++/Java)
 DEFAULT_INCLUDE_EXTENSIONS = "c,cpp,h,hpp,java"
 
@@ -23,6 +33,9 @@ DEFAULT_MAX_DIFF_LINES = 2000
 # Default maximum lines of full file context to send alongside the diff
 DEFAULT_MAX_CONTEXT_LINES = 5000
 
+# Diffs adding fewer lines than this that only touch blanks/comments skip the LLM
+DEFAULT_MIN_REVIEW_LINES = 10
+
 # Mapping of provider name to the config key that holds the env var name for its token.
 _TOKEN_ENV_KEYS: dict[str, str] = {
     "openai": "api_key_env",
@@ -31,26 +44,122 @@ _TOKEN_ENV_KEYS: dict[str, str] = {
 }
 
 
+def _copy_sections(data: dict) -> dict:
+    """Copy down to the section tables, the deepest level Config.set() mutates."""
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in data.items()}
+
+
 class Config:
-    def __init__(self, config_dir: Path | None = None) -> None:
+    def __init__(self, config_dir: Path | None = None, cache_dir: Path | None = None) -> None:
         self._dir = config_dir or _DEFAULT_CONFIG_DIR
         self._path = self._dir / _CONFIG_FILENAME
+        if cache_dir is None:
+            cache_dir = self._dir if config_dir else _DEFAULT_CACHE_DIR
+        self._cache_path = cache_dir / _CACHE_FILENAME
         self._data: dict = self._load()
+        # (section, key) -> value: get() is a single hash lookup with no per-miss allocation.
+        self._flat: dict[tuple[str, str], str] = {
+            (section, key): value
+            for section, table in self._data.items()
+            if isinstance(table, dict)
+            for key, value in table.items()
+        }
+        # Resolved tokens per provider; set() clears it since it may change the env key.
+        self._tokens: dict[str, str | None] = {}
+
+    @classmethod
+    def fast_provider_configured(cls, config_dir: Path | None = None) -> bool:
+        """Cheap pre-check before a full load: False only if the config file is
+        missing or never mentions a provider, so no provider can be resolved."""
+        path = (config_dir or _DEFAULT_CONFIG_DIR) / _CONFIG_FILENAME
+        try:
+            return b"provider" in path.read_bytes()
+        except OSError:
+            return False
 
     def _load(self) -> dict:
-        if self._path.exists():
-            return tomllib.loads(self._path.read_text(encoding="utf-8"))
-        return {}
+        if os.environ.get("AI_REVIEW_NO_CACHE") == "1":
+            return self._parse()
+        version = self._content_version()
+        if version is None:
+            return {}
+        data = _PARSE_CACHE.get(version)
+        if data is None:
+            data = _PARSE_CACHE[version] = self._load_cached(version)
+        return _copy_sections(data)
+
+    def _parse(self) -> dict:
+        try:
+            with self._path.open("rb") as f:
+                return tomllib.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _content_version(self) -> bytes | None:
+        """Return a key identifying the current config file, or None if it is missing."""
+        try:
+            st = self._path.stat()
+        except OSError:
+            return None
+        return f"{self._path}:{st.st_mtime_ns}:{st.st_size}".encode()
+
+    def _load_cached(self, version: bytes) -> dict:
+        """Load the pickled snapshot if it matches the config file, else parse and re-cache."""
+        try:
+            with self._cache_path.open("rb") as f:
+                header = f.readline().rstrip(b"\n")
+                if header == _CACHE_HEADER_PREFIX + version:
+                    data = pickle.load(f)
+                    if isinstance(data, dict):
+                        return data
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+        data = self._parse()
+        self._write_cache(version, data)
+        return data
+
+    def _write_cache(self, version: bytes, data: dict) -> None:
+        """Atomically replace the cache file; failures only cost a re-parse next time."""
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._cache_path.parent, prefix=".config.cache.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(_CACHE_HEADER_PREFIX + version + b"\n")
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._cache_path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            pass
 
     def _save(self) -> None:
         self._dir.mkdir(parents=True, exist_ok=True)
-        self._path.write_bytes(tomli_w.dumps(self._data).encode())
+        # Write beside the config and rename over it, so an interrupted save
+        # leaves the previous file intact rather than a truncated one.
+        fd, tmp = tempfile.mkstemp(dir=self._dir, prefix=".config.toml.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                tomli_w.dump(self._data, f)
+            os.replace(tmp, self._path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        # Refresh the snapshot now: a same-size rewrite within the filesystem's
+        # mtime granularity would otherwise look unchanged.
+        version = self._content_version()
+        if version is not None and os.environ.get("AI_REVIEW_NO_CACHE") != "1":
+            self._write_cache(version, self._data)
+            _PARSE_CACHE[version] = _copy_sections(self._data)
 
     def get(self, section: str, key: str) -> str | None:
-        return self._data.get(section, {}).get(key)
+        return self._flat.get((section, key))
 
     def set(self, section: str, key: str, value: str) -> None:
         self._data.setdefault(section, {})[key] = value
+        self._flat[(section, key)] = value
+        self._tokens.clear()
         self._save()
 
     def resolve_provider(self, cli_provider: str | None) -> str | None:
@@ -71,8 +180,11 @@ class Config:
         return None
 
     def resolve_token(self, provider: str) -> str | None:
-        env_key_name = _TOKEN_ENV_KEYS.get(provider, "api_key_env")
-        env_var = self.get(provider, env_key_name)
-        if not env_var:
-            return None
-        return os.environ.get(env_var)
+        try:
+            return self._tokens[provider]
+        except KeyError:
+            pass
+        env_var = self.get(provider, _TOKEN_ENV_KEYS.get(provider, "api_key_env"))
+        token = os.environ.get(env_var) if env_var else None
+        self._tokens[provider] = token
+        return token
@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import io
 import json
+from typing import Callable, Iterator, TextIO
 
-from rich.console import Console
+try:
+    import orjson
+except ImportError:  # optional: pip install "ai-code-review[fast]"
+    orjson = None
 
 from .llm.base import ReviewResult, Severity
 
@@ -21,59 +25,89 @@ _SEVERITY_STYLES = {
     Severity.INFO: "dim",
 }
 
+# Issue header prefix per severity, built once.
+_SEVERITY_PREFIX = {sev: f"  {icon} [{sev}] " for sev, icon in _SEVERITY_ICONS.items()}
 
-def format_terminal(result: ReviewResult) -> str:
-    buf = io.StringIO()
-    console = Console(file=buf, force_terminal=False)
 
+def _terminal_lines(result: ReviewResult) -> Iterator[str]:
     if not result.issues:
-        console.print("\u2705 No issues found — code looks clean!")
-        return buf.getvalue()
+        yield "\u2705 No issues found — code looks clean!"
+        return
 
-    console.print(f"\U0001f50d AI Code Review — {len(result.issues)} issue(s) found\n")
+    yield f"\U0001f50d AI Code Review — {len(result.issues)} issue(s) found\n"
     for issue in result.issues:
-        icon = _SEVERITY_ICONS[issue.severity]
-        console.print(f"  {icon} [{issue.severity.value}] {issue.file}:{issue.line}")
-        console.print(f"     {issue.message}\n")
+        yield f"{_SEVERITY_PREFIX[issue.severity]}{issue.file}:{issue.line}"
+        yield f"     {issue.message}\n"
 
     summary = result.summary
     parts = [f"{count} {name}" for name, count in summary.items() if count > 0]
-    console.print("─" * 50)
-    console.print(f"Summary: {', '.join(parts)}")
+    yield "─" * 50
+    yield f"Summary: {', '.join(parts)}"
 
     if result.is_blocked:
-        console.print("\u274c Commit blocked (critical/error found)")
+        yield "\u274c Commit blocked (critical/error found)"
     else:
-        console.print("\u2705 Commit allowed (warnings only)")
+        yield "\u2705 Commit allowed (warnings only)"
+
+
+def write_terminal(result: ReviewResult, out: TextIO) -> None:
+    """Write the plain terminal report to ``out`` as it is rendered."""
+    from rich.console import Console
+
+    # The report is plain text: with markup, emoji codes and highlighting off, Rich
+    # skips its per-line regex passes and LLM text such as "arr[i]" or the
+    # "[error]" severity label is printed verbatim instead of being eaten as a tag.
+    console = Console(file=out, force_terminal=False, markup=False, emoji=False, highlight=False)
+    for line in _terminal_lines(result):
+        console.print(line)
+
+
+def write_terminal_plain(result: ReviewResult, out: TextIO) -> None:
+    """Write the terminal report to ``out`` without Rich, for piped output."""
+    for line in _terminal_lines(result):
+        out.write(line + "\n")
 
+
+def format_terminal(result: ReviewResult) -> str:
+    buf = io.StringIO()
+    write_terminal(result, buf)
     return buf.getvalue()
 
 
-def format_markdown(result: ReviewResult) -> str:
-    lines = ["# AI Code Review Report\n"]
+def _markdown_lines(result: ReviewResult) -> Iterator[str]:
+    yield "# AI Code Review Report\n"
     if not result.issues:
-        lines.append("No issues found.\n")
-        return "\n".join(lines)
+        yield "No issues found.\n"
+        return
 
-    lines.append("| Severity | File | Line | Issue |")
-    lines.append("|----------|------|------|-------|")
+    yield "| Severity | File | Line | Issue |"
+    yield "|----------|------|------|-------|"
     for issue in result.issues:
-        lines.append(f"| {issue.severity.value} | {issue.file} | {issue.line} | {issue.message} |")
+        yield f"| {issue.severity} | {issue.file} | {issue.line} | {issue.message} |"
 
     summary = result.summary
     parts = [f"{count} {name}" for name, count in summary.items() if count > 0]
-    lines.append(f"\n**Summary:** {', '.join(parts)}")
-    lines.append(f"**Blocked:** {'Yes' if result.is_blocked else 'No'}")
-    return "\n".join(lines)
+    yield f"\n**Summary:** {', '.join(parts)}"
+    yield f"**Blocked:** {'Yes' if result.is_blocked else 'No'}"
 
 
-def format_json(result: ReviewResult) -> str:
-    data = {
+def write_markdown(result: ReviewResult, out: TextIO) -> None:
+    """Write the Markdown report to ``out`` line by line."""
+    for line in _markdown_lines(result):
+        out.write(line + "\n")
+
+
+def format_markdown(result: ReviewResult) -> str:
+    return "\n".join(_markdown_lines(result))
+
+
+def _json_payload(result: ReviewResult) -> dict:
+    return {
         "summary": result.summary,
         "blocked": result.is_blocked,
         "issues": [
             {
-                "severity": issue.severity.value,
+                "severity": issue.severity,
                 "file": issue.file,
                 "line": issue.line,
                 "message": issue.message,
@@ -81,4 +115,39 @@ def format_json(result: ReviewResult) -> str:
             for issue in result.issues
         ],
     }
-    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def _dumps(data: dict, indent: int | None) -> str:
+    # Compact by default: the stdlib only uses its C encoder for one-shot dumps()
+    # without indent; json.dump() and indent=N both fall back to pure Python.
+    # orjson only supports a 2-space indent, so any indent maps to that.
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(data, indent=indent, ensure_ascii=False)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_json(result: ReviewResult, out: TextIO, indent: int | None = None) -> None:
+    """Write the JSON report to ``out``, compact unless ``indent`` is given."""
+    out.write(_dumps(_json_payload(result), indent))
+    out.write("\n")
+
+
+def format_json(result: ReviewResult, indent: int | None = None) -> str:
+    return _dumps(_json_payload(result), indent)
+
+
+# Output format name (as accepted by --format) to formatter.
+FORMATTERS: dict[str, Callable[[ReviewResult], str]] = {
+    "terminal": format_terminal,
+    "markdown": format_markdown,
+    "json": format_json,
+}
+
+# Output format name to a writer that streams the report to a text stream.
+WRITERS: dict[str, Callable[[ReviewResult, TextIO], None]] = {
+    "terminal": write_terminal,
+    "markdown": write_markdown,
+    "json": write_json,
+}
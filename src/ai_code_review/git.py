@@ -1,48 +1,124 @@
 from __future__ import annotations
 
+import shutil
 import subprocess
+from functools import cache
 
 
 class GitError(Exception):
     pass
 
 
-def _run_git(*args: str) -> str:
+@cache
+def _git_executable() -> str:
+    """Resolve git once per process so each spawn skips the PATH search."""
+    return shutil.which("git") or "git"
+
+
+def _decode(raw: bytes) -> str:
+    # Diffs of BSP trees regularly contain non-UTF-8 source; never fail on them.
+    return raw.decode("utf-8", "replace")
+
+
+def _run_git_bytes(*args: str) -> bytes:
+    # An absolute executable with close_fds=False lets subprocess use
+    # posix_spawn instead of fork+exec; our own fds are non-inheritable anyway.
     try:
         result = subprocess.run(
-            ["git", *args],
+            [_git_executable(), *args],
             capture_output=True,
-            text=True,
             check=True,
+            close_fds=False,
         )
     except subprocess.CalledProcessError as e:
-        raise GitError(f"git {' '.join(args)} failed: {e.stderr.strip()}") from e
+        raise GitError(f"git {' '.join(args)} failed: {_decode(e.stderr).strip()}") from e
     except FileNotFoundError:
         raise GitError("git is not installed or not in PATH")
     return result.stdout
 
 
-def get_staged_diff(extensions: list[str] | None = None) -> str:
+def _run_git(*args: str) -> str:
+    return _decode(_run_git_bytes(*args))
+
+
+def _run_git_diff(*args: str) -> str:
+    """Run a diff command, trimming trailing whitespace on the raw bytes so the
+    (possibly multi-MB) output is decoded once and never copied again."""
+    return _decode(_run_git_bytes(*args).rstrip())
+
+
+def _run_git_head(max_lines: int, *args: str) -> str:
+    """Run git and keep at most ``max_lines`` lines of its output.
+
+    Git is killed as soon as the limit is reached, so the rest of the output
+    is never produced or held in memory.
+    """
+    try:
+        proc = subprocess.Popen(
+            [_git_executable(), *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=False,
+        )
+    except FileNotFoundError:
+        raise GitError("git is not installed or not in PATH")
+    lines: list[bytes] = []
+    with proc:
+        for line in proc.stdout:
+            lines.append(line)
+            if len(lines) >= max_lines:
+                proc.kill()
+                return _decode(b"".join(lines))
+        stderr = proc.stderr.read()
+        proc.wait()
+    if proc.returncode != 0:
+        raise GitError(f"git {' '.join(args)} failed: {_decode(stderr).strip()}")
+    return _decode(b"".join(lines))
+
+
+def get_staged_diff(extensions: list[str] | None = None, max_lines: int | None = None) -> str:
+    """Return the staged diff, optionally filtered by file extension.
+
+    With ``max_lines``, at most ``max_lines + 1`` lines are read from git: the
+    extra line lets callers tell that the diff was cut off.
+    """
     args = ["diff", "--cached"]
     if extensions:
         args.append("--")
         args.extend(f"*.{ext.lstrip('.')}" for ext in extensions)
-    return _run_git(*args).strip()
+    if max_lines is not None:
+        return _run_git_head(max_lines + 1, *args).strip()
+    return _run_git_diff(*args)
 
 
 def get_unstaged_diff() -> str:
-    return _run_git("diff").strip()
+    return _run_git_diff("diff")
 
 
-def get_commit_diff(from_ref: str, to_ref: str, extensions: list[str] | None = None) -> str:
+def get_commit_diff(
+    from_ref: str,
+    to_ref: str,
+    extensions: list[str] | None = None,
+    max_lines: int | None = None,
+) -> str:
+    """Return the diff between two refs; ``max_lines`` bounds it as in :func:`get_staged_diff`."""
     args = ["diff", from_ref, to_ref]
     if extensions:
         args.append("--")
         args.extend(f"*.{ext.lstrip('.')}" for ext in extensions)
-    return _run_git(*args).strip()
+    if max_lines is not None:
+        return _run_git_head(max_lines + 1, *args).strip()
+    return _run_git_diff(*args)
 
 
 _ZERO_SHA = "0" * 40
+# Candidate bases for a new branch, in order of preference.
+_BASE_REFS = (
+    "refs/remotes/origin/main",
+    "refs/remotes/origin/master",
+    "refs/heads/main",
+    "refs/heads/master",
+)
 
 
 def _get_file_contents(
@@ -124,13 +200,19 @@ def get_commit_file_contents(
     )
 
 
-def get_push_diff(local_sha: str, remote_sha: str, extensions: list[str] | None = None) -> str:
+def get_push_diff(
+    local_sha: str,
+    remote_sha: str,
+    extensions: list[str] | None = None,
+    max_lines: int | None = None,
+) -> str:
     """Get diff for commits being pushed.
 
     Args:
         local_sha: The local commit SHA being pushed.
         remote_sha: The remote commit SHA (current tip of the remote branch).
         extensions: Optional list of file extensions to filter the diff.
+        max_lines: Optional bound passed on to :func:`get_commit_diff`.
 
     Returns:
         The diff string, or empty string if the branch is being deleted
@@ -139,12 +221,19 @@ def get_push_diff(local_sha: str, remote_sha: str, extensions: list[str] | None
     if local_sha == _ZERO_SHA:
         return ""  # Branch being deleted
     if remote_sha == _ZERO_SHA:
-        # New branch — try to find merge base with main/master
-        for base_ref in ["origin/main", "origin/master", "main", "master"]:
+        # New branch — find merge base with main/master. One for-each-ref
+        # lists which candidates exist, so missing refs cost no subprocess.
+        try:
+            existing = set(_run_git("for-each-ref", "--format=%(refname)", *_BASE_REFS).split())
+        except GitError:
+            return ""
+        for base_ref in _BASE_REFS:
+            if base_ref not in existing:
+                continue
             try:
                 merge_base = _run_git("merge-base", local_sha, base_ref).strip()
-                return get_commit_diff(merge_base, local_sha, extensions)
+                return get_commit_diff(merge_base, local_sha, extensions, max_lines)
             except GitError:
-                continue
+                continue  # Unrelated history
         return ""  # Can't determine base
-    return get_commit_diff(remote_sha, local_sha, extensions)
+    return get_commit_diff(remote_sha, local_sha, extensions, max_lines)
@@ -1,26 +1,67 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:  # optional: pip install "ai-code-review[fast]"
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# JSON parser for model responses; orjson raises a json.JSONDecodeError subclass,
+# so callers catch the same exception either way.
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _std_json_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+# Request-body serialiser: straight to UTF-8 bytes, sent with ``content=`` so
+# httpx does not serialise and encode the (diff-sized) payload a second time.
+json_dumps = orjson.dumps if orjson is not None else _std_json_dumps
+
+# Headers to send alongside a ``json_dumps`` body.
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Upper bound on tokens the model may generate per request.
+DEFAULT_MAX_OUTPUT_TOKENS = 2048
 
-class Severity(Enum):
+# Retries for rate-limited / 5xx responses before giving up.
+DEFAULT_MAX_RETRIES = 3
+
+
+class Severity(str, Enum):
     CRITICAL = "critical"
     ERROR = "error"
     WARNING = "warning"
     INFO = "info"
 
+    # Members are their own string value: usable directly as summary keys, in
+    # f-strings and in JSON without going through .value.
+    __str__ = str.__str__
+    __format__ = str.__format__
+
     @property
     def blocks(self) -> bool:
         return self in (Severity.CRITICAL, Severity.ERROR)
 
 
-@dataclass(frozen=True)
+_BLOCKING = tuple(s for s in Severity if s.blocks)
+
+# Plain dict lookup for parsing; Severity(value) goes through EnumMeta.__call__.
+_SEVERITY_BY_VALUE = {s.value: s for s in Severity}
+
+
+@dataclass(frozen=True, slots=True)
 class ReviewIssue:
     severity: Severity
     file: str
@@ -28,26 +69,53 @@ class ReviewIssue:
     message: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ReviewResult:
     issues: list[ReviewIssue] = field(default_factory=list)
+    # Set when the model's reply could not be used, so an empty issue list does
+    # not mean a clean review (and the result must not be cached).
+    incomplete: bool = field(default=False, compare=False)
+    # Issue count per severity value, kept in step by add_issue().
+    _counts: dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._counts = dict.fromkeys((s.value for s in Severity), 0)
+        for issue in self.issues:
+            self._counts[issue.severity] += 1
+
+    def add_issue(self, issue: ReviewIssue) -> None:
+        self.issues.append(issue)
+        self._counts[issue.severity] += 1
 
     @property
     def is_blocked(self) -> bool:
-        return any(issue.severity.blocks for issue in self.issues)
+        return any(self._counts[sev] for sev in _BLOCKING)
 
     @property
     def summary(self) -> dict[str, int]:
-        counts = {s.value: 0 for s in Severity}
-        for issue in self.issues:
-            counts[issue.severity.value] += 1
-        return counts
+        return dict(self._counts)
 
 
 class LLMProvider(ABC):
+    # Optional callback receiving response text as it streams in, for providers
+    # that stream (currently Ollama). Called with each chunk, in order.
+    on_token: Callable[[str], None] | None = None
+
+    @property
+    def cache_namespace(self) -> str:
+        """Identifies the provider, endpoint and model, so cached answers are not shared across them."""
+        return f"{type(self).__name__}:{getattr(self, '_base_url', '')}:{getattr(self, '_model', '')}"
+
     @abstractmethod
     def review_code(self, diff: str, prompt: str) -> ReviewResult: ...
 
+    def review_code_batch(self, diffs: list[str], prompt: str) -> list[ReviewResult]:
+        """Review several diffs with one prompt; results are in ``diffs`` order.
+
+        Providers with a bulk API override this; the default reviews each in turn.
+        """
+        return [self.review_code(diff, prompt) for diff in diffs]
+
     @abstractmethod
     def improve_commit_msg(self, message: str, diff: str) -> str: ...
 
@@ -60,26 +128,53 @@ class LLMProvider(ABC):
     @abstractmethod
     def health_check(self) -> tuple[bool, str]: ...
 
+    def prewarm(self) -> None:
+        """Open a pooled connection ahead of the first real request; failures are ignored.
+
+        Uses the cheap health-check endpoint, so the DNS, TCP and TLS setup is
+        already done by the time the review request goes out.
+        """
+        try:
+            self.health_check()
+        except Exception:
+            pass
+
+    # Async variants run the blocking call on a worker thread. The httpx-based
+    # providers share one thread-safe pooled client (and the OpenAI SDK client is
+    # thread-safe too), so calls awaited together overlap on the network.
+    async def areview_code(self, diff: str, prompt: str) -> ReviewResult:
+        return await asyncio.to_thread(self.review_code, diff, prompt)
+
+    async def aimprove_commit_msg(self, message: str, diff: str) -> str:
+        return await asyncio.to_thread(self.improve_commit_msg, message, diff)
+
     def _parse_review(self, content: str) -> ReviewResult:
+        text = content.strip()
+        if text.startswith("```"):
+            # Slice out the fenced body by index; split()/rsplit() would each copy
+            # the rest of the response first.
+            start = text.find("\n") + 1  # 0: the fence line is all there is
+            end = text.rfind("```", start) if start else 0
+            text = text[start:end] if end != -1 else text[start:]
         try:
-            text = content.strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[1]
-                text = text.rsplit("```", 1)[0]
-            items = json.loads(text)
-        except (json.JSONDecodeError, IndexError):
+            items = json_loads(text)
+        except json.JSONDecodeError:
             logger.warning("Failed to parse LLM review response: %s", content[:200])
-            return ReviewResult()
+            return ReviewResult(incomplete=True)
+        if not isinstance(items, list):
+            logger.warning("LLM review response is not a JSON array: %s", content[:200])
+            return ReviewResult(incomplete=True)
 
-        issues = []
+        result = ReviewResult()
+        add_issue = result.add_issue
         for item in items:
             try:
-                issues.append(ReviewIssue(
-                    severity=Severity(item["severity"]),
-                    file=item["file"],
+                add_issue(ReviewIssue(
+                    severity=_SEVERITY_BY_VALUE[item["severity"]],
+                    file=sys.intern(item["file"]),  # Most issues share a few paths
                     line=int(item["line"]),
                     message=item["message"],
                 ))
-            except (KeyError, ValueError) as e:
+            except (KeyError, TypeError, ValueError) as e:
                 logger.warning("Skipping malformed issue: %s (%s)", item, e)
-        return ReviewResult(issues=issues)
+        return result
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import httpx
 
-from .base import LLMProvider, ReviewResult
+from .base import DEFAULT_MAX_OUTPUT_TOKENS, DEFAULT_MAX_RETRIES, JSON_HEADERS, LLMProvider, ReviewResult, json_dumps, json_loads
+from .http import post_with_retries, timeout_http_client
 from ..exceptions import ProviderError
-from ..prompts import REVIEW_RESPONSE_SCHEMA, get_commit_improve_prompt, get_generate_commit_prompt, get_commit_polish_prompt
+from ..prompts import get_commit_improve_prompt, get_generate_commit_prompt, get_commit_polish_prompt, get_review_request
 
 _DEFAULT_TIMEOUT = 120.0
 
@@ -18,13 +19,20 @@ class EnterpriseProvider(LLMProvider):
         auth_type: str = "bearer",
         auth_token: str = "",
         timeout: float = _DEFAULT_TIMEOUT,
+        client: httpx.Client | None = None,
+        max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
     ) -> None:
         self._base_url = base_url.rstrip("/")
-        self._api_path = api_path
+        self._url = f"{self._base_url}{api_path}"
         self._model = model
-        self._headers = self._build_auth_headers(auth_type, auth_token)
-        transport = httpx.HTTPTransport(retries=3)
-        self._client = httpx.Client(timeout=timeout, headers=self._headers, transport=transport)
+        self._timeout = timeout
+        self._max_output_tokens = max_output_tokens
+        self._max_retries = max_retries
+        self._headers = {**self._build_auth_headers(auth_type, auth_token), **JSON_HEADERS}
+        if client is None:
+            client = timeout_http_client(timeout)  # Auth headers go on each request
+        self._client = client
 
     @staticmethod
     def _build_auth_headers(auth_type: str, token: str) -> dict[str, str]:
@@ -37,7 +45,7 @@ class EnterpriseProvider(LLMProvider):
 
     def health_check(self) -> tuple[bool, str]:
         try:
-            resp = self._client.get(f"{self._base_url}/v1/models")
+            resp = self._client.get(f"{self._base_url}/v1/models", headers=self._headers, timeout=self._timeout)
             if resp.status_code == 200:
                 return True, "Connected"
             return False, f"HTTP {resp.status_code}"
@@ -49,8 +57,7 @@ class EnterpriseProvider(LLMProvider):
             return False, str(e)
 
     def review_code(self, diff: str, prompt: str) -> ReviewResult:
-        full_prompt = f"{prompt}\n\n{REVIEW_RESPONSE_SCHEMA}\n\nDiff:\n{diff}"
-        content = self._chat(full_prompt)
+        content = self._chat(get_review_request(prompt, diff))
         return self._parse_review(content)
 
     def improve_commit_msg(self, message: str, diff: str) -> str:
@@ -67,15 +74,20 @@ class EnterpriseProvider(LLMProvider):
 
     def _chat(self, prompt: str) -> str:
         try:
-            resp = self._client.post(
-                f"{self._base_url}{self._api_path}",
-                json={
+            resp = post_with_retries(
+                self._client,
+                self._url,
+                max_retries=self._max_retries,
+                content=json_dumps({
                     "model": self._model,
                     "messages": [{"role": "user", "content": prompt}],
-                },
+                    "max_tokens": self._max_output_tokens,
+                }),
+                headers=self._headers,
+                timeout=self._timeout,
             )
             resp.raise_for_status()
-            return resp.json()["choices"][0]["message"]["content"]
+            return json_loads(resp.content)["choices"][0]["message"]["content"]
         except (httpx.HTTPError, KeyError, ValueError) as e:
             raise ProviderError(f"Enterprise API request failed: {e}") from e
 
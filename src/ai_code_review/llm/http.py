@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import atexit
+import random
+import time
+from contextlib import contextmanager
+from functools import cache, lru_cache
+from importlib.util import find_spec
+from typing import Iterator
+
+import httpx
+
+# Connection pool bounds for the process-wide client.
+_POOL_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=16, keepalive_expiry=60.0)
+
+# HTTP/2 needs the optional h2 package: pip install "ai-code-review[fast]"
+_HTTP2 = find_spec("h2") is not None
+
+# Responses worth retrying: rate limiting and transient server-side failures.
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Upper bound on a server-requested Retry-After wait, in seconds.
+_MAX_RETRY_AFTER = 30.0
+
+
+@cache
+def shared_http_client() -> httpx.Client:
+    """Return the process-wide pooled client used by httpx-based providers.
+
+    Providers built from the same process (e.g. a review followed by a commit
+    message improvement) reuse its keep-alive connections instead of opening
+    a fresh pool each time. Timeouts and auth headers are sent per request.
+    With h2 installed, HTTPS endpoints are spoken to over HTTP/2.
+    """
+    client = pooled_http_client()
+    atexit.register(client.close)
+    return client
+
+
+@lru_cache(maxsize=8)
+def timeout_http_client(timeout: float) -> httpx.Client:
+    """Return a process-wide pooled client whose default timeout is ``timeout``.
+
+    Used by providers constructed without an explicit client, so building the
+    same provider repeatedly (tests, long-lived callers) reuses one pool.
+    """
+    client = pooled_http_client(timeout=timeout)
+    atexit.register(client.close)
+    return client
+
+
+def pooled_http_client(**kwargs) -> httpx.Client:
+    """Build a client with the shared pool limits, keep-alive and retrying transport.
+
+    ``kwargs`` (e.g. ``timeout``, ``headers``) are passed on to ``httpx.Client``.
+    """
+    transport = httpx.HTTPTransport(retries=3, limits=_POOL_LIMITS, http2=_HTTP2)
+    return httpx.Client(transport=transport, **kwargs)
+
+
+def _retry_delay(resp: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retry ``attempt``.
+
+    Honours a numeric ``Retry-After`` header (capped at ``_MAX_RETRY_AFTER``),
+    otherwise backs off by ``uniform(2, 4) * attempt``.
+    """
+    retry_after = resp.headers.get("retry-after")
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), _MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return random.uniform(2, 4) * attempt
+
+
+def post_with_retries(client: httpx.Client, url: str, *, max_retries: int, **kwargs) -> httpx.Response:
+    """POST, retrying rate-limited and 5xx responses up to ``max_retries`` times.
+
+    Waits as the server's ``Retry-After`` asks, else ``uniform(2, 4) * attempt``
+    seconds, between attempts. The last
+    response is returned as-is for the caller to ``raise_for_status()``.
+    Connection failures are already retried by the transport.
+    """
+    attempt = 0
+    while True:
+        resp = client.post(url, **kwargs)
+        if resp.status_code not in _RETRYABLE_STATUS or attempt >= max_retries:
+            return resp
+        attempt += 1
+        time.sleep(_retry_delay(resp, attempt))
+
+
+@contextmanager
+def stream_with_retries(client: httpx.Client, url: str, *, max_retries: int, **kwargs) -> Iterator[httpx.Response]:
+    """Streaming counterpart of :func:`post_with_retries`.
+
+    Retryable responses are closed unread and retried with the same backoff;
+    the final response is yielded open for the caller to read incrementally.
+    """
+    attempt = 0
+    while True:
+        with client.stream("POST", url, **kwargs) as resp:
+            if resp.status_code not in _RETRYABLE_STATUS or attempt >= max_retries:
+                yield resp
+                return
+        attempt += 1
+        time.sleep(_retry_delay(resp, attempt))
+
+
+def iter_byte_lines(resp: httpx.Response) -> Iterator[bytes]:
+    """Yield the non-empty lines of a streamed body as raw bytes, as they arrive.
+
+    Unlike ``iter_lines()`` nothing is decoded to ``str``: JSON parsers take
+    the bytes directly. No ``chunk_size`` is given, which would hold data back
+    until a full chunk had accumulated.
+    """
+    pending = b""
+    for data in resp.iter_bytes():
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
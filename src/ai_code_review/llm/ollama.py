@@ -2,23 +2,53 @@ from __future__ import annotations
 
 import httpx
 
-from .base import LLMProvider, ReviewResult
+from .base import DEFAULT_MAX_OUTPUT_TOKENS, DEFAULT_MAX_RETRIES, JSON_HEADERS, LLMProvider, ReviewResult, Severity, json_dumps, json_loads
+from .http import iter_byte_lines, stream_with_retries, timeout_http_client
 from ..exceptions import ProviderError
-from ..prompts import REVIEW_RESPONSE_SCHEMA, get_commit_improve_prompt, get_generate_commit_prompt, get_commit_polish_prompt
+from ..prompts import get_commit_improve_prompt, get_generate_commit_prompt, get_commit_polish_prompt, get_review_request
 
 _DEFAULT_TIMEOUT = 120.0
 
+# Structured-output schema for review responses. Ollama constrains generation
+# to it, so the reply is a bare JSON array rather than fenced or chatty text.
+# (Plain format="json" would force a top-level object.)
+_REVIEW_FORMAT = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "severity": {"type": "string", "enum": [s.value for s in Severity]},
+            "file": {"type": "string"},
+            "line": {"type": "integer"},
+            "message": {"type": "string"},
+        },
+        "required": ["severity", "file", "line", "message"],
+    },
+}
+
 
 class OllamaProvider(LLMProvider):
-    def __init__(self, base_url: str, model: str, timeout: float = _DEFAULT_TIMEOUT) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        timeout: float = _DEFAULT_TIMEOUT,
+        client: httpx.Client | None = None,
+        max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
         self._base_url = base_url.rstrip("/")
         self._model = model
-        transport = httpx.HTTPTransport(retries=3)
-        self._client = httpx.Client(timeout=timeout, transport=transport)
+        self._timeout = timeout
+        self._max_output_tokens = max_output_tokens
+        self._max_retries = max_retries
+        if client is None:
+            client = timeout_http_client(timeout)
+        self._client = client
 
     def health_check(self) -> tuple[bool, str]:
         try:
-            resp = self._client.get(f"{self._base_url}/api/tags")
+            resp = self._client.get(f"{self._base_url}/api/tags", timeout=self._timeout)
             if resp.status_code == 200:
                 return True, "Connected"
             return False, f"HTTP {resp.status_code}"
@@ -30,8 +60,7 @@ class OllamaProvider(LLMProvider):
             return False, str(e)
 
     def review_code(self, diff: str, prompt: str) -> ReviewResult:
-        full_prompt = f"{prompt}\n\n{REVIEW_RESPONSE_SCHEMA}\n\nDiff:\n{diff}"
-        content = self._chat(full_prompt)
+        content = self._chat(get_review_request(prompt, diff), response_format=_REVIEW_FORMAT)
         return self._parse_review(content)
 
     def improve_commit_msg(self, message: str, diff: str) -> str:
@@ -46,17 +75,38 @@ class OllamaProvider(LLMProvider):
         prompt = get_commit_polish_prompt(summary, description, diff)
         return self._chat(prompt).strip()
 
-    def _chat(self, prompt: str) -> str:
+    def _chat(self, prompt: str, response_format: dict | None = None) -> str:
+        # Streamed as NDJSON: tokens are handed to on_token as they arrive and
+        # reading stops at the "done" chunk instead of waiting on one buffered body.
+        payload = {
+            "model": self._model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+            "options": {"num_predict": self._max_output_tokens},
+        }
+        if response_format is not None:
+            payload["format"] = response_format
+        parts: list[str] = []
         try:
-            resp = self._client.post(
+            with stream_with_retries(
+                self._client,
                 f"{self._base_url}/api/chat",
-                json={
-                    "model": self._model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream": False,
-                },
-            )
-            resp.raise_for_status()
-            return resp.json()["message"]["content"]
-        except (httpx.HTTPError, KeyError, ValueError) as e:
+                max_retries=self._max_retries,
+                content=json_dumps(payload),
+                headers=JSON_HEADERS,
+                timeout=self._timeout,
+            ) as resp:
+                resp.raise_for_status()
+                for line in iter_byte_lines(resp):
+                    chunk = json_loads(line)
+                    if "error" in chunk:
+                        raise ProviderError(f"Ollama API request failed: {chunk['error']}")
+                    token = chunk["message"]["content"]
+                    parts.append(token)
+                    if self.on_token is not None:
+                        self.on_token(token)
+                    if chunk.get("done"):
+                        break
+        except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
             raise ProviderError(f"Ollama API request failed: {e}") from e
+        return "".join(parts)
@@ -1,17 +1,47 @@
 from __future__ import annotations
 
+import json
+import logging
+import time
+
+import httpx
 import openai
 from openai import OpenAI
 
-from .base import LLMProvider, ReviewResult
+from .base import DEFAULT_MAX_OUTPUT_TOKENS, DEFAULT_MAX_RETRIES, LLMProvider, ReviewResult
+from .http import timeout_http_client
 from ..exceptions import ProviderError
-from ..prompts import REVIEW_RESPONSE_SCHEMA, get_commit_improve_prompt, get_generate_commit_prompt, get_commit_polish_prompt
+from ..prompts import (
+    cap_review_diff, get_commit_improve_prompt, get_commit_polish_prompt, get_generate_commit_prompt,
+    get_review_instructions,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds between Batch API status polls.
+_BATCH_POLL_INTERVAL = 30.0
+
+_BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
 
 
 class OpenAIProvider(LLMProvider):
-    def __init__(self, api_key: str, model: str = "gpt-4o", base_url: str | None = None, timeout: float = 120.0) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o",
+        base_url: str | None = None,
+        timeout: float = 120.0,
+        http_client: httpx.Client | None = None,
+        max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
         self._model = model
-        self._client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=3)
+        self._base_url = base_url or ""
+        self._max_output_tokens = max_output_tokens
+        self._client = OpenAI(
+            api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries,
+            http_client=http_client if http_client is not None else timeout_http_client(timeout),
+        )
 
     def health_check(self) -> tuple[bool, str]:
         try:
@@ -21,10 +51,61 @@ class OpenAIProvider(LLMProvider):
             return False, str(e)
 
     def review_code(self, diff: str, prompt: str) -> ReviewResult:
-        full_prompt = f"{prompt}\n\n{REVIEW_RESPONSE_SCHEMA}\n\nDiff:\n{diff}"
-        content = self._chat(full_prompt)
+        # Static instructions go in the system message and only the diff in the
+        # user message, so repeated reviews share a cacheable prompt prefix.
+        content = self._chat(f"Diff:\n{cap_review_diff(diff)}", system=get_review_instructions(prompt))
         return self._parse_review(content)
 
+    def review_code_batch(
+        self, diffs: list[str], prompt: str, poll_interval: float = _BATCH_POLL_INTERVAL,
+    ) -> list[ReviewResult]:
+        """Review ``diffs`` through the Batch API: half price, but may take up to 24h.
+
+        Blocks until the batch finishes. Meant for non-interactive CI runs.
+        """
+        system = {"role": "system", "content": get_review_instructions(prompt)}
+        requests = "\n".join(
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self._model,
+                    "messages": [system, {"role": "user", "content": f"Diff:\n{cap_review_diff(diff)}"}],
+                    "max_tokens": self._max_output_tokens,
+                },
+            })
+            for i, diff in enumerate(diffs)
+        )
+        try:
+            batch_file = self._client.files.create(file=("review.jsonl", requests.encode()), purpose="batch")
+            batch = self._client.batches.create(
+                input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h",
+            )
+            while batch.status not in _BATCH_TERMINAL_STATUSES:
+                time.sleep(poll_interval)
+                batch = self._client.batches.retrieve(batch.id)
+            if batch.status != "completed" or not batch.output_file_id:
+                raise ProviderError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+            output = self._client.files.content(batch.output_file_id).text
+        except openai.APIError as e:
+            raise ProviderError(f"OpenAI API request failed: {e}") from e
+
+        # Output lines are not in input order; custom_id maps them back. Requests
+        # that failed inside the batch leave an empty, incomplete result.
+        results = [ReviewResult(incomplete=True) for _ in diffs]
+        for line in output.splitlines():
+            if not line:
+                continue
+            record = json.loads(line)
+            try:
+                content = record["response"]["body"]["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                logger.warning("Batch request %s failed: %s", record.get("custom_id"), record.get("error"))
+                continue
+            results[int(record["custom_id"])] = self._parse_review(content)
+        return results
+
     def improve_commit_msg(self, message: str, diff: str) -> str:
         prompt = get_commit_improve_prompt(message, diff)
         return self._chat(prompt).strip()
@@ -37,11 +118,15 @@ class OpenAIProvider(LLMProvider):
         prompt = get_commit_polish_prompt(summary, description, diff)
         return self._chat(prompt).strip()
 
-    def _chat(self, prompt: str) -> str:
+    def _chat(self, prompt: str, system: str | None = None) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
         try:
             response = self._client.chat.completions.create(
                 model=self._model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
+                max_tokens=self._max_output_tokens,
             )
             return response.choices[0].message.content
         except openai.APIError as e:
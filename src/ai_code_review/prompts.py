@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 _REVIEW_PROMPT = """\
 You are a senior Android BSP engineer. Review the following git diff and report only serious issues.
 
@@ -47,6 +49,7 @@ When reviewing, follow these steps:
 4. If the context is insufficient to confirm a problem, do not report it"""
 
 
+@lru_cache(maxsize=8)
 def get_review_prompt(custom_rules: str | None = None) -> str:
     if not custom_rules:
         return _REVIEW_PROMPT
@@ -73,8 +76,58 @@ def get_review_prompt_with_context(
     return base
 
 
+# Hard cap on diff characters sent for review. The line limit bounds most
+# diffs, but a few minified or generated lines can still run to megabytes.
+MAX_REVIEW_DIFF_CHARS = 256 * 1024
+
+
+def cap_review_diff(diff: str) -> str:
+    if len(diff) <= MAX_REVIEW_DIFF_CHARS:
+        return diff
+    cut = diff.rfind("\n", 0, MAX_REVIEW_DIFF_CHARS)
+    return diff[:cut if cut > 0 else MAX_REVIEW_DIFF_CHARS] + "\n...[truncated]"
+
+
+@lru_cache(maxsize=8)
+def get_review_instructions(prompt: str) -> str:
+    """The static part of a review request: ``prompt`` plus the response schema."""
+    return f"{prompt}\n\n{REVIEW_RESPONSE_SCHEMA}"
+
+
+def get_review_request(prompt: str, diff: str) -> str:
+    return _review_request_prefix(prompt) + cap_review_diff(diff)
+
+
+@lru_cache(maxsize=8)
+def _review_request_prefix(prompt: str) -> str:
+    # Everything before the diff; identical across calls with the same prompt,
+    # which also keeps it eligible for server-side prompt caching.
+    return f"{get_review_instructions(prompt)}\n\nDiff:\n"
+
+
+def _split_template(template: str, *fields: str) -> tuple[str, ...]:
+    """Split ``template`` at its ``{field}`` placeholders (in order) once, at import.
+
+    Filling the pieces with an f-string skips ``str.format``'s parse of the
+    template on every call.
+    """
+    parts = []
+    rest = template
+    for name in fields:
+        head, sep, rest = rest.partition("{" + name + "}")
+        if not sep:
+            raise ValueError(f"placeholder {{{name}}} not found in template")
+        parts.append(head)
+    parts.append(rest)
+    return tuple(parts)
+
+
+_COMMIT_IMPROVE_PARTS = _split_template(_COMMIT_IMPROVE_PROMPT, "message", "diff")
+
+
 def get_commit_improve_prompt(message: str, diff: str) -> str:
-    return _COMMIT_IMPROVE_PROMPT.format(message=message, diff=diff)
+    head, mid, tail = _COMMIT_IMPROVE_PARTS
+    return f"{head}{message}{mid}{diff}{tail}"
 
 
 _GENERATE_COMMIT_PROMPT = """\
@@ -91,8 +144,12 @@ Diff:
 {diff}"""
 
 
+_GENERATE_COMMIT_PARTS = _split_template(_GENERATE_COMMIT_PROMPT, "diff")
+
+
 def get_generate_commit_prompt(diff: str) -> str:
-    return _GENERATE_COMMIT_PROMPT.format(diff=diff)
+    head, tail = _GENERATE_COMMIT_PARTS
+    return f"{head}{diff}{tail}"
 
 
 _COMMIT_POLISH_PROMPT = """\
@@ -115,5 +172,9 @@ Diff:
 {diff}"""
 
 
+_COMMIT_POLISH_PARTS = _split_template(_COMMIT_POLISH_PROMPT, "summary", "description", "diff")
+
+
 def get_commit_polish_prompt(summary: str, description: str, diff: str) -> str:
-    return _COMMIT_POLISH_PROMPT.format(summary=summary, description=description, diff=diff)
+    head, after_summary, after_description, tail = _COMMIT_POLISH_PARTS
+    return f"{head}{summary}{after_summary}{description}{after_description}{diff}{tail}"
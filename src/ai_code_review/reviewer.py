@@ -1,12 +1,146 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import os
+import pickle
+import queue
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
 from .llm.base import LLMProvider, ReviewResult
 from .prompts import get_review_prompt, get_review_prompt_with_context
 
 
+# Default number of per-file review requests in flight at once.
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Zero-width split point before each file header of a unified git diff.
+_FILE_HEADER = re.compile(r"^(?=diff --git )", re.MULTILINE)
+
+
+def _split_diff_by_file(diff: str) -> list[str]:
+    return [chunk for chunk in _FILE_HEADER.split(diff) if chunk.strip()]
+
+
+def cap_file_diffs(diff: str, max_file_lines: int) -> str:
+    """Cut each file's section of ``diff`` to at most ``max_file_lines`` lines.
+
+    Keeps one huge (often generated) file from using up the whole review
+    budget; a marker line records each cut.
+    """
+    parts = []
+    for chunk in _split_diff_by_file(diff):
+        if chunk.count("\n") > max_file_lines:
+            cut = -1
+            for _ in range(max_file_lines):
+                cut = chunk.find("\n", cut + 1)
+            chunk = chunk[:cut + 1] + "... (file diff truncated for review)\n"
+        parts.append(chunk)
+    return "".join(parts)
+
+
+# Overall seconds to wait for a healthy provider when fallbacks are configured.
+HEALTH_CHECK_DEADLINE = 5.0
+
+# Seconds a cached review or commit-message answer stays valid.
+REVIEW_CACHE_TTL = 7 * 86400
+
+# Seconds between sweeps of expired entries out of the cache directory.
+_PRUNE_INTERVAL = 86400
+
+# Marker file whose mtime records the last sweep.
+_PRUNE_MARKER = ".pruned"
+
+
+class ReviewCache:
+    """On-disk cache of provider answers, keyed by a hash of their inputs.
+
+    Re-staging the same change (amend, rebase, a retried push) then returns
+    the earlier answer without another LLM round trip. Entries are pickles in
+    ``directory``; unreadable or expired ones are treated as misses, expired
+    ones are deleted, and writes sweep out stale entries about once a day.
+    """
+
+    def __init__(self, directory: Path, namespace: str = "", ttl: float = REVIEW_CACHE_TTL) -> None:
+        self._dir = directory
+        self._namespace = namespace
+        self._ttl = ttl
+
+    def key(self, *parts: str) -> str:
+        h = hashlib.blake2b(self._namespace.encode(), digest_size=20)
+        for part in parts:
+            h.update(b"\0")
+            h.update(part.encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> object | None:
+        path = self._dir / key
+        try:
+            if time.time() - path.stat().st_mtime > self._ttl:
+                path.unlink(missing_ok=True)
+                return None
+            with path.open("rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def set(self, key: str, value: object) -> None:
+        """Atomically store ``value``; failures only cost a provider call next time."""
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._dir, prefix=".review.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self._dir / key)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._prune_if_due()
+        except OSError:
+            pass
+
+    def prune(self) -> None:
+        """Delete expired entries and abandoned temp files from the cache directory."""
+        cutoff = time.time() - self._ttl
+        with os.scandir(self._dir) as entries:
+            for entry in entries:
+                if entry.name == _PRUNE_MARKER:
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+
+    def _prune_if_due(self) -> None:
+        marker = self._dir / _PRUNE_MARKER
+        try:
+            if time.time() - marker.stat().st_mtime < _PRUNE_INTERVAL:
+                return
+        except FileNotFoundError:
+            pass
+        marker.touch()
+        self.prune()
+
+
 class Reviewer:
-    def __init__(self, provider: LLMProvider) -> None:
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: ReviewCache | None = None,
+        fallbacks: Sequence[LLMProvider] = (),
+    ) -> None:
         self._provider = provider
+        self._max_concurrency = max_concurrency
+        self._cache = cache
+        self._candidates = [provider, *fallbacks]
 
     def review_diff(
         self,
@@ -14,14 +148,76 @@ class Reviewer:
         custom_rules: str | None = None,
         file_contents: dict[str, str] | None = None,
     ) -> ReviewResult:
+        prompt = self._review_prompt(custom_rules, file_contents)
+        if self._cache is None:
+            return self._provider.review_code(diff, prompt)
+        key = self._cache.key("review", prompt, diff)
+        result = self._cache.get(key)
+        if not isinstance(result, ReviewResult):
+            result = self._provider.review_code(diff, prompt)
+            # An unusable reply must not pass for a clean review on later runs.
+            if not result.incomplete:
+                self._cache.set(key, result)
+        return result
+
+    def cached_review(
+        self,
+        diff: str,
+        custom_rules: str | None = None,
+        file_contents: dict[str, str] | None = None,
+    ) -> ReviewResult | None:
+        """Return the cached answer ``review_diff`` would give, or None if it would call the provider."""
+        if self._cache is None:
+            return None
+        prompt = self._review_prompt(custom_rules, file_contents)
+        result = self._cache.get(self._cache.key("review", prompt, diff))
+        return result if isinstance(result, ReviewResult) else None
+
+    async def areview_diff(
+        self,
+        diff: str,
+        custom_rules: str | None = None,
+        file_contents: dict[str, str] | None = None,
+    ) -> ReviewResult:
+        """Review each file of ``diff`` as its own request, running them concurrently.
+
+        At most ``max_concurrency`` requests are in flight; issues are merged in
+        diff order.
+        """
+        prompt = self._review_prompt(custom_rules, file_contents)
+        sem = asyncio.Semaphore(self._max_concurrency)
+
+        async def review_one(chunk: str) -> ReviewResult:
+            async with sem:
+                return await self._provider.areview_code(chunk, prompt)
+
+        chunks = _split_diff_by_file(diff) or [diff]
+        merged = ReviewResult()
+        for result in await asyncio.gather(*map(review_one, chunks)):
+            merged.incomplete |= result.incomplete
+            for issue in result.issues:
+                merged.add_issue(issue)
+        return merged
+
+    @staticmethod
+    def _review_prompt(custom_rules: str | None, file_contents: dict[str, str] | None) -> str:
         if file_contents:
-            prompt = get_review_prompt_with_context(file_contents, custom_rules)
-        else:
-            prompt = get_review_prompt(custom_rules)
-        return self._provider.review_code(diff, prompt)
+            return get_review_prompt_with_context(file_contents, custom_rules)
+        return get_review_prompt(custom_rules)
+
+    def review_diffs_batch(self, diffs: list[str], custom_rules: str | None = None) -> list[ReviewResult]:
+        """Review many diffs in one provider batch (e.g. OpenAI's Batch API in CI)."""
+        return self._provider.review_code_batch(diffs, self._review_prompt(custom_rules, None))
 
     def improve_commit_message(self, message: str, diff: str) -> str:
-        return self._provider.improve_commit_msg(message, diff)
+        if self._cache is None:
+            return self._provider.improve_commit_msg(message, diff)
+        key = self._cache.key("improve", message, diff)
+        improved = self._cache.get(key)
+        if not isinstance(improved, str):
+            improved = self._provider.improve_commit_msg(message, diff)
+            self._cache.set(key, improved)
+        return improved
 
     def generate_commit_message(self, diff: str) -> str:
         return self._provider.generate_commit_msg(diff)
@@ -29,5 +225,37 @@ class Reviewer:
     def polish_commit_message(self, summary: str, description: str, diff: str) -> str:
         return self._provider.polish_commit_msg(summary, description, diff)
 
-    def check_provider_health(self) -> tuple[bool, str]:
-        return self._provider.health_check()
+    def check_provider_health(self, deadline: float = HEALTH_CHECK_DEADLINE) -> tuple[bool, str]:
+        """Health-check the provider, or all candidates at once when fallbacks are set.
+
+        With fallbacks, the first candidate to report healthy within ``deadline``
+        seconds becomes the provider used for later calls. Probes run on daemon
+        threads so a hung endpoint cannot hold up the process past the deadline.
+        """
+        if len(self._candidates) == 1:
+            return self._provider.health_check()
+
+        results: queue.Queue[tuple[LLMProvider, bool, str]] = queue.Queue()
+
+        def probe(provider: LLMProvider) -> None:
+            try:
+                ok, msg = provider.health_check()
+            except Exception as e:
+                ok, msg = False, str(e)
+            results.put((provider, ok, msg))
+
+        for candidate in self._candidates:
+            threading.Thread(target=probe, args=(candidate,), daemon=True).start()
+
+        end = time.monotonic() + deadline
+        last = (False, f"No provider became healthy within {deadline:g}s")
+        for _ in self._candidates:
+            try:
+                provider, ok, msg = results.get(timeout=max(0.0, end - time.monotonic()))
+            except queue.Empty:
+                return False, f"No provider became healthy within {deadline:g}s"
+            if ok:
+                self._provider = provider
+                return ok, msg
+            last = (ok, msg)
+        return last
@@ -0,0 +1,45 @@
+import pytest
+
+import ai_code_review.cli as cli_module
+
+
+@pytest.fixture(scope="session")
+def _cache_root(tmp_path_factory):
+    return tmp_path_factory.mktemp("cache")
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(_cache_root, monkeypatch):
+    """Keep the CLI's on-disk caches out of the developer's ~/.cache."""
+    monkeypatch.setattr(cli_module, "_RESOLVE_CACHE_FILE", _cache_root / "resolve-cache.json")
+    monkeypatch.setattr(cli_module, "_REVIEW_CACHE_DIR", _cache_root / "reviews")
+
+
+@pytest.fixture
+def no_review_cache(monkeypatch):
+    """Make every provider call reach the (mocked) provider instead of the review cache."""
+    monkeypatch.setenv("AI_REVIEW_NO_CACHE", "1")
+
+
+@pytest.fixture
+def provider_configured(monkeypatch):
+    """Pretend the user config names a provider, so check-commit goes on to the AI step."""
+    monkeypatch.setattr("ai_code_review.cli.Config.fast_provider_configured", lambda *a, **k: True)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--fast", action="store_true", default=False,
+        help="Skip tests marked slow (full CLI invocations) for quick local runs.",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption("--fast"):
+        return
+    keep, deselected = [], []
+    for item in items:
+        (deselected if item.get_closest_marker("slow") else keep).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = keep
@@ -1,107 +1,249 @@
+import io
 import logging
+import sys
+from collections import defaultdict
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 from click.testing import CliRunner
 
+import ai_code_review.cli as cli_module
 from ai_code_review.cli import main
 from ai_code_review.commit_template import CommitType
 from ai_code_review.exceptions import ProviderError, ProviderNotConfiguredError
 from ai_code_review.git import GitError
 from ai_code_review.llm.base import ReviewResult, ReviewIssue, Severity
 
+# Every provider call in these tests must reach the (mocked) provider.
+pytestmark = pytest.mark.usefixtures("no_review_cache")
 
-@pytest.fixture
+
+class StubProvider:
+    """Plain-Python provider stand-in; much cheaper to build than a MagicMock.
+
+    Each keyword names a provider method and supplies its implementation.
+    The positional arguments of every call land in ``calls[name]``.
+    """
+
+    def __init__(self, **methods):
+        self.calls = {name: [] for name in methods}
+        for name, fn in methods.items():
+            setattr(self, name, self._recording(self.calls[name], fn))
+
+    @staticmethod
+    def _recording(calls, fn):
+        def method(*args, **kwargs):
+            calls.append(args)
+            return fn(*args, **kwargs)
+        return method
+
+    def prewarm(self):
+        pass
+
+
+def _raising(exc):
+    def method(*args, **kwargs):
+        raise exc
+    return method
+
+
+@pytest.fixture(scope="module")
 def runner():
+    # CliRunner keeps no state between invoke() calls, so one serves the module.
     return CliRunner()
 
 
+def make_config(values=None, provider="ollama", deprecation=None, data=None):
+    """Cheap Config stand-in: ``get(section, key)`` looks the pair up in ``values``.
+
+    Pass it to a command with ``runner.invoke(..., obj={"config": ...})``;
+    the CLI reads its Config from the root context object.
+    """
+    values = values or {}
+    return SimpleNamespace(
+        get=lambda section, key: values.get((section, key)),
+        resolve_provider=lambda cli_provider=None: cli_provider or provider,
+        resolve_token=lambda name: None,
+        check_deprecated_keys=lambda: deprecation,
+        _data=data if data is not None else {},
+    )
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs(request):
+    """Drop log records outside TestVerboseFlag, the only tests that look at logging."""
+    if request.cls is not None and request.cls.__name__ == "TestVerboseFlag":
+        yield
+        return
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def cli_patches(monkeypatch):
+    """Rebind the CLI's git and provider hooks to read plain attributes.
+
+    Set ``diff``, ``push_diff``, ``file_contents`` or ``provider`` to the value
+    the hook should return, or to an exception instance for it to raise; left
+    as None, the real function runs. The arguments of each call are recorded
+    in ``calls[name]``.
+    """
+    patches = SimpleNamespace(
+        diff=None, push_diff=None, file_contents=None, provider=None,
+        calls=defaultdict(list),
+    )
+
+    def hook(name, real):
+        def call(*args, **kwargs):
+            patches.calls[name].append((args, kwargs))
+            value = getattr(patches, name)
+            if value is None:
+                return real(*args, **kwargs)
+            if isinstance(value, BaseException):
+                raise value
+            return value
+        return call
+
+    for attr, name in (
+        ("get_staged_diff", "diff"),
+        ("get_push_diff", "push_diff"),
+        ("get_staged_file_contents", "file_contents"),
+        ("_build_provider", "provider"),
+    ):
+        monkeypatch.setattr(cli_module, attr, hook(name, getattr(cli_module, attr)))
+    return patches
+
+
+# The CLI only reads review results, so these can be shared between tests.
+_EMPTY_RESULT = ReviewResult(issues=[])
+_CRITICAL_LEAK = ReviewIssue(severity=Severity.CRITICAL, file="a.c", line=1, message="leak")
+_BLOCKING_RESULT = ReviewResult(issues=[_CRITICAL_LEAK])
+
+
+@pytest.fixture
+def healthy_provider():
+    """A connected provider that finds no issues and returns "x" for commit messages."""
+    return StubProvider(
+        review_code=lambda *a, **k: _EMPTY_RESULT,
+        health_check=lambda: (True, "Connected"),
+        improve_commit_msg=lambda *a, **k: "x",
+        generate_commit_msg=lambda *a, **k: "x",
+    )
+
+
+@pytest.fixture
+def msg_files(monkeypatch):
+    """In-memory commit message files, keyed by path, for the commit hooks."""
+    files = {}
+    monkeypatch.setattr(cli_module, "_read_commit_msg", lambda path: files[str(path)].strip())
+    monkeypatch.setattr(cli_module, "_write_commit_msg", lambda path, text: files.__setitem__(str(path), text))
+    return files
+
+
 class TestReviewCommand:
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_review_staged_diff(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = "some diff"
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_provider.health_check.return_value = (True, "Connected")
-        mock_build.return_value = mock_provider
+    pytestmark = pytest.mark.slow
+
+    @pytest.mark.parametrize("review, expected_exit", [(_EMPTY_RESULT, 0), (_BLOCKING_RESULT, 1)])
+    def test_exit_code_follows_review(self, runner, cli_patches, review, expected_exit):
+        cli_patches.diff = "some diff"
+        cli_patches.provider = StubProvider(
+            review_code=lambda *a, **k: review,
+            health_check=lambda *a, **k: (True, "Connected"),
+        )
 
         result = runner.invoke(main, [])
-        assert result.exit_code == 0
+        assert result.exit_code == expected_exit
 
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_exits_1_when_blocked(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = "some diff"
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[
-            ReviewIssue(severity=Severity.CRITICAL, file="a.c", line=1, message="leak"),
-        ])
-        mock_provider.health_check.return_value = (True, "Connected")
-        mock_build.return_value = mock_provider
+    def test_prewarms_provider_before_review(self, runner, cli_patches, monkeypatch, healthy_provider):
+        prewarmed = []
+        monkeypatch.setattr(cli_module, "_prewarm", prewarmed.append)
+        cli_patches.diff = "some diff"
+        cli_patches.provider = healthy_provider
 
         result = runner.invoke(main, [])
-        assert result.exit_code == 1
-
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_no_diff_exits_clean(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = ""
+        assert result.exit_code == 0
+        assert prewarmed == [healthy_provider]
+
+    def test_cache_hit_skips_prewarm_and_provider(self, runner, cli_patches, monkeypatch):
+        monkeypatch.delenv("AI_REVIEW_NO_CACHE")
+        prewarmed = []
+        monkeypatch.setattr(cli_module, "_prewarm", prewarmed.append)
+        provider = StubProvider(review_code=lambda *a, **k: _BLOCKING_RESULT)
+        provider.cache_namespace = "stub:hit"
+        cli_patches.diff = "some diff"
+        cli_patches.file_contents = {}
+        cli_patches.provider = provider
+
+        assert runner.invoke(main, []).exit_code == 1
+        assert runner.invoke(main, []).exit_code == 1
+        assert len(provider.calls["review_code"]) == 1
+        assert prewarmed == []
+
+    def test_no_cache_flag_always_asks_provider(self, runner, cli_patches, monkeypatch):
+        monkeypatch.delenv("AI_REVIEW_NO_CACHE")
+        provider = StubProvider(review_code=lambda *a, **k: _EMPTY_RESULT)
+        provider.cache_namespace = "stub:no-cache"
+        cli_patches.diff = "some diff"
+        cli_patches.file_contents = {}
+        cli_patches.provider = provider
+
+        assert runner.invoke(main, ["--no-cache"]).exit_code == 0
+        assert runner.invoke(main, ["--no-cache"]).exit_code == 0
+        assert len(provider.calls["review_code"]) == 2
+
+    def test_no_diff_exits_clean(self, runner, cli_patches):
+        cli_patches.diff = ""
         result = runner.invoke(main, [])
         assert result.exit_code == 0
         assert "no" in result.output.lower() and ("change" in result.output.lower() or "staged" in result.output.lower())
 
 
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_git_error_with_brackets_does_not_crash(self, mock_diff, runner):
-        mock_diff.side_effect = GitError("fatal: bad object [/<m>]")
+    def test_git_error_with_brackets_does_not_crash(self, runner, cli_patches):
+        cli_patches.diff = GitError("fatal: bad object [/<m>]")
         result = runner.invoke(main, [])
         assert result.exit_code == 1
         assert "fatal: bad object" in result.output
 
-    @patch("ai_code_review.cli.Config")
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_file_contents")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_passes_custom_rules_from_config(self, mock_diff, mock_file_contents, mock_build, mock_config_cls, runner):
-        mock_diff.return_value = "some diff"
-        mock_file_contents.return_value = {}
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.side_effect = lambda s, k: {
+    def test_passes_custom_rules_from_config(self, runner, cli_patches, healthy_provider):
+        cli_patches.diff = "some diff"
+        cli_patches.file_contents = {}
+        config = make_config({
             ("review", "include_extensions"): "c,cpp",
             ("review", "custom_rules"): "check integer overflow",
-        }.get((s, k))
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_build.return_value = mock_provider
+        })
+        cli_patches.provider = healthy_provider
 
-        result = runner.invoke(main, [])
+        result = runner.invoke(main, [], obj={"config": config})
         assert result.exit_code == 0
-        prompt_arg = mock_provider.review_code.call_args[0][1]
+        prompt_arg = healthy_provider.calls["review_code"][-1][1]
         assert "integer overflow" in prompt_arg
 
-    @patch("ai_code_review.cli.Config")
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_file_contents")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_no_custom_rules_uses_default_prompt(self, mock_diff, mock_file_contents, mock_build, mock_config_cls, runner):
-        mock_diff.return_value = "some diff"
-        mock_file_contents.return_value = {}
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_build.return_value = mock_provider
+    def test_caps_each_file_diff_when_configured(self, runner, cli_patches, healthy_provider):
+        big = "diff --git a/gen.c b/gen.c\n" + "".join(f"+int g{i};\n" for i in range(50))
+        small = "diff --git a/a.c b/a.c\n+int a;\n"
+        cli_patches.diff = big + small
+        cli_patches.file_contents = {}
+        config = make_config({("review", "max_file_lines"): "5"})
+        cli_patches.provider = healthy_provider
 
-        result = runner.invoke(main, [])
+        result = runner.invoke(main, [], obj={"config": config})
+        assert result.exit_code == 0
+        sent = healthy_provider.calls["review_code"][-1][0]
+        assert "+int g3;" in sent and "+int g10;" not in sent
+        assert "file diff truncated for review" in sent
+        assert sent.endswith("diff --git a/a.c b/a.c\n+int a;\n")
+
+    def test_no_custom_rules_uses_default_prompt(self, runner, cli_patches, healthy_provider):
+        cli_patches.diff = "some diff"
+        cli_patches.file_contents = {}
+        config = make_config()
+        cli_patches.provider = healthy_provider
+
+        result = runner.invoke(main, [], obj={"config": config})
         assert result.exit_code == 0
-        prompt_arg = mock_provider.review_code.call_args[0][1]
+        prompt_arg = healthy_provider.calls["review_code"][-1][1]
         assert "Additional rules" not in prompt_arg
 
 
@@ -116,160 +258,298 @@ class TestCheckCommitCommand:
 
 
 class TestConfigCommand:
-    @patch("ai_code_review.cli.Config")
-    def test_config_set(self, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config_cls.return_value = mock_config
-        result = runner.invoke(main, ["config", "set", "provider", "default", "ollama"])
+    def test_config_set(self, runner):
+        config = MagicMock()
+        result = runner.invoke(main, ["config", "set", "provider", "default", "ollama"], obj={"config": config})
         assert result.exit_code == 0
-        mock_config.set.assert_called_once_with("provider", "default", "ollama")
+        config.set.assert_called_once_with("provider", "default", "ollama")
+
+    def test_config_get_prints_brackets_verbatim(self, runner):
+        config = make_config({("commit", "default_category"): "[bold]BSP[/]"})
+        result = runner.invoke(main, ["config", "get", "commit", "default_category"], obj={"config": config})
+        assert result.exit_code == 0
+        assert "[bold]BSP[/]" in result.output
+
+
+# Diffs of 3000 and 100 lines, either side of the max_diff_lines limit;
+# only the line count matters, not the content.
+_LARGE_DIFF = ("x\n" * 3000)[:-1]
+_SMALL_DIFF = ("x\n" * 100)[:-1]
 
 
 class TestDiffTruncation:
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_file_contents")
-    @patch("ai_code_review.cli.get_staged_diff")
-    @patch("ai_code_review.cli.Config")
-    def test_truncates_large_diff(self, mock_config_cls, mock_diff, mock_file_contents, mock_build, runner):
-        # Create a diff with 3000 lines
-        large_diff = "\n".join(f"line {i}" for i in range(3000))
-        mock_diff.return_value = large_diff
-        mock_file_contents.return_value = {}
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.side_effect = lambda s, k: {
+    def test_truncates_large_diff(self, runner, cli_patches, healthy_provider):
+        cli_patches.diff = _LARGE_DIFF
+        cli_patches.file_contents = {}
+        config = make_config({
             ("review", "include_extensions"): None,
             ("review", "custom_rules"): None,
             ("review", "max_diff_lines"): "2000",
-        }.get((s, k))
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_build.return_value = mock_provider
+        })
+        cli_patches.provider = healthy_provider
 
-        result = runner.invoke(main, [])
+        result = runner.invoke(main, [], obj={"config": config})
         # Verify the diff passed to provider is truncated
-        diff_arg = mock_provider.review_code.call_args[0][0]
+        diff_arg = healthy_provider.calls["review_code"][-1][0]
         assert "truncated" in diff_arg.lower()
         assert "Warning" in result.output or "truncated" in result.output.lower()
 
+    def test_small_diff_not_truncated(self, runner, cli_patches, healthy_provider):
+        cli_patches.diff = _SMALL_DIFF
+        cli_patches.file_contents = {}
+        config = make_config()
+        cli_patches.provider = healthy_provider
+
+        result = runner.invoke(main, [], obj={"config": config})
+        diff_arg = healthy_provider.calls["review_code"][-1][0]
+        assert "truncated" not in diff_arg.lower()
+
+
+class TestTruncateLines:
+    def test_keeps_first_lines(self):
+        from ai_code_review.cli import _truncate_lines
+        text = "\n".join(f"line {i}" for i in range(10))
+        assert _truncate_lines(text, 3) == ("line 0\nline 1\nline 2", 10, True)
+
+    def test_exact_limit_not_truncated(self):
+        from ai_code_review.cli import _truncate_lines
+        text = "a\nb\nc"
+        assert _truncate_lines(text, 3) == (text, 3, False)
+
+    def test_short_text_not_truncated(self):
+        from ai_code_review.cli import _truncate_lines
+        assert _truncate_lines("a\nb", 100) == ("a\nb", 2, False)
+
+
+class TestGetConfig:
+    def test_outside_click_context_builds_fresh(self):
+        from ai_code_review.cli import _get_config
+        with patch("ai_code_review.cli.Config") as mock_config_cls:
+            _get_config()
+            _get_config()
+        assert mock_config_cls.call_count == 2
+
+    def test_reused_within_one_invocation(self):
+        import click
+        from ai_code_review.cli import _get_config
+        with patch("ai_code_review.cli.Config") as mock_config_cls, \
+             click.Context(main, obj={}):
+            assert _get_config() is _get_config()
+        mock_config_cls.assert_called_once_with()
+
+
+class TestWriteReport:
+    class _Tty(io.StringIO):
+        def isatty(self):
+            return True
+
+    def test_json_is_compact_when_piped(self, monkeypatch):
+        from ai_code_review.cli import _write_report
+        out = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", out)
+        _write_report(_BLOCKING_RESULT, "json")
+        assert out.getvalue().count("\n") == 1
+
+    def test_json_is_indented_on_a_terminal(self, monkeypatch):
+        from ai_code_review.cli import _write_report
+        out = self._Tty()
+        monkeypatch.setattr(sys, "stdout", out)
+        _write_report(_BLOCKING_RESULT, "json")
+        assert '\n  "' in out.getvalue()
+
+
+class TestStagedDiffCache:
+    @pytest.fixture
+    def hook_repo(self, tmp_path, monkeypatch):
+        import subprocess
+        monkeypatch.chdir(tmp_path)
+        subprocess.run(["git", "init"], check=True, capture_output=True)
+        (tmp_path / "a.c").write_text("int x;\n")
+        subprocess.run(["git", "add", "a.c"], check=True, capture_output=True)
+        (tmp_path / ".git" / "hooks" / "commit-msg").write_text("ai-review check-commit \"$1\"\n")
+        monkeypatch.setenv("GIT_INDEX_FILE", str(tmp_path / ".git" / "index"))
+        return tmp_path
+
+    def test_reused_while_index_unchanged(self, hook_repo):
+        from ai_code_review.cli import _load_staged_diff, _save_staged_diff
+        _save_staged_diff("+int x;")
+        assert _load_staged_diff() == "+int x;"
+
+    def test_restage_invalidates(self, hook_repo):
+        import subprocess
+        from ai_code_review.cli import _load_staged_diff, _save_staged_diff
+        _save_staged_diff("+int x;")
+        (hook_repo / "a.c").write_text("int y;\n")
+        subprocess.run(["git", "add", "a.c"], check=True, capture_output=True)
+        assert _load_staged_diff() is None
+
+    def test_filtered_diff_misses_unfiltered_read(self, hook_repo):
+        from ai_code_review.cli import _load_staged_diff, _save_staged_diff
+        _save_staged_diff("+int x;", extensions=["c"])
+        assert _load_staged_diff() is None
+
+    def test_filtered_diff_reused_with_same_filter(self, hook_repo):
+        from ai_code_review.cli import _load_staged_diff, _save_staged_diff
+        _save_staged_diff("+int x;", extensions=["c"])
+        assert _load_staged_diff(["c"]) == "+int x;"
+
+    def test_truncated_diff_misses_full_read(self, hook_repo):
+        from ai_code_review.cli import _load_staged_diff, _save_staged_diff
+        _save_staged_diff("+int x;", max_lines=1)
+        assert _load_staged_diff() is None
+        _save_staged_diff("+int x;", max_lines=1)
+        assert _load_staged_diff(max_lines=1) == "+int x;"
+
+    def test_cache_file_removed_after_read(self, hook_repo):
+        from ai_code_review.cli import _DIFF_CACHE_NAME, _load_staged_diff, _save_staged_diff
+        _save_staged_diff("+int x;")
+        assert _load_staged_diff() == "+int x;"
+        assert not (hook_repo / ".git" / _DIFF_CACHE_NAME).exists()
+        assert _load_staged_diff() is None
+
+    def test_not_saved_without_commit_msg_hook(self, hook_repo):
+        from ai_code_review.cli import _DIFF_CACHE_NAME, _save_staged_diff
+        (hook_repo / ".git" / "hooks" / "commit-msg").unlink()
+        _save_staged_diff("+int x;")
+        assert not (hook_repo / ".git" / _DIFF_CACHE_NAME).exists()
+
+    def test_ignored_outside_commit_hooks(self, hook_repo, monkeypatch):
+        from ai_code_review.cli import _DIFF_CACHE_NAME, _load_staged_diff, _save_staged_diff
+        monkeypatch.delenv("GIT_INDEX_FILE")
+        _save_staged_diff("+int x;")
+        assert not (hook_repo / ".git" / _DIFF_CACHE_NAME).exists()
+        assert _load_staged_diff() is None
+
+
+class TestTrivialDiff:
+    def test_comment_only_diff_is_trivial(self):
+        from ai_code_review.cli import _is_trivial_diff
+        diff = "+++ b/a.c\n@@ -1 +1,2 @@\n int x;\n+// explain x\n-/* old */\n+\n"
+        assert _is_trivial_diff(diff, 10) is True
+
+    def test_code_change_is_not_trivial(self):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff("+++ b/a.c\n+int y = 0;\n", 10) is False
+
+    def test_preprocessor_directive_is_not_trivial(self):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff("+#include <stdio.h>\n", 10) is False
+
+    @pytest.mark.parametrize("code", ["+++i;", "---count;"])
+    def test_increment_in_hunk_is_not_trivial(self, code):
+        from ai_code_review.cli import _is_trivial_diff
+        diff = (
+            "diff --git a/a.c b/a.c\n--- a/a.c\n+++ b/a.c\n"
+            f"@@ -1,2 +1,2 @@\n+// count up\n{code}\n"
+        )
+        assert _is_trivial_diff(diff, 10) is False
+
+    def test_file_headers_are_not_changed_lines(self):
+        from ai_code_review.cli import _is_trivial_diff
+        diff = (
+            "diff --git a/a.c b/a.c\n--- a/a.c\n+++ b/a.c\n@@ -1 +1 @@\n+// a\n"
+            "diff --git a/b.c b/b.c\n--- a/b.c\n+++ b/b.c\n@@ -1 +1 @@\n-// b\n"
+        )
+        assert _is_trivial_diff(diff, 10) is True
+
+    @pytest.mark.parametrize("directive", ["+# define X 1", "+# include <stdio.h>", "-#  endif"])
+    def test_spaced_preprocessor_directive_is_not_trivial(self, directive):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff(f"@@ -1 +1 @@\n{directive}\n", 10) is False
+
+    def test_hash_comment_is_trivial(self):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff("@@ -1 +1 @@\n+# explain the default\n", 10) is True
+
+    @pytest.mark.parametrize("code", ["+/* fix */ do_thing();", "+*/ x = 1;", "-* end */ y--;"])
+    def test_code_after_block_comment_is_not_trivial(self, code):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff(f"@@ -1 +1 @@\n{code}\n", 10) is False
+
+    @pytest.mark.parametrize("comment", ["+/* note */", "+/* starts here", "+ * middle", "+ */"])
+    def test_block_comment_lines_are_trivial(self, comment):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff(f"@@ -1 +1 @@\n{comment}\n", 10) is True
+
+    def test_many_comment_lines_are_not_trivial(self):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff("+// note\n" * 3, 3) is False
+
+    def test_no_changed_lines_is_not_trivial(self):
+        from ai_code_review.cli import _is_trivial_diff
+        assert _is_trivial_diff("diff --git a/x b/x\nold mode 100644\n", 10) is False
+
     @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_file_contents")
     @patch("ai_code_review.cli.get_staged_diff")
-    @patch("ai_code_review.cli.Config")
-    def test_small_diff_not_truncated(self, mock_config_cls, mock_diff, mock_file_contents, mock_build, runner):
-        small_diff = "\n".join(f"line {i}" for i in range(100))
-        mock_diff.return_value = small_diff
-        mock_file_contents.return_value = {}
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_build.return_value = mock_provider
-
+    def test_review_skips_provider(self, mock_diff, mock_build, runner):
+        mock_diff.return_value = "+++ b/a.c\n+// typo fix\n"
         result = runner.invoke(main, [])
-        diff_arg = mock_provider.review_code.call_args[0][0]
-        assert "truncated" not in diff_arg.lower()
+        assert result.exit_code == 0
+        assert "Trivial diff" in result.output
+        mock_build.assert_not_called()
 
 
 class TestHealthCheckCommand:
-    @patch("ai_code_review.cli.Config")
-    @patch("ai_code_review.cli._build_provider")
-    def test_healthy_provider(self, mock_build, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config.get.side_effect = lambda s, k: {
+    def test_healthy_provider(self, runner, cli_patches):
+        config = make_config({
             ("ollama", "model"): "codellama",
-        }.get((s, k))
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.health_check.return_value = (True, "Connected")
-        mock_build.return_value = mock_provider
+        })
+        provider = StubProvider(health_check=lambda *a, **k: (True, "Connected"))
+        cli_patches.provider = provider
 
-        result = runner.invoke(main, ["health-check"])
+        result = runner.invoke(main, ["health-check"], obj={"config": config})
         assert result.exit_code == 0
         assert "ok" in result.output.lower() or "connected" in result.output.lower()
 
-    @patch("ai_code_review.cli.Config")
-    @patch("ai_code_review.cli._build_provider")
-    def test_unhealthy_provider(self, mock_build, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config.get.side_effect = lambda s, k: {
+    def test_unhealthy_provider(self, runner, cli_patches):
+        config = make_config({
             ("ollama", "model"): "codellama",
-        }.get((s, k))
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.health_check.return_value = (False, "Connection refused: http://localhost:11434")
-        mock_build.return_value = mock_provider
+        })
+        provider = StubProvider(health_check=lambda *a, **k: (False, "Connection refused: http://localhost:11434"))
+        cli_patches.provider = provider
 
-        result = runner.invoke(main, ["health-check"])
+        result = runner.invoke(main, ["health-check"], obj={"config": config})
         assert result.exit_code == 1
         assert "failed" in result.output.lower() or "connection refused" in result.output.lower()
 
-    @patch("ai_code_review.cli.Config")
-    def test_no_provider_configured(self, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config_cls.return_value = mock_config
+    def test_no_provider_configured(self, runner, cli_patches):
+        config = make_config()
+        cli_patches.provider = ProviderNotConfiguredError("No provider configured")
 
-        with patch("ai_code_review.cli._build_provider", side_effect=ProviderNotConfiguredError("No provider configured")):
-            result = runner.invoke(main, ["health-check"])
+        result = runner.invoke(main, ["health-check"], obj={"config": config})
         assert result.exit_code == 1
         assert "no provider" in result.output.lower()
 
 
+@pytest.fixture(scope="class")
+def show_config():
+    """One read-only config per class; `config show` never mutates it."""
+    return make_config(data={
+        "provider": {"default": "openai"},
+        "openai": {"api_key_env": "OPENAI_API_KEY", "model": "gpt-4o"},
+    })
+
+
 class TestConfigShowCommand:
-    @patch("ai_code_review.cli.Config")
-    def test_show_all_config(self, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config._data = {
-            "provider": {"default": "openai"},
-            "openai": {"api_key_env": "OPENAI_API_KEY", "model": "gpt-4o"},
-        }
-        mock_config_cls.return_value = mock_config
-
-        result = runner.invoke(main, ["config", "show"])
-        assert result.exit_code == 0
-        assert "[provider]" in result.output
-        assert "default = openai" in result.output
-        assert "[openai]" in result.output
-        assert "model = gpt-4o" in result.output
-
-    @patch("ai_code_review.cli.Config")
-    def test_show_single_section(self, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config._data = {
-            "provider": {"default": "openai"},
-            "openai": {"api_key_env": "OPENAI_API_KEY", "model": "gpt-4o"},
-        }
-        mock_config_cls.return_value = mock_config
-
-        result = runner.invoke(main, ["config", "show", "openai"])
+    @pytest.mark.parametrize("args, shown, hidden", [
+        ([], ["[provider]", "default = openai", "[openai]", "model = gpt-4o"], []),
+        (["openai"], ["[openai]"], ["[provider]"]),
+    ])
+    def test_show_sections(self, runner, show_config, args, shown, hidden):
+        result = runner.invoke(main, ["config", "show", *args], obj={"config": show_config})
         assert result.exit_code == 0
-        assert "[openai]" in result.output
-        assert "[provider]" not in result.output
+        for text in shown:
+            assert text in result.output
+        for text in hidden:
+            assert text not in result.output
 
-    @patch("ai_code_review.cli.Config")
-    def test_show_empty_config(self, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config._data = {}
-        mock_config_cls.return_value = mock_config
-
-        result = runner.invoke(main, ["config", "show"])
+    def test_show_empty_config(self, runner):
+        result = runner.invoke(main, ["config", "show"], obj={"config": make_config()})
         assert result.exit_code == 0
         assert "no configuration" in result.output.lower()
 
-    @patch("ai_code_review.cli.Config")
-    def test_show_unknown_section(self, mock_config_cls, runner):
-        mock_config = MagicMock()
-        mock_config._data = {"provider": {"default": "ollama"}}
-        mock_config_cls.return_value = mock_config
-
-        result = runner.invoke(main, ["config", "show", "nonexistent"])
+    def test_show_unknown_section(self, runner, show_config):
+        result = runner.invoke(main, ["config", "show", "nonexistent"], obj={"config": show_config})
         assert result.exit_code == 0
         assert "not found" in result.output.lower()
 
@@ -277,20 +557,46 @@ class TestConfigShowCommand:
 class TestBuildProvider:
     def test_raises_when_no_provider(self):
         from ai_code_review.cli import _build_provider
-        mock_config = MagicMock()
-        mock_config.resolve_provider.return_value = None
+        config = make_config(provider=None)
         with pytest.raises(ProviderNotConfiguredError):
-            _build_provider(mock_config, None, None)
+            _build_provider(config, None, None)
 
     def test_raises_for_unknown_provider(self):
         from ai_code_review.cli import _build_provider
-        mock_config = MagicMock()
-        mock_config.resolve_provider.return_value = "nonexistent"
+        config = make_config(provider="nonexistent")
         with pytest.raises(ProviderNotConfiguredError):
-            _build_provider(mock_config, None, None)
+            _build_provider(config, None, None)
+
+    def test_passes_configured_bounds(self):
+        from ai_code_review.cli import _build_provider
+        config = make_config({
+            ("ollama", "max_output_tokens"): "512",
+            ("ollama", "max_retries"): "0",
+        })
+        provider = _build_provider(config, None, None)
+        assert provider._max_output_tokens == 512
+        assert provider._max_retries == 0
+
+    def test_defaults_bounds_when_unset(self):
+        from ai_code_review.cli import _build_provider
+        from ai_code_review.llm.base import DEFAULT_MAX_OUTPUT_TOKENS, DEFAULT_MAX_RETRIES
+        config = make_config()
+        provider = _build_provider(config, None, None)
+        assert provider._max_output_tokens == DEFAULT_MAX_OUTPUT_TOKENS
+        assert provider._max_retries == DEFAULT_MAX_RETRIES
 
 
 class TestVerboseFlag:
+    pytestmark = pytest.mark.slow
+
+    @pytest.fixture(autouse=True)
+    def _reset_logger(self):
+        """-v changes the package logger's level; restore it after each test."""
+        logger = logging.getLogger("ai_code_review")
+        prev = logger.level
+        yield
+        logger.setLevel(prev)
+
     @patch("ai_code_review.cli._build_provider")
     @patch("ai_code_review.cli.get_staged_diff")
     def test_verbose_enables_debug_logging(self, mock_diff, mock_build, runner):
@@ -301,115 +607,72 @@ class TestVerboseFlag:
         assert logger.level == logging.DEBUG
 
     def test_no_verbose_keeps_default_logging(self, runner):
-        # Reset logger level before test
         logger = logging.getLogger("ai_code_review")
-        logger.setLevel(logging.WARNING)
         result = runner.invoke(main, [], input="")
         # Without -v, logger should not be DEBUG
         assert logger.level != logging.DEBUG
 
 
 class TestGracefulFlag:
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_graceful_provider_error_exits_0(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = "some diff"
-        mock_build.side_effect = ProviderError("Connection refused")
+    pytestmark = pytest.mark.slow
+
+    @pytest.fixture(autouse=True)
+    def _staged_diff(self, cli_patches):
+        cli_patches.diff = "some diff"
+
+    @pytest.mark.parametrize("raise_site, graceful, expected_exit", [
+        ("build", True, 0),
+        ("build", False, 1),
+        ("review", True, 0),
+        ("review", False, 1),
+    ])
+    def test_provider_error(self, runner, cli_patches, raise_site, graceful, expected_exit):
+        if raise_site == "build":
+            cli_patches.provider = ProviderError("Connection refused")
+        else:
+            cli_patches.provider = StubProvider(review_code=_raising(ProviderError("timeout")))
+        result = runner.invoke(main, ["--graceful"] if graceful else [])
+        assert result.exit_code == expected_exit
+        if graceful:
+            assert "warning" in result.output.lower()
+
+    def test_graceful_still_blocks_on_review_issues(self, runner, cli_patches):
+        cli_patches.provider = StubProvider(review_code=lambda *a, **k: _BLOCKING_RESULT)
         result = runner.invoke(main, ["--graceful"])
-        assert result.exit_code == 0
-        assert "warning" in result.output.lower()
-
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_no_graceful_provider_error_exits_1(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = "some diff"
-        mock_build.side_effect = ProviderError("Connection refused")
-        result = runner.invoke(main, [])
         assert result.exit_code == 1
 
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_graceful_still_blocks_on_review_issues(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = "some diff"
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[
-            ReviewIssue(severity=Severity.CRITICAL, file="a.c", line=1, message="leak"),
-        ])
-        mock_build.return_value = mock_provider
-        result = runner.invoke(main, ["--graceful"])
-        assert result.exit_code == 1
-
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_graceful_review_provider_error_during_review(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = "some diff"
-        mock_provider = MagicMock()
-        mock_provider.review_code.side_effect = ProviderError("timeout")
-        mock_build.return_value = mock_provider
-        result = runner.invoke(main, ["--graceful"])
-        assert result.exit_code == 0
-        assert "warning" in result.output.lower()
 
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_no_graceful_review_provider_error_during_review_exits_1(self, mock_diff, mock_build, runner):
-        mock_diff.return_value = "some diff"
-        mock_provider = MagicMock()
-        mock_provider.review_code.side_effect = ProviderError("timeout")
-        mock_build.return_value = mock_provider
-        result = runner.invoke(main, [])
-        assert result.exit_code == 1
+# One ref update as git feeds it to the pre-push hook; bytes skip the encode step.
+_PREPUSH_STDIN = b"refs/heads/main abc123 refs/heads/main def456\n"
 
 
 class TestPrePushCommand:
-    @patch("ai_code_review.cli.Config")
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_push_diff")
-    def test_reviews_push_diff(self, mock_push_diff, mock_build, mock_config_cls, runner):
-        mock_push_diff.return_value = "some diff"
-        mock_config = MagicMock()
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_build.return_value = mock_provider
-        stdin_data = "refs/heads/main abc123 refs/heads/main def456\n"
-        result = runner.invoke(main, ["pre-push"], input=stdin_data)
+    pytestmark = pytest.mark.slow
+
+    def test_reviews_push_diff(self, runner, cli_patches, healthy_provider):
+        cli_patches.push_diff = "some diff"
+        config = make_config()
+        cli_patches.provider = healthy_provider
+        result = runner.invoke(main, ["pre-push"], obj={"config": config}, input=_PREPUSH_STDIN)
         assert result.exit_code == 0
 
-    @patch("ai_code_review.cli.Config")
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_push_diff")
-    def test_blocks_on_critical_issue(self, mock_push_diff, mock_build, mock_config_cls, runner):
-        mock_push_diff.return_value = "some diff"
-        mock_config = MagicMock()
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[
-            ReviewIssue(severity=Severity.CRITICAL, file="a.c", line=1, message="leak"),
-        ])
-        mock_build.return_value = mock_provider
-        stdin_data = "refs/heads/main abc123 refs/heads/main def456\n"
-        result = runner.invoke(main, ["pre-push"], input=stdin_data)
+    def test_blocks_on_critical_issue(self, runner, cli_patches):
+        cli_patches.push_diff = "some diff"
+        config = make_config()
+        provider = StubProvider(review_code=lambda *a, **k: _BLOCKING_RESULT)
+        cli_patches.provider = provider
+        result = runner.invoke(main, ["pre-push"], obj={"config": config}, input=_PREPUSH_STDIN)
         assert result.exit_code == 1
 
-    @patch("ai_code_review.cli.get_push_diff")
-    def test_empty_diff_exits_clean(self, mock_push_diff, runner):
-        mock_push_diff.return_value = ""
-        stdin_data = "refs/heads/main abc123 refs/heads/main def456\n"
-        result = runner.invoke(main, ["pre-push"], input=stdin_data)
+    def test_empty_diff_exits_clean(self, runner, cli_patches):
+        cli_patches.push_diff = ""
+        result = runner.invoke(main, ["pre-push"], input=_PREPUSH_STDIN)
         assert result.exit_code == 0
 
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_push_diff")
-    def test_graceful_on_provider_error(self, mock_push_diff, mock_build, runner):
-        mock_push_diff.return_value = "some diff"
-        mock_build.side_effect = ProviderError("Connection refused")
-        stdin_data = "refs/heads/main abc123 refs/heads/main def456\n"
-        result = runner.invoke(main, ["--graceful", "pre-push"], input=stdin_data)
+    def test_graceful_on_provider_error(self, runner, cli_patches):
+        cli_patches.push_diff = "some diff"
+        cli_patches.provider = ProviderError("Connection refused")
+        result = runner.invoke(main, ["--graceful", "pre-push"], input=_PREPUSH_STDIN)
         assert result.exit_code == 0
         assert "warning" in result.output.lower()
 
@@ -417,118 +680,100 @@ class TestPrePushCommand:
         result = runner.invoke(main, ["pre-push"], input="")
         assert result.exit_code == 0
 
+    def test_line_budget_shared_across_refs(self, runner, cli_patches, healthy_provider):
+        cli_patches.push_diff = "a\nb\nc"
+        config = make_config({("review", "max_diff_lines"): "2"})
+        cli_patches.provider = healthy_provider
+        stdin_data = (
+            "refs/heads/a abc123 refs/heads/a def456\n"
+            "refs/heads/b abc789 refs/heads/b def000\n"
+        )
+        result = runner.invoke(main, ["pre-push"], obj={"config": config}, input=stdin_data)
+        assert result.exit_code == 0
+        assert cli_patches.calls["push_diff"] == [
+            (("abc123", "def456"), {"extensions": ["c", "cpp", "h", "hpp", "java"], "max_lines": 2}),
+        ]
+        assert "truncated to 2 lines" in result.output
+
 
 class TestGracefulCheckCommit:
     @patch("ai_code_review.cli._build_provider")
     @patch("ai_code_review.cli.get_staged_diff")
-    def test_graceful_check_commit_format_still_blocks(self, mock_diff, mock_build, runner, tmp_path):
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("bad format")
-        result = runner.invoke(main, ["--graceful", "check-commit", str(msg_file)])
+    def test_graceful_check_commit_format_still_blocks(self, mock_diff, mock_build, runner, msg_files):
+        msg_files["COMMIT_EDITMSG"] = "bad format"
+        result = runner.invoke(main, ["--graceful", "check-commit", "COMMIT_EDITMSG"])
         assert result.exit_code == 1
 
+    @pytest.mark.usefixtures("provider_configured")
+    @pytest.mark.parametrize("graceful", [True, False])
     @patch("ai_code_review.cli._build_provider")
     @patch("ai_code_review.cli.get_staged_diff")
-    def test_graceful_check_commit_llm_failure_skips_improvement(self, mock_diff, mock_build, runner, tmp_path):
+    def test_llm_failure_does_not_block(self, mock_diff, mock_build, runner, msg_files, graceful):
+        """An LLM failure in check-commit skips the improvement and never blocks the commit."""
         mock_diff.return_value = "some diff"
-        mock_provider = MagicMock()
-        mock_provider.improve_commit_msg.side_effect = ProviderError("timeout")
-        mock_build.return_value = mock_provider
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("[BSP][CAMERA] fix something")
-        result = runner.invoke(main, ["--graceful", "check-commit", str(msg_file)])
-        assert result.exit_code == 0
-        assert "warning" in result.output.lower()
-
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_no_graceful_check_commit_llm_failure_does_not_block(self, mock_diff, mock_build, runner, tmp_path):
-        """Without --graceful, LLM failure in check-commit still exits 0 (doesn't block commit)."""
-        mock_diff.return_value = "some diff"
-        mock_provider = MagicMock()
-        mock_provider.improve_commit_msg.side_effect = ProviderError("timeout")
-        mock_build.return_value = mock_provider
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("[BSP][CAMERA] fix something")
-        result = runner.invoke(main, ["check-commit", str(msg_file)])
+        mock_build.return_value = StubProvider(improve_commit_msg=_raising(ProviderError("timeout")))
+        msg_files["COMMIT_EDITMSG"] = "[BSP][CAMERA] fix something"
+        args = ["--graceful"] if graceful else []
+        result = runner.invoke(main, [*args, "check-commit", "COMMIT_EDITMSG"])
         assert result.exit_code == 0
+        if graceful:
+            assert "warning" in result.output.lower()
 
 
 class TestGenerateCommitMsgCommand:
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_generates_and_writes_message(self, mock_diff, mock_build, runner, tmp_path):
-        mock_diff.return_value = "+ int x = 0;"
-        mock_provider = MagicMock()
-        mock_provider.generate_commit_msg.return_value = "add integer initialization"
-        mock_build.return_value = mock_provider
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("")
-        result = runner.invoke(main, ["generate-commit-msg", str(msg_file)])
+    def test_generates_and_writes_message(self, runner, msg_files, cli_patches):
+        cli_patches.diff = "+ int x = 0;"
+        provider = StubProvider(generate_commit_msg=lambda *a, **k: "add integer initialization")
+        cli_patches.provider = provider
+        msg_files["COMMIT_EDITMSG"] = ""
+        result = runner.invoke(main, ["generate-commit-msg", "COMMIT_EDITMSG"])
         assert result.exit_code == 0
-        assert "add integer initialization" in msg_file.read_text()
+        assert "add integer initialization" in msg_files["COMMIT_EDITMSG"]
 
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    @patch("ai_code_review.cli.Config")
-    def test_prepends_project_id_from_config(self, mock_config_cls, mock_diff, mock_build, runner, tmp_path):
-        mock_diff.return_value = "+ fix bug;"
-        mock_provider = MagicMock()
-        mock_provider.generate_commit_msg.return_value = "fix null pointer in camera"
-        mock_build.return_value = mock_provider
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.side_effect = lambda s, k: {
+    def test_prepends_project_id_from_config(self, runner, msg_files, cli_patches):
+        cli_patches.diff = "+ fix bug;"
+        provider = StubProvider(generate_commit_msg=lambda *a, **k: "fix null pointer in camera")
+        cli_patches.provider = provider
+        config = make_config({
             ("commit", "default_category"): "BSP",
             ("review", "include_extensions"): None,
-        }.get((s, k))
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("")
-        result = runner.invoke(main, ["generate-commit-msg", str(msg_file)])
+        })
+        msg_files["COMMIT_EDITMSG"] = ""
+        result = runner.invoke(main, ["generate-commit-msg", "COMMIT_EDITMSG"], obj={"config": config})
         assert result.exit_code == 0
-        content = msg_file.read_text()
+        content = msg_files["COMMIT_EDITMSG"]
         assert content.startswith("[BSP][MISC] ")
         assert "fix null pointer in camera" in content
 
-    def test_skips_on_merge_source(self, runner, tmp_path):
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("Merge branch 'feature'")
-        result = runner.invoke(main, ["generate-commit-msg", str(msg_file), "merge"])
+    def test_skips_on_merge_source(self, runner, msg_files):
+        msg_files["COMMIT_EDITMSG"] = "Merge branch 'feature'"
+        result = runner.invoke(main, ["generate-commit-msg", "COMMIT_EDITMSG", "merge"])
         assert result.exit_code == 0
-        assert msg_file.read_text() == "Merge branch 'feature'"
+        assert msg_files["COMMIT_EDITMSG"] == "Merge branch 'feature'"
 
-    def test_skips_on_commit_source(self, runner, tmp_path):
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("[BSP-123] original")
-        result = runner.invoke(main, ["generate-commit-msg", str(msg_file), "commit"])
+    def test_skips_on_commit_source(self, runner, msg_files):
+        msg_files["COMMIT_EDITMSG"] = "[BSP-123] original"
+        result = runner.invoke(main, ["generate-commit-msg", "COMMIT_EDITMSG", "commit"])
         assert result.exit_code == 0
-        assert msg_file.read_text() == "[BSP-123] original"
+        assert msg_files["COMMIT_EDITMSG"] == "[BSP-123] original"
 
-    def test_skips_on_message_source(self, runner, tmp_path):
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("[BSP-123] user message")
-        result = runner.invoke(main, ["generate-commit-msg", str(msg_file), "message"])
+    def test_skips_on_message_source(self, runner, msg_files):
+        msg_files["COMMIT_EDITMSG"] = "[BSP-123] user message"
+        result = runner.invoke(main, ["generate-commit-msg", "COMMIT_EDITMSG", "message"])
         assert result.exit_code == 0
-        assert msg_file.read_text() == "[BSP-123] user message"
+        assert msg_files["COMMIT_EDITMSG"] == "[BSP-123] user message"
 
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_skips_on_empty_diff(self, mock_diff, runner, tmp_path):
-        mock_diff.return_value = ""
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("")
-        result = runner.invoke(main, ["generate-commit-msg", str(msg_file)])
+    def test_skips_on_empty_diff(self, runner, msg_files, cli_patches):
+        cli_patches.diff = ""
+        msg_files["COMMIT_EDITMSG"] = ""
+        result = runner.invoke(main, ["generate-commit-msg", "COMMIT_EDITMSG"])
         assert result.exit_code == 0
 
-    @patch("ai_code_review.cli._build_provider")
-    @patch("ai_code_review.cli.get_staged_diff")
-    def test_graceful_on_provider_error(self, mock_diff, mock_build, runner, tmp_path):
-        mock_diff.return_value = "some diff"
-        mock_build.side_effect = ProviderError("Connection refused")
-        msg_file = tmp_path / "COMMIT_EDITMSG"
-        msg_file.write_text("")
-        result = runner.invoke(main, ["--graceful", "generate-commit-msg", str(msg_file)])
+    def test_graceful_on_provider_error(self, runner, msg_files, cli_patches):
+        cli_patches.diff = "some diff"
+        cli_patches.provider = ProviderError("Connection refused")
+        msg_files["COMMIT_EDITMSG"] = ""
+        result = runner.invoke(main, ["--graceful", "generate-commit-msg", "COMMIT_EDITMSG"])
         assert result.exit_code == 0
         assert "warning" in result.output.lower()
 
@@ -577,89 +822,60 @@ class TestExtractModifiedFiles:
 
 
 class TestHybridContext:
-    @patch("ai_code_review.cli.Config")
     @patch("ai_code_review.cli._build_provider")
     @patch("ai_code_review.cli.get_staged_file_contents")
     @patch("ai_code_review.cli.get_staged_diff")
     def test_review_passes_file_contents_to_reviewer(
-        self, mock_diff, mock_file_contents, mock_build, mock_config_cls, runner
+        self, mock_diff, mock_file_contents, mock_build, runner, healthy_provider
     ):
         mock_diff.return_value = "some diff"
         mock_file_contents.return_value = {"main.c": "int main() {}"}
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_build.return_value = mock_provider
+        config = make_config()
+        mock_build.return_value = healthy_provider
 
-        result = runner.invoke(main, [])
+        result = runner.invoke(main, [], obj={"config": config})
         assert result.exit_code == 0
         mock_file_contents.assert_called_once()
         # Verify file_contents was passed to review_code via the context prompt
-        prompt_arg = mock_provider.review_code.call_args[0][1]
+        prompt_arg = healthy_provider.calls["review_code"][-1][1]
         assert "main.c" in prompt_arg
 
-    @patch("ai_code_review.cli.Config")
     @patch("ai_code_review.cli._build_provider")
     @patch("ai_code_review.cli.get_staged_file_contents")
     @patch("ai_code_review.cli.get_staged_diff")
     def test_review_falls_back_on_git_error(
-        self, mock_diff, mock_file_contents, mock_build, mock_config_cls, runner
+        self, mock_diff, mock_file_contents, mock_build, runner, healthy_provider
     ):
         mock_diff.return_value = "some diff"
         mock_file_contents.side_effect = GitError("git error reading files")
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = "ollama"
-        mock_config_cls.return_value = mock_config
-        mock_provider = MagicMock()
-        mock_provider.review_code.return_value = ReviewResult(issues=[])
-        mock_build.return_value = mock_provider
+        config = make_config()
+        mock_build.return_value = healthy_provider
 
-        result = runner.invoke(main, [])
+        result = runner.invoke(main, [], obj={"config": config})
         assert result.exit_code == 0
         # Still calls review_code — just without file context
 
 
 class TestDeprecationWarningCli:
-    @patch("ai_code_review.cli.Config")
-    def test_shows_deprecation_warning_in_review(self, MockConfig, runner):
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = "Warning: 'commit.project_id' is deprecated"
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = None
-        MockConfig.return_value = mock_config
+    def test_shows_deprecation_warning_in_review(self, runner):
+        config = make_config(deprecation="Warning: 'commit.project_id' is deprecated", provider=None)
 
-        result = runner.invoke(main, [])
+        result = runner.invoke(main, [], obj={"config": config})
         assert "deprecated" in result.output.lower()
 
-    @patch("ai_code_review.cli.Config")
     @patch("ai_code_review.cli.get_staged_diff")
-    def test_shows_deprecation_warning_in_generate_commit_msg(self, mock_diff, MockConfig, runner, tmp_path):
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = "Warning: 'commit.project_id' is deprecated"
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = None
-        MockConfig.return_value = mock_config
+    def test_shows_deprecation_warning_in_generate_commit_msg(self, mock_diff, runner, tmp_path):
+        config = make_config(deprecation="Warning: 'commit.project_id' is deprecated", provider=None)
         mock_diff.return_value = ""
 
         msg_file = tmp_path / "COMMIT_EDITMSG"
         msg_file.write_text("")
 
-        result = runner.invoke(main, ["generate-commit-msg", str(msg_file)])
+        result = runner.invoke(main, ["generate-commit-msg", str(msg_file)], obj={"config": config})
         assert "deprecated" in result.output.lower()
 
-    @patch("ai_code_review.cli.Config")
-    def test_no_deprecation_warning_when_none(self, MockConfig, runner):
-        mock_config = MagicMock()
-        mock_config.check_deprecated_keys.return_value = None
-        mock_config.get.return_value = None
-        mock_config.resolve_provider.return_value = None
-        MockConfig.return_value = mock_config
+    def test_no_deprecation_warning_when_none(self, runner):
+        config = make_config(provider=None)
 
-        result = runner.invoke(main, [])
+        result = runner.invoke(main, [], obj={"config": config})
         assert "deprecated" not in result.output.lower()
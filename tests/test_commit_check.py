@@ -49,3 +49,12 @@ class TestNewCommitMessageFormat:
     def test_valid_multiline_checks_first_line(self):
         result = check_commit_message("[BSP][CAMERA] fix crash\n\nBody text here")
         assert result.valid is True
+
+    def test_invalid_whitespace_only(self):
+        result = check_commit_message(" \n\t\n")
+        assert result.valid is False
+        assert result.error == "Empty commit message."
+
+    def test_valid_with_surrounding_whitespace(self):
+        result = check_commit_message("\n  [BSP][CAMERA] fix crash  \n")
+        assert result.valid is True
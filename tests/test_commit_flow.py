@@ -6,6 +6,8 @@ from click.testing import CliRunner
 
 from ai_code_review.cli import main
 
+# Every provider call in these tests must reach the (mocked) provider.
+pytestmark = pytest.mark.usefixtures("no_review_cache")
 
 @pytest.fixture
 def runner():
@@ -13,6 +15,7 @@ def runner():
 
 
 class TestCommitMsgImprovement:
+    @pytest.mark.usefixtures("provider_configured")
     @patch("ai_code_review.cli._build_provider")
     @patch("ai_code_review.cli.get_staged_diff")
     def test_suggests_improved_message(self, mock_diff, mock_build, runner, tmp_path):
@@ -30,6 +33,7 @@ class TestCommitMsgImprovement:
         assert result.exit_code == 0
         assert "fix camera HAL crash during boot sequence" in result.output
 
+    @pytest.mark.usefixtures("provider_configured")
     @patch("ai_code_review.cli._build_provider")
     @patch("ai_code_review.cli.get_staged_diff")
     def test_skip_keeps_original(self, mock_diff, mock_build, runner, tmp_path):
@@ -53,3 +57,95 @@ class TestCommitMsgImprovement:
 
         result = runner.invoke(main, ["check-commit", str(msg_file)])
         assert result.exit_code == 1
+
+    @patch("ai_code_review.cli._build_provider")
+    def test_rebase_skips_ai_improvement(self, mock_build, runner, tmp_path, monkeypatch):
+        monkeypatch.setenv("GIT_REFLOG_ACTION", "rebase (pick)")
+        msg_file = tmp_path / "COMMIT_EDITMSG"
+        msg_file.write_text("[BSP][CAMERA] original message")
+
+        result = runner.invoke(main, ["check-commit", str(msg_file)])
+        assert result.exit_code == 0
+        mock_build.assert_not_called()
+
+    def test_rebase_still_checks_format(self, runner, tmp_path, monkeypatch):
+        monkeypatch.setenv("GIT_REFLOG_ACTION", "rebase (pick)")
+        msg_file = tmp_path / "COMMIT_EDITMSG"
+        msg_file.write_text("bad message format")
+
+        result = runner.invoke(main, ["check-commit", str(msg_file)])
+        assert result.exit_code == 1
+
+    @pytest.mark.usefixtures("provider_configured")
+    @patch("ai_code_review.cli._build_provider")
+    @patch("ai_code_review.cli.get_staged_diff")
+    def test_verbose_template_ignores_comments_and_diff(self, mock_diff, mock_build, runner, tmp_path):
+        mock_provider = MagicMock()
+        mock_provider.improve_commit_msg.return_value = "[BSP][CAMERA] improved"
+        mock_build.return_value = mock_provider
+        mock_diff.return_value = "some diff"
+
+        msg_file = tmp_path / "COMMIT_EDITMSG"
+        msg_file.write_text(
+            "[BSP][CAMERA] original message\n"
+            "# Please enter the commit message for your changes.\n"
+            "# ------------------------ >8 ------------------------\n"
+            "diff --git a/x.c b/x.c\n"
+            "+int y;\n"
+        )
+
+        result = runner.invoke(main, ["check-commit", str(msg_file)], input="s\n")
+        assert result.exit_code == 0
+        message = mock_provider.improve_commit_msg.call_args[0][0]
+        assert message == "[BSP][CAMERA] original message"
+
+    @pytest.mark.usefixtures("provider_configured")
+    @patch("ai_code_review.cli._build_provider")
+    @patch("ai_code_review.cli.get_staged_diff")
+    def test_honours_core_comment_char(self, mock_diff, mock_build, runner, tmp_path, monkeypatch):
+        monkeypatch.setattr("ai_code_review.cli._comment_char", lambda: ";")
+        mock_provider = MagicMock()
+        mock_provider.improve_commit_msg.return_value = "[BSP][CAMERA] improved"
+        mock_build.return_value = mock_provider
+        mock_diff.return_value = "some diff"
+
+        msg_file = tmp_path / "COMMIT_EDITMSG"
+        msg_file.write_text(
+            "[BSP][CAMERA] original message\n"
+            "#123 is fixed\n"
+            "; Please enter the commit message for your changes.\n"
+            "; ------------------------ >8 ------------------------\n"
+            "+int y;\n"
+        )
+
+        result = runner.invoke(main, ["check-commit", str(msg_file)], input="s\n")
+        assert result.exit_code == 0
+        message = mock_provider.improve_commit_msg.call_args[0][0]
+        assert message == "[BSP][CAMERA] original message\n#123 is fixed"
+
+    @patch("ai_code_review.cli._build_provider")
+    def test_no_provider_in_config_skips_ai(self, mock_build, runner, tmp_path, monkeypatch):
+        monkeypatch.setattr("ai_code_review.cli.Config.fast_provider_configured", lambda *a, **k: False)
+        msg_file = tmp_path / "COMMIT_EDITMSG"
+        msg_file.write_text("[BSP][CAMERA] original message")
+
+        result = runner.invoke(main, ["check-commit", str(msg_file)])
+        assert result.exit_code == 0
+        mock_build.assert_not_called()
+
+    @pytest.mark.usefixtures("provider_configured")
+    @patch("ai_code_review.cli._build_provider")
+    @patch("ai_code_review.cli.get_staged_diff")
+    def test_auto_accept_env_skips_prompt(self, mock_diff, mock_build, runner, tmp_path, monkeypatch):
+        monkeypatch.setattr("ai_code_review.cli._AUTO_ACCEPT_ENV", True)
+        mock_provider = MagicMock()
+        mock_provider.improve_commit_msg.return_value = "[BSP][CAMERA] improved"
+        mock_build.return_value = mock_provider
+        mock_diff.return_value = "some diff"
+
+        msg_file = tmp_path / "COMMIT_EDITMSG"
+        msg_file.write_text("[BSP][CAMERA] original message")
+
+        result = runner.invoke(main, ["check-commit", str(msg_file)])
+        assert result.exit_code == 0
+        assert msg_file.read_text() == "[BSP][CAMERA] improved\n"
@@ -3,7 +3,7 @@ from pathlib import Path
 
 import pytest
 
-from ai_code_review.config import Config
+from ai_code_review.config import _PARSE_CACHE, Config
 
 
 @pytest.fixture
@@ -19,6 +19,12 @@ class TestConfigDefaults:
     def test_get_missing_key_returns_none(self, tmp_config):
         assert tmp_config.get("nonexistent", "key") is None
 
+    def test_get_ignores_top_level_scalars(self, tmp_path):
+        (tmp_path / "config.toml").write_text('stray = "x"\n[provider]\ndefault = "ollama"\n')
+        config = Config(config_dir=tmp_path)
+        assert config.get("stray", "key") is None
+        assert config.get("provider", "default") == "ollama"
+
 
 class TestConfigSetGet:
     def test_set_and_get_value(self, tmp_config):
@@ -35,6 +41,19 @@ class TestConfigSetGet:
         reloaded = Config(config_dir=tmp_path)
         assert reloaded.get("provider", "default") == "openai"
 
+    def test_failed_save_keeps_previous_file(self, tmp_config, tmp_path, monkeypatch):
+        tmp_config.set("provider", "default", "openai")
+        before = (tmp_path / "config.toml").read_bytes()
+
+        def boom(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("ai_code_review.config.tomli_w.dump", boom)
+        with pytest.raises(OSError):
+            tmp_config.set("provider", "default", "ollama")
+        assert (tmp_path / "config.toml").read_bytes() == before
+        assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith(".config.toml")) == []
+
 
 class TestConfigResolveProvider:
     def test_cli_flag_takes_priority(self, tmp_config):
@@ -48,6 +67,17 @@ class TestConfigResolveProvider:
     def test_returns_none_when_no_provider(self, tmp_config):
         assert tmp_config.resolve_provider(cli_provider=None) is None
 
+    def test_fast_provider_check_without_file(self, tmp_path):
+        assert Config.fast_provider_configured(config_dir=tmp_path) is False
+
+    def test_fast_provider_check_without_provider(self, tmp_config, tmp_path):
+        tmp_config.set("commit", "default_category", "BSP")
+        assert Config.fast_provider_configured(config_dir=tmp_path) is False
+
+    def test_fast_provider_check_with_provider(self, tmp_config, tmp_path):
+        tmp_config.set("provider", "default", "ollama")
+        assert Config.fast_provider_configured(config_dir=tmp_path) is True
+
 
 class TestConfigResolveToken:
     def test_reads_token_from_env(self, tmp_config, monkeypatch):
@@ -64,6 +94,15 @@ class TestConfigResolveToken:
         monkeypatch.setenv("CORP_LLM_TOKEN", "bearer-xyz")
         assert tmp_config.resolve_token("enterprise") == "bearer-xyz"
 
+    def test_token_is_cached_until_set(self, tmp_config, monkeypatch):
+        tmp_config.set("openai", "api_key_env", "MY_OPENAI_KEY")
+        monkeypatch.setenv("MY_OPENAI_KEY", "first")
+        assert tmp_config.resolve_token("openai") == "first"
+        monkeypatch.setenv("MY_OPENAI_KEY", "second")
+        assert tmp_config.resolve_token("openai") == "first"
+        tmp_config.set("openai", "api_key_env", "MY_OPENAI_KEY")
+        assert tmp_config.resolve_token("openai") == "second"
+
 
 class TestDeprecationWarning:
     def test_warns_on_old_project_id(self, tmp_path):
@@ -84,3 +123,54 @@ class TestDeprecationWarning:
         config = Config(config_dir=config_dir)
         warning = config.check_deprecated_keys()
         assert warning is None
+
+
+class TestConfigCache:
+    def test_writes_cache_on_first_load(self, tmp_path):
+        (tmp_path / "config.toml").write_text('[provider]\ndefault = "ollama"\n')
+        Config(config_dir=tmp_path)
+        assert (tmp_path / "config.cache").exists()
+
+    def test_loads_from_cache_without_parsing(self, tmp_path, monkeypatch):
+        (tmp_path / "config.toml").write_text('[provider]\ndefault = "ollama"\n')
+        Config(config_dir=tmp_path)
+        monkeypatch.setattr(Config, "_parse", lambda self: pytest.fail("config re-parsed"))
+        assert Config(config_dir=tmp_path).get("provider", "default") == "ollama"
+
+    def test_stale_cache_is_reparsed(self, tmp_path):
+        config_file = tmp_path / "config.toml"
+        config_file.write_text('[provider]\ndefault = "ollama"\n')
+        Config(config_dir=tmp_path)
+        config_file.write_text('[provider]\ndefault = "enterprise"\n')
+        assert Config(config_dir=tmp_path).get("provider", "default") == "enterprise"
+
+    def test_set_refreshes_cache(self, tmp_path):
+        config = Config(config_dir=tmp_path)
+        config.set("provider", "default", "aaa")
+        config.set("provider", "default", "bbb")
+        assert Config(config_dir=tmp_path).get("provider", "default") == "bbb"
+
+    def test_corrupt_cache_falls_back_to_parse(self, tmp_path):
+        (tmp_path / "config.toml").write_text('[provider]\ndefault = "ollama"\n')
+        Config(config_dir=tmp_path)
+        (tmp_path / "config.cache").write_bytes(b"garbage")
+        _PARSE_CACHE.clear()
+        assert Config(config_dir=tmp_path).get("provider", "default") == "ollama"
+
+    def test_second_load_in_process_skips_disk_cache(self, tmp_path, monkeypatch):
+        (tmp_path / "config.toml").write_text('[provider]\ndefault = "ollama"\n')
+        Config(config_dir=tmp_path)
+        monkeypatch.setattr(Config, "_load_cached", lambda self, version: pytest.fail("disk cache read"))
+        assert Config(config_dir=tmp_path).get("provider", "default") == "ollama"
+
+    def test_in_process_cache_is_not_shared_mutably(self, tmp_path):
+        (tmp_path / "config.toml").write_text('[provider]\ndefault = "ollama"\n')
+        first = Config(config_dir=tmp_path)
+        first._data["provider"]["default"] = "changed"
+        assert Config(config_dir=tmp_path).get("provider", "default") == "ollama"
+
+    def test_no_cache_env_skips_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AI_REVIEW_NO_CACHE", "1")
+        (tmp_path / "config.toml").write_text('[provider]\ndefault = "ollama"\n')
+        assert Config(config_dir=tmp_path).get("provider", "default") == "ollama"
+        assert not (tmp_path / "config.cache").exists()
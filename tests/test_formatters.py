@@ -1,8 +1,9 @@
+import io
 import json
 
 import pytest
 
-from ai_code_review.formatters import format_terminal, format_markdown, format_json
+from ai_code_review.formatters import FORMATTERS, WRITERS, format_terminal, format_markdown, format_json
 from ai_code_review.llm.base import ReviewResult, ReviewIssue, Severity
 
 
@@ -34,6 +35,14 @@ class TestTerminalFormatter:
         output = format_terminal(empty_result)
         assert "no issues" in output.lower() or "clean" in output.lower()
 
+    def test_prints_severity_and_message_verbatim(self):
+        result = ReviewResult(issues=[
+            ReviewIssue(severity=Severity.ERROR, file="a.c", line=3, message="index arr[i] out of [bold] range"),
+        ])
+        output = format_terminal(result)
+        assert "[error] a.c:3" in output
+        assert "index arr[i] out of [bold] range" in output
+
 
 class TestMarkdownFormatter:
     def test_contains_table_headers(self, sample_result):
@@ -67,3 +76,41 @@ class TestJsonFormatter:
         data = json.loads(format_json(empty_result))
         assert data["blocked"] is False
         assert len(data["issues"]) == 0
+
+    def test_compact_by_default(self, sample_result):
+        output = format_json(sample_result)
+        assert "\n" not in output
+        assert '"blocked":true' in output
+
+    def test_indent_option(self, sample_result):
+        output = format_json(sample_result, indent=2)
+        assert output.startswith('{\n  "summary"')
+        assert json.loads(output) == json.loads(format_json(sample_result))
+
+    def test_stdlib_fallback_matches(self, sample_result, monkeypatch):
+        import ai_code_review.formatters as formatters
+        fast = format_json(sample_result)
+        monkeypatch.setattr(formatters, "orjson", None)
+        assert format_json(sample_result) == fast
+
+
+class TestFormattersMap:
+    def test_covers_cli_formats(self):
+        assert set(FORMATTERS) == {"terminal", "markdown", "json"}
+        assert FORMATTERS["json"] is format_json
+
+
+class TestWriters:
+    @pytest.mark.parametrize("name", ["terminal", "markdown", "json"])
+    def test_writer_matches_formatter(self, sample_result, name):
+        buf = io.StringIO()
+        WRITERS[name](sample_result, buf)
+        assert buf.getvalue().rstrip("\n") == FORMATTERS[name](sample_result).rstrip("\n")
+
+    @pytest.mark.parametrize("fixture", ["sample_result", "empty_result"])
+    def test_plain_terminal_writer_matches_rich(self, request, fixture):
+        from ai_code_review.formatters import write_terminal_plain
+        result = request.getfixturevalue(fixture)
+        buf = io.StringIO()
+        write_terminal_plain(result, buf)
+        assert buf.getvalue() == format_terminal(result)
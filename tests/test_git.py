@@ -63,6 +63,30 @@ class TestStagedDiff:
         diff = get_staged_diff(extensions=["c", "cpp"])
         assert diff == ""
 
+    def test_max_lines_reads_one_extra_line(self, git_repo):
+        (git_repo / "big.c").write_text("".join(f"int v{i};\n" for i in range(500)))
+        subprocess.run(["git", "add", "big.c"], cwd=git_repo, check=True, capture_output=True)
+        diff = get_staged_diff(max_lines=10)
+        assert len(diff.split("\n")) == 11
+        assert get_staged_diff().startswith(diff)
+
+    def test_max_lines_larger_than_diff_returns_all(self, git_repo):
+        (git_repo / "small.c").write_text("int x;\n")
+        subprocess.run(["git", "add", "small.c"], cwd=git_repo, check=True, capture_output=True)
+        assert get_staged_diff(max_lines=1000) == get_staged_diff()
+
+    @pytest.mark.parametrize("max_lines", [None, 100])
+    def test_non_utf8_content_is_replaced(self, git_repo, max_lines):
+        (git_repo / "latin1.c").write_bytes("/* caf\xe9 */\n".encode("latin-1"))
+        subprocess.run(["git", "add", "latin1.c"], cwd=git_repo, check=True, capture_output=True)
+        diff = get_staged_diff(max_lines=max_lines)
+        assert "caf\ufffd" in diff
+
+    def test_max_lines_raises_when_not_in_repo(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(GitError):
+            get_staged_diff(max_lines=10)
+
 
 class TestUnstagedDiff:
     def test_returns_unstaged_changes(self, git_repo):
@@ -184,6 +208,24 @@ class TestGetPushDiff:
         assert "feat.c" in diff
         assert "int feat = 1" in diff
 
+    def test_new_branch_with_only_local_master(self, git_repo):
+        """Falls back to 'master' when no main ref exists."""
+        for args in (
+            ["branch", "-M", "master"],
+            ["checkout", "-b", "feature"],
+        ):
+            subprocess.run(["git", *args], cwd=git_repo, check=True, capture_output=True)
+        (git_repo / "feat.c").write_text("int feat = 2;\n")
+        subprocess.run(["git", "add", "."], cwd=git_repo, check=True, capture_output=True)
+        subprocess.run(["git", "commit", "-m", "feat"], cwd=git_repo, check=True, capture_output=True)
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=git_repo,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+
+        diff = get_push_diff(sha, "0" * 40)
+        assert "int feat = 2" in diff
+
 
 class TestGitError:
     def test_raises_when_not_in_repo(self, tmp_path, monkeypatch):
@@ -192,6 +234,17 @@ class TestGitError:
             get_staged_diff()
 
 
+class TestGitExecutable:
+    def test_spawns_resolved_git_path(self, git_repo):
+        from ai_code_review.git import _git_executable, _run_git
+        with patch("ai_code_review.git.subprocess.run", wraps=subprocess.run) as mock_run:
+            _run_git("rev-parse", "--git-dir")
+        cmd = mock_run.call_args[0][0]
+        assert cmd[0] == _git_executable()
+        assert cmd[1:] == ["rev-parse", "--git-dir"]
+        assert mock_run.call_args[1]["close_fds"] is False
+
+
 class TestGetStagedFileContents:
     def test_returns_file_contents_for_staged_files(self):
         """Returns dict of filepath -> content for staged files."""
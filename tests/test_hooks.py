@@ -36,6 +36,15 @@ class TestRepoHookInstall:
         assert "ai-review" in hook_path.read_text()
         assert "--auto-accept" in hook_path.read_text()
 
+    def test_overwrites_existing_hook_as_executable(self, runner, git_repo):
+        hook_path = git_repo / ".git" / "hooks" / "pre-commit"
+        hook_path.write_text("#!/bin/sh\nold hook with a much longer body than ours\n" * 50)
+        hook_path.chmod(0o644)
+        result = runner.invoke(main, ["hook", "install", "pre-commit"])
+        assert result.exit_code == 0
+        assert hook_path.stat().st_mode & 0o777 == 0o755
+        assert "old hook" not in hook_path.read_text()
+
 
 class TestRepoHookUninstall:
     def test_removes_hook(self, runner, git_repo):
@@ -93,9 +102,18 @@ class TestGlobalHookUninstall:
         assert not (fake_hooks_dir / "commit-msg").exists()
         mock_run.assert_called_once_with(
             ["git", "config", "--global", "--unset", "core.hooksPath"],
-            check=True, capture_output=True,
+            check=False, capture_output=True,
         )
 
+    def test_uninstall_global_when_hooks_path_not_set(self, runner, tmp_path):
+        with patch("ai_code_review.cli._GLOBAL_HOOKS_DIR", tmp_path / "global-hooks"), \
+             patch("subprocess.run") as mock_run:
+            mock_run.return_value = subprocess.CompletedProcess([], 5)
+            result = runner.invoke(main, ["hook", "uninstall", "--global"])
+
+        assert result.exit_code == 0
+        assert "core.hooksPath was not set" in result.output
+
 
 class TestHookStatus:
     def test_shows_all_three_sections(self, runner, git_repo):
@@ -113,6 +131,30 @@ class TestHookStatus:
         assert "not installed" in result.output.lower() or "not configured" in result.output.lower()
 
 
+class TestScanHooks:
+    def test_reports_ai_review_hooks_only(self, tmp_path):
+        from ai_code_review.cli import _scan_hooks
+        (tmp_path / "pre-commit").write_text("#!/bin/sh\nai-review --graceful")
+        (tmp_path / "commit-msg").write_text("#!/bin/sh\nother-tool")
+        (tmp_path / "post-merge").write_text("#!/bin/sh\nai-review")
+        result = _scan_hooks(tmp_path)
+        assert result == {
+            "pre-commit": True,
+            "prepare-commit-msg": False,
+            "commit-msg": False,
+            "pre-push": False,
+        }
+
+    def test_finds_ai_review_deep_in_large_hook(self, tmp_path):
+        from ai_code_review.cli import _scan_hooks
+        (tmp_path / "pre-commit").write_text("#!/bin/sh\n" + "# hook manager\n" * 1000 + "ai-review --graceful\n")
+        assert _scan_hooks(tmp_path)["pre-commit"]
+
+    def test_missing_dir_means_nothing_installed(self, tmp_path):
+        from ai_code_review.cli import _scan_hooks
+        assert not any(_scan_hooks(tmp_path / "missing").values())
+
+
 class TestHookStatusTemplate:
     def test_shows_template_status_when_configured(self, runner, git_repo, tmp_path):
         fake_template_dir = tmp_path / "template" / "hooks"
@@ -122,19 +164,23 @@ class TestHookStatusTemplate:
 
         with patch("subprocess.run") as mock_run:
             def side_effect(cmd, **kwargs):
-                if "init.templateDir" in cmd:
-                    return subprocess.CompletedProcess(cmd, 0, stdout=str(fake_template_dir.parent) + "\n")
-                if "core.hooksPath" in cmd:
-                    return subprocess.CompletedProcess(cmd, 1, stdout="")
-                if "ai-review.enabled" in cmd:
-                    return subprocess.CompletedProcess(cmd, 1, stdout="")
-                return subprocess.CompletedProcess(cmd, 0, stdout="")
+                if cmd[1:] == ["config", "--global", "--list", "-z"]:
+                    return subprocess.CompletedProcess(
+                        cmd, 0, stdout=f"init.templatedir\n{fake_template_dir.parent}\0user.name\nTest\0".encode(),
+                    )
+                if cmd[1:] == ["config", "--local", "--list", "-z"]:
+                    return subprocess.CompletedProcess(cmd, 0, stdout=b"core.bare\nfalse\0")
+                return subprocess.CompletedProcess(cmd, 0, stdout=b"")
             mock_run.side_effect = side_effect
             result = runner.invoke(main, ["hook", "status"])
 
         assert result.exit_code == 0
         assert "Template hooks" in result.output
         assert "init.templateDir" in result.output
+        assert "pre-commit: installed" in result.output
+        # git config reads are batched: one --list per scope
+        config_calls = [c.args[0] for c in mock_run.call_args_list if c.args[0][1] == "config"]
+        assert len(config_calls) == 2
 
     def test_shows_enabled_status(self, runner, git_repo):
         subprocess.run(
@@ -163,6 +209,71 @@ class TestTemplateHookScripts:
         assert global_scripts["pre-commit"] != template_scripts["pre-commit"]
 
 
+class TestGitDir:
+    def test_rev_parse_runs_once_per_cwd(self, git_repo):
+        from ai_code_review.cli import _git_dir
+        with patch("ai_code_review.cli._run_git", return_value=".git\n") as mock_git:
+            assert _git_dir() == ".git"
+            assert _git_dir() == ".git"
+        mock_git.assert_called_once_with("rev-parse", "--git-dir")
+
+    def test_not_a_repo_is_not_cached(self, tmp_path, monkeypatch):
+        from ai_code_review.cli import _git_dir
+        from ai_code_review.git import GitError
+        monkeypatch.chdir(tmp_path)
+        with pytest.raises(GitError):
+            _git_dir()
+        subprocess.run(["git", "init"], cwd=tmp_path, check=True, capture_output=True)
+        assert _git_dir() == ".git"
+
+
+class TestResolveAiReviewPath:
+    @pytest.fixture(autouse=True)
+    def _isolate(self, tmp_path, monkeypatch):
+        from ai_code_review.cli import _resolve_ai_review_path
+        monkeypatch.setattr("ai_code_review.cli._RESOLVE_CACHE_FILE", tmp_path / "resolve-cache.json")
+        monkeypatch.delenv("AI_REVIEW_NO_CACHE", raising=False)
+        _resolve_ai_review_path.cache_clear()
+        yield
+        _resolve_ai_review_path.cache_clear()
+
+    def _fake_exe(self, tmp_path):
+        exe = tmp_path / "ai-review"
+        exe.write_text("#!/bin/sh\n")
+        exe.chmod(0o755)
+        return str(exe)
+
+    def test_reuses_persisted_path(self, tmp_path):
+        from ai_code_review.cli import _resolve_ai_review_path
+        exe = self._fake_exe(tmp_path)
+        with patch("shutil.which", return_value=exe) as mock_which:
+            assert _resolve_ai_review_path() == exe
+            _resolve_ai_review_path.cache_clear()
+            assert _resolve_ai_review_path() == exe
+        mock_which.assert_called_once()
+
+    def test_path_change_invalidates(self, tmp_path, monkeypatch):
+        from ai_code_review.cli import _resolve_ai_review_path
+        exe = self._fake_exe(tmp_path)
+        with patch("shutil.which", return_value=exe) as mock_which:
+            _resolve_ai_review_path()
+            _resolve_ai_review_path.cache_clear()
+            monkeypatch.setenv("PATH", "/somewhere/else")
+            _resolve_ai_review_path()
+        assert mock_which.call_count == 2
+
+    def test_missing_executable_invalidates(self, tmp_path):
+        from ai_code_review.cli import _resolve_ai_review_path
+        exe = self._fake_exe(tmp_path)
+        with patch("shutil.which", return_value=exe):
+            _resolve_ai_review_path()
+        Path(exe).unlink()
+        _resolve_ai_review_path.cache_clear()
+        with patch("shutil.which", return_value=None), \
+             patch("ai_code_review.cli.sys.executable", str(tmp_path / "bin" / "python")):
+            assert _resolve_ai_review_path() == "ai-review"
+
+
 class TestTemplateHookInstall:
     def test_installs_template_hooks(self, runner, tmp_path):
         fake_template_dir = tmp_path / "template" / "hooks"
@@ -205,7 +316,7 @@ class TestTemplateHookUninstall:
         assert not (fake_template_dir / "commit-msg").exists()
         mock_run.assert_called_once_with(
             ["git", "config", "--global", "--unset", "init.templateDir"],
-            check=True, capture_output=True,
+            check=False, capture_output=True,
         )
 
 
@@ -232,6 +343,11 @@ class TestHookEnableDisable:
         )
         assert config_result.returncode != 0
 
+    def test_disable_when_not_enabled(self, runner, git_repo):
+        result = runner.invoke(main, ["hook", "disable"])
+        assert result.exit_code == 0
+        assert "was not enabled" in result.output
+
     def test_enable_not_in_git_repo(self, runner, tmp_path, monkeypatch):
         monkeypatch.chdir(tmp_path)
         result = runner.invoke(main, ["hook", "enable"])
@@ -1,3 +1,6 @@
+import asyncio
+import json
+
 import pytest
 
 from ai_code_review.llm.base import LLMProvider, ReviewResult, ReviewIssue, Severity
@@ -16,6 +19,11 @@ class TestSeverity:
     def test_info_does_not_block(self):
         assert Severity.INFO.blocks is False
 
+    def test_formats_as_plain_value(self):
+        assert f"{Severity.ERROR}" == "error"
+        assert str(Severity.WARNING) == "warning"
+        assert Severity.CRITICAL == "critical"
+
 
 class TestReviewResult:
     def test_is_blocked_with_critical(self):
@@ -42,8 +50,117 @@ class TestReviewResult:
         ])
         assert result.summary == {"critical": 1, "error": 0, "warning": 2, "info": 0}
 
+    def test_add_issue_updates_summary_and_blocked(self):
+        result = ReviewResult()
+        result.add_issue(ReviewIssue(severity=Severity.WARNING, file="a.c", line=1, message="x"))
+        assert result.is_blocked is False
+        result.add_issue(ReviewIssue(severity=Severity.ERROR, file="a.c", line=2, message="y"))
+        assert result.is_blocked is True
+        assert result.summary == {"critical": 0, "error": 1, "warning": 1, "info": 0}
+        assert len(result.issues) == 2
+
 
 class TestLLMProviderIsAbstract:
     def test_cannot_instantiate(self):
         with pytest.raises(TypeError):
             LLMProvider()
+
+
+class _StubProvider(LLMProvider):
+    def review_code(self, diff, prompt):
+        return ReviewResult(issues=[ReviewIssue(severity=Severity.INFO, file=diff, line=1, message=prompt)])
+
+    def improve_commit_msg(self, message, diff):
+        return message.upper()
+
+    def generate_commit_msg(self, diff):
+        return ""
+
+    def polish_commit_msg(self, summary, description, diff):
+        return ""
+
+    def health_check(self):
+        return True, "ok"
+
+
+class TestAsyncVariants:
+    def test_areview_code_delegates_to_review_code(self):
+        result = asyncio.run(_StubProvider().areview_code("a.c", "p"))
+        assert result.issues[0].file == "a.c"
+        assert result.issues[0].message == "p"
+
+    def test_aimprove_commit_msg_delegates(self):
+        assert asyncio.run(_StubProvider().aimprove_commit_msg("msg", "diff")) == "MSG"
+
+
+class TestPrewarm:
+    def test_swallows_health_check_errors(self, monkeypatch):
+        provider = _StubProvider()
+
+        def boom():
+            raise RuntimeError("offline")
+
+        monkeypatch.setattr(provider, "health_check", boom)
+        provider.prewarm()  # does not raise
+
+
+class TestCacheNamespace:
+    def test_includes_class_and_model(self):
+        provider = _StubProvider()
+        provider._model = "m1"
+        assert provider.cache_namespace == "_StubProvider::m1"
+
+    def test_includes_base_url(self):
+        a, b = _StubProvider(), _StubProvider()
+        a._base_url, b._base_url = "http://gpu1:11434", "http://gpu2:11434"
+        assert a.cache_namespace != b.cache_namespace
+
+
+class TestReviewCodeBatch:
+    def test_default_reviews_each_diff_in_order(self):
+        results = _StubProvider().review_code_batch(["a.c", "b.c"], "p")
+        assert [r.issues[0].file for r in results] == ["a.c", "b.c"]
+
+
+class TestParseReview:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_parses_with_either_backend(self, monkeypatch, use_orjson):
+        from ai_code_review.llm import base
+        if not use_orjson:
+            monkeypatch.setattr(base, "json_loads", json.loads)
+        content = '[{"severity": "error", "file": "a.c", "line": 3, "message": "leak"}]'
+        result = _StubProvider()._parse_review(content)
+        assert result.issues == [ReviewIssue(severity=Severity.ERROR, file="a.c", line=3, message="leak")]
+
+    def test_invalid_json_returns_incomplete_result(self):
+        result = _StubProvider()._parse_review("not json")
+        assert result.issues == []
+        assert result.incomplete is True
+
+    @pytest.mark.parametrize("content", ["42", '"text"', '{"severity": "info"}', "null"])
+    def test_non_array_json_returns_incomplete_result(self, content):
+        result = _StubProvider()._parse_review(content)
+        assert result.issues == []
+        assert result.incomplete is True
+
+    def test_parsed_array_is_complete(self):
+        assert _StubProvider()._parse_review("[]").incomplete is False
+
+    def test_unclosed_fence_is_parsed(self):
+        result = _StubProvider()._parse_review('```json\n[{"severity": "info", "file": "a.c", "line": 1, "message": "m"}]')
+        assert len(result.issues) == 1
+
+    def test_lone_fence_line_returns_empty_result(self):
+        assert _StubProvider()._parse_review("```json").issues == []
+
+    def test_non_string_file_is_skipped(self):
+        content = '[{"severity": "info", "file": 7, "line": 1, "message": "m"}]'
+        assert _StubProvider()._parse_review(content).issues == []
+
+    def test_file_paths_are_interned(self):
+        content = json.dumps([
+            {"severity": "info", "file": "drivers/" + "a.c", "line": n, "message": "m"} for n in (1, 2)
+        ])
+        first, second = _StubProvider()._parse_review(content).issues
+        assert first.file is second.file
+
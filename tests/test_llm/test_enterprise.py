@@ -1,4 +1,5 @@
 import json
+from unittest.mock import patch
 
 import httpx
 import pytest
@@ -65,6 +66,18 @@ class TestEnterpriseReviewCode:
         provider.review_code("diff", "prompt")
         assert route.calls[0].request.headers["Authorization"] == "Bearer test-token"
 
+    @respx.mock
+    def test_sends_json_body(self, provider):
+        route = respx.post("https://llm.internal.company.com/v1/chat/completions").mock(
+            return_value=httpx.Response(200, json={
+                "choices": [{"message": {"content": "[]"}}]
+            })
+        )
+        provider.review_code("+ naïve diff", "prompt")
+        request = route.calls[0].request
+        assert request.headers["Content-Type"] == "application/json"
+        assert "+ naïve diff" in json.loads(request.content)["messages"][0]["content"]
+
 
 class TestEnterpriseImproveCommitMsg:
     @respx.mock
@@ -142,12 +155,16 @@ class TestEnterpriseChatErrorWrapping:
             provider.improve_commit_msg("[BSP-1] msg", "diff")
 
     @respx.mock
-    def test_wraps_http_status_error(self, provider):
-        respx.post("https://llm.internal.company.com/v1/chat/completions").mock(
+    @patch("ai_code_review.llm.http.time.sleep")
+    def test_wraps_http_status_error(self, mock_sleep, provider):
+        route = respx.post("https://llm.internal.company.com/v1/chat/completions").mock(
             return_value=httpx.Response(500)
         )
         with pytest.raises(ProviderError, match="Enterprise API request failed"):
             provider.review_code("diff", "prompt")
+        # 1 attempt + 3 retries with backoff in between
+        assert route.call_count == 4
+        assert mock_sleep.call_count == 3
 
     @respx.mock
     def test_wraps_malformed_response(self, provider):
@@ -182,3 +199,19 @@ class TestEnterpriseTimeout:
             model="model", auth_type="bearer", auth_token="tok", timeout=60,
         )
         assert p._client.timeout.connect == 60.0
+
+
+class TestEnterpriseSharedClient:
+    @respx.mock
+    def test_sends_auth_headers_on_shared_client(self):
+        client = httpx.Client()
+        p = EnterpriseProvider(
+            base_url="https://llm.example.com", api_path="/v1/chat/completions",
+            model="model", auth_type="api-key", auth_token="tok", client=client,
+        )
+        route = respx.post("https://llm.example.com/v1/chat/completions").mock(
+            return_value=httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+        )
+        assert p.generate_commit_msg("diff") == "ok"
+        assert p._client is client
+        assert route.calls[0].request.headers["X-API-Key"] == "tok"
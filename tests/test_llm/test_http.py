@@ -0,0 +1,32 @@
+import httpx
+
+from ai_code_review.llm.http import iter_byte_lines, pooled_http_client, shared_http_client, timeout_http_client
+
+
+class TestSharedHttpClient:
+    def test_returns_same_client(self):
+        assert shared_http_client() is shared_http_client()
+
+    def test_is_httpx_client(self):
+        assert isinstance(shared_http_client(), httpx.Client)
+
+
+class TestTimeoutHttpClient:
+    def test_cached_per_timeout(self):
+        assert timeout_http_client(12.0) is timeout_http_client(12.0)
+        assert timeout_http_client(12.0) is not timeout_http_client(13.0)
+        assert timeout_http_client(12.0).timeout.read == 12.0
+
+
+class TestPooledHttpClient:
+    def test_passes_client_options(self):
+        client = pooled_http_client(timeout=30.0, headers={"X-Test": "1"})
+        assert client.timeout.connect == 30.0
+        assert client.headers["X-Test"] == "1"
+
+
+class TestIterByteLines:
+    def test_reassembles_lines_split_across_chunks(self):
+        resp = httpx.Response(200, content=iter([b'{"a": 1}\n{"b"', b': 2}\n\n', b'{"c": 3}']))
+        assert list(iter_byte_lines(resp)) == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
@@ -1,4 +1,5 @@
 import json
+from unittest.mock import patch
 
 import httpx
 import pytest
@@ -68,6 +69,24 @@ class TestOllamaReviewCode:
         assert len(result.issues) == 0
         assert result.is_blocked is False
 
+    @respx.mock
+    def test_requests_structured_array_output(self, provider):
+        route = respx.post("http://localhost:11434/api/chat").mock(
+            return_value=httpx.Response(200, json={"message": {"content": "[]"}})
+        )
+        provider.review_code("diff content", "review prompt")
+        body = json.loads(route.calls[0].request.content)
+        assert body["format"]["type"] == "array"
+        assert body["format"]["items"]["required"] == ["severity", "file", "line", "message"]
+
+    @respx.mock
+    def test_commit_messages_are_free_text(self, provider):
+        route = respx.post("http://localhost:11434/api/chat").mock(
+            return_value=httpx.Response(200, json={"message": {"content": "fix crash"}})
+        )
+        provider.generate_commit_msg("diff")
+        assert "format" not in json.loads(route.calls[0].request.content)
+
 
 class TestOllamaImproveCommitMsg:
     @respx.mock
@@ -180,12 +199,16 @@ class TestOllamaChatErrorWrapping:
             provider.improve_commit_msg("[BSP-1] msg", "diff")
 
     @respx.mock
-    def test_wraps_http_status_error(self, provider):
-        respx.post("http://localhost:11434/api/chat").mock(
+    @patch("ai_code_review.llm.http.time.sleep")
+    def test_wraps_http_status_error(self, mock_sleep, provider):
+        route = respx.post("http://localhost:11434/api/chat").mock(
             return_value=httpx.Response(500)
         )
         with pytest.raises(ProviderError, match="Ollama API request failed"):
             provider.review_code("diff", "prompt")
+        # 1 attempt + 3 retries with backoff in between
+        assert route.call_count == 4
+        assert mock_sleep.call_count == 3
 
     @respx.mock
     def test_wraps_malformed_response(self, provider):
@@ -256,3 +279,81 @@ class TestOllamaTimeout:
     def test_custom_timeout(self):
         p = OllamaProvider(base_url="http://localhost:11434", model="codellama", timeout=30)
         assert p._client.timeout.connect == 30.0
+
+    def test_instances_share_client_per_timeout(self):
+        a = OllamaProvider(base_url="http://localhost:11434", model="codellama", timeout=45)
+        b = OllamaProvider(base_url="http://other:11434", model="llama3", timeout=45)
+        c = OllamaProvider(base_url="http://localhost:11434", model="codellama", timeout=46)
+        assert a._client is b._client
+        assert a._client is not c._client
+
+
+class TestOllamaBounds:
+    @respx.mock
+    def test_caps_output_tokens(self):
+        route = respx.post("http://localhost:11434/api/chat").mock(
+            return_value=httpx.Response(200, json={"message": {"content": "ok"}})
+        )
+        p = OllamaProvider(base_url="http://localhost:11434", model="codellama", max_output_tokens=256)
+        p.generate_commit_msg("diff")
+        body = json.loads(route.calls[0].request.content)
+        assert body["options"]["num_predict"] == 256
+
+    @respx.mock
+    @patch("ai_code_review.llm.http.time.sleep")
+    def test_retries_rate_limited_then_succeeds(self, mock_sleep):
+        route = respx.post("http://localhost:11434/api/chat").mock(side_effect=[
+            httpx.Response(429),
+            httpx.Response(200, json={"message": {"content": "ok"}}),
+        ])
+        p = OllamaProvider(base_url="http://localhost:11434", model="codellama")
+        assert p.generate_commit_msg("diff") == "ok"
+        assert route.call_count == 2
+        mock_sleep.assert_called_once()
+
+    @respx.mock
+    @patch("ai_code_review.llm.http.time.sleep")
+    def test_honours_retry_after_header(self, mock_sleep):
+        respx.post("http://localhost:11434/api/chat").mock(side_effect=[
+            httpx.Response(503, headers={"Retry-After": "7"}),
+            httpx.Response(200, json={"message": {"content": "ok"}}),
+        ])
+        p = OllamaProvider(base_url="http://localhost:11434", model="codellama")
+        assert p.generate_commit_msg("diff") == "ok"
+        mock_sleep.assert_called_once_with(7.0)
+
+    @respx.mock
+    def test_zero_retries_fails_fast(self):
+        route = respx.post("http://localhost:11434/api/chat").mock(return_value=httpx.Response(503))
+        p = OllamaProvider(base_url="http://localhost:11434", model="codellama", max_retries=0)
+        with pytest.raises(ProviderError):
+            p.generate_commit_msg("diff")
+        assert route.call_count == 1
+
+
+class TestOllamaStreaming:
+    @respx.mock
+    def test_joins_streamed_chunks_and_reports_tokens(self):
+        lines = [
+            {"message": {"content": "Hello"}, "done": False},
+            {"message": {"content": " world"}, "done": False},
+            {"message": {"content": ""}, "done": True},
+        ]
+        route = respx.post("http://localhost:11434/api/chat").mock(
+            return_value=httpx.Response(200, content="\n".join(json.dumps(l) for l in lines) + "\n")
+        )
+        p = OllamaProvider(base_url="http://localhost:11434", model="codellama")
+        seen = []
+        p.on_token = seen.append
+        assert p.generate_commit_msg("diff") == "Hello world"
+        assert seen == ["Hello", " world", ""]
+        assert json.loads(route.calls[0].request.content)["stream"] is True
+
+    @respx.mock
+    def test_error_chunk_raises_provider_error(self, provider):
+        respx.post("http://localhost:11434/api/chat").mock(
+            return_value=httpx.Response(200, content=json.dumps({"error": "model not found"}) + "\n")
+        )
+        with pytest.raises(ProviderError, match="model not found"):
+            provider.generate_commit_msg("diff")
+
@@ -41,6 +41,55 @@ class TestOpenAIReviewCode:
         assert len(result.issues) == 1
         assert result.issues[0].severity == Severity.ERROR
 
+    @patch("ai_code_review.llm.openai.OpenAI")
+    def test_sends_instructions_as_system_and_diff_as_user(self, mock_cls, provider, mock_openai_response):
+        mock_cls.return_value.chat.completions.create.return_value = mock_openai_response("[]")
+        provider._client = mock_cls.return_value
+
+        provider.review_code("+int x;", "prompt")
+        messages = mock_cls.return_value.chat.completions.create.call_args.kwargs["messages"]
+        assert [m["role"] for m in messages] == ["system", "user"]
+        assert messages[0]["content"].startswith("prompt\n\n")
+        assert "+int x;" not in messages[0]["content"]
+        assert messages[1]["content"] == "Diff:\n+int x;"
+
+
+class TestOpenAIReviewCodeBatch:
+    @staticmethod
+    def _output_line(custom_id, content):
+        return json.dumps({
+            "custom_id": custom_id,
+            "response": {"body": {"choices": [{"message": {"content": content}}]}},
+        })
+
+    def test_submits_polls_and_maps_results_by_custom_id(self, provider):
+        client = MagicMock()
+        client.batches.create.return_value = MagicMock(id="b1", status="in_progress")
+        client.batches.retrieve.return_value = MagicMock(id="b1", status="completed", output_file_id="out")
+        issue = json.dumps([{"severity": "error", "file": "b.c", "line": 2, "message": "leak"}])
+        client.files.content.return_value.text = "\n".join([
+            self._output_line("1", issue),
+            self._output_line("0", "[]"),
+        ])
+        provider._client = client
+
+        results = provider.review_code_batch(["+a", "+b"], "prompt", poll_interval=0)
+        assert [len(r.issues) for r in results] == [0, 1]
+        assert results[1].issues[0].severity == Severity.ERROR
+
+        upload = client.files.create.call_args.kwargs
+        assert upload["purpose"] == "batch"
+        lines = [json.loads(l) for l in upload["file"][1].decode().splitlines()]
+        assert [l["custom_id"] for l in lines] == ["0", "1"]
+        assert lines[1]["body"]["messages"][1]["content"] == "Diff:\n+b"
+
+    def test_failed_batch_raises_provider_error(self, provider):
+        client = MagicMock()
+        client.batches.create.return_value = MagicMock(id="b1", status="failed", output_file_id=None)
+        provider._client = client
+        with pytest.raises(ProviderError, match="failed"):
+            provider.review_code_batch(["+a"], "prompt", poll_interval=0)
+
 
 class TestOpenAIImproveCommitMsg:
     @patch("ai_code_review.llm.openai.OpenAI")
@@ -1,4 +1,7 @@
-from ai_code_review.prompts import get_review_prompt, get_commit_improve_prompt, get_generate_commit_prompt, get_review_prompt_with_context, get_commit_polish_prompt
+from ai_code_review.prompts import (
+    MAX_REVIEW_DIFF_CHARS, REVIEW_RESPONSE_SCHEMA, get_review_prompt, get_commit_improve_prompt,
+    get_generate_commit_prompt, get_review_prompt_with_context, get_commit_polish_prompt, get_review_request,
+)
 
 
 class TestReviewPrompt:
@@ -50,6 +53,10 @@ class TestCommitImprovePrompt:
         prompt = get_commit_improve_prompt("[BSP-1] fix bug", "some diff here")
         assert "some diff here" in prompt
 
+    def test_braces_in_inputs_are_kept_verbatim(self):
+        prompt = get_commit_improve_prompt("fix {x}", "+ int f() { return 0; }")
+        assert prompt.endswith("Original: fix {x}\n\nDiff:\n+ int f() { return 0; }")
+
 
 class TestReviewPromptWithContext:
     def test_includes_cot_guidance(self):
@@ -125,3 +132,27 @@ class TestCommitPolishPrompt:
         prompt = get_commit_polish_prompt("fix crash", "desc", "diff")
         assert "SUMMARY:" in prompt
         assert "DESCRIPTION:" in prompt
+
+
+class TestReviewRequest:
+    def test_includes_prompt_schema_and_diff(self):
+        request = get_review_request("PROMPT", "+int x;")
+        assert request.startswith("PROMPT\n\n")
+        assert REVIEW_RESPONSE_SCHEMA in request
+        assert request.endswith("Diff:\n+int x;")
+
+    def test_caps_oversized_diff_at_line_boundary(self):
+        line = "+" + "a" * 99 + "\n"
+        diff = line * (MAX_REVIEW_DIFF_CHARS // len(line) + 10)
+        request = get_review_request("P", diff)
+        body = request.split("Diff:\n", 1)[1]
+        assert body.endswith("\n...[truncated]")
+        assert len(body) <= MAX_REVIEW_DIFF_CHARS + len("\n...[truncated]")
+        assert body.removesuffix("\n...[truncated]").endswith("a" * 99)
+
+    def test_prefix_is_shared_across_diffs(self):
+        prompt = get_review_prompt()
+        first = get_review_request(prompt, "+a")
+        second = get_review_request(prompt, "+b")
+        assert first[:-2] == second[:-2]
+        assert get_review_prompt() is prompt
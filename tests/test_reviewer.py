@@ -1,8 +1,11 @@
-from unittest.mock import MagicMock
+import asyncio
+import os
+import threading
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from ai_code_review.reviewer import Reviewer
+from ai_code_review.reviewer import ReviewCache, Reviewer, cap_file_diffs
 from ai_code_review.llm.base import ReviewResult, ReviewIssue, Severity
 
 
@@ -46,6 +49,38 @@ class TestReviewDiff:
         assert "Additional rules" not in prompt_arg
 
 
+class TestAsyncReviewDiff:
+    def test_awaits_provider_with_same_prompt(self, reviewer, mock_provider):
+        mock_provider.areview_code = AsyncMock(return_value=ReviewResult())
+        result = asyncio.run(reviewer.areview_diff("diff", custom_rules="check overflow"))
+        assert isinstance(result, ReviewResult)
+        diff, prompt = mock_provider.areview_code.call_args[0]
+        assert diff == "diff"
+        assert "check overflow" in prompt
+
+    def test_reviews_each_file_and_merges_in_order(self, mock_provider):
+        async def review(chunk, prompt):
+            name = chunk.split()[2]
+            return ReviewResult(issues=[ReviewIssue(severity=Severity.WARNING, file=name, line=1, message="m")])
+
+        mock_provider.areview_code = AsyncMock(side_effect=review)
+        diff = "diff --git a/a.c b/a.c\n+x\ndiff --git a/b.c b/b.c\n+y\n"
+        result = asyncio.run(Reviewer(provider=mock_provider, max_concurrency=1).areview_diff(diff))
+        assert mock_provider.areview_code.await_count == 2
+        assert [i.file for i in result.issues] == ["a/a.c", "a/b.c"]
+        assert mock_provider.areview_code.call_args_list[1][0][0].startswith("diff --git a/b.c")
+
+
+class TestReviewDiffsBatch:
+    def test_passes_all_diffs_with_one_prompt(self, reviewer, mock_provider):
+        mock_provider.review_code_batch.return_value = [ReviewResult(), ReviewResult()]
+        results = reviewer.review_diffs_batch(["d1", "d2"], custom_rules="check overflow")
+        assert len(results) == 2
+        diffs, prompt = mock_provider.review_code_batch.call_args[0]
+        assert diffs == ["d1", "d2"]
+        assert "check overflow" in prompt
+
+
 class TestImproveCommitMessage:
     def test_calls_provider(self, reviewer, mock_provider):
         reviewer.improve_commit_message("[BSP-1] fix bug", "diff")
@@ -91,6 +126,43 @@ class TestHealthCheck:
         mock_provider.health_check.assert_called_once()
 
 
+class TestHealthCheckWithFallbacks:
+    def test_healthy_fallback_becomes_provider(self, mock_provider):
+        mock_provider.health_check.return_value = (False, "refused")
+        fallback = MagicMock()
+        fallback.health_check.return_value = (True, "Connected")
+        fallback.review_code.return_value = ReviewResult()
+        reviewer = Reviewer(provider=mock_provider, fallbacks=[fallback])
+
+        assert reviewer.check_provider_health() == (True, "Connected")
+        reviewer.review_diff("diff")
+        fallback.review_code.assert_called_once()
+        mock_provider.review_code.assert_not_called()
+
+    def test_reports_last_failure_when_none_healthy(self, mock_provider):
+        mock_provider.health_check.return_value = (False, "refused")
+        fallback = MagicMock()
+        fallback.health_check.side_effect = RuntimeError("boom")
+        reviewer = Reviewer(provider=mock_provider, fallbacks=[fallback])
+
+        ok, msg = reviewer.check_provider_health()
+        assert ok is False
+        assert msg in ("refused", "boom")
+
+    def test_gives_up_at_deadline(self, mock_provider):
+        release = threading.Event()
+        mock_provider.health_check.side_effect = lambda: (release.wait(5), "late")
+        fallback = MagicMock()
+        fallback.health_check.side_effect = lambda: (release.wait(5), "late")
+        reviewer = Reviewer(provider=mock_provider, fallbacks=[fallback])
+        try:
+            ok, msg = reviewer.check_provider_health(deadline=0.05)
+        finally:
+            release.set()
+        assert ok is False
+        assert "within" in msg
+
+
 class TestReviewDiffWithContext:
     def test_passes_file_contents_to_prompt(self):
         provider = MagicMock()
@@ -128,3 +200,71 @@ class TestReviewDiffWithContext:
         assert "driver.c" in prompt
         assert "buffer overflow" in prompt
         assert "follow these steps" in prompt
+
+
+class TestReviewCache:
+    def test_repeat_review_is_served_from_cache(self, mock_provider, tmp_path):
+        reviewer = Reviewer(provider=mock_provider, cache=ReviewCache(tmp_path, namespace="p:m"))
+        first = reviewer.review_diff("diff")
+        second = Reviewer(provider=mock_provider, cache=ReviewCache(tmp_path, namespace="p:m")).review_diff("diff")
+        assert mock_provider.review_code.call_count == 1
+        assert second == first
+
+    def test_different_inputs_or_namespace_miss(self, mock_provider, tmp_path):
+        Reviewer(provider=mock_provider, cache=ReviewCache(tmp_path, namespace="p:m")).review_diff("diff")
+        Reviewer(provider=mock_provider, cache=ReviewCache(tmp_path, namespace="p:m")).review_diff("other")
+        Reviewer(provider=mock_provider, cache=ReviewCache(tmp_path, namespace="p:m2")).review_diff("diff")
+        assert mock_provider.review_code.call_count == 3
+
+    def test_expired_entry_is_a_miss(self, mock_provider, tmp_path):
+        cache = ReviewCache(tmp_path, ttl=-1)
+        reviewer = Reviewer(provider=mock_provider, cache=cache)
+        reviewer.review_diff("diff")
+        reviewer.review_diff("diff")
+        assert mock_provider.review_code.call_count == 2
+
+    def test_expired_entry_is_deleted(self, tmp_path):
+        cache = ReviewCache(tmp_path, ttl=-1)
+        (tmp_path / "k").write_bytes(b"x")
+        assert cache.get("k") is None
+        assert not (tmp_path / "k").exists()
+
+    def test_prune_removes_only_expired_entries(self, tmp_path):
+        cache = ReviewCache(tmp_path, ttl=60)
+        (tmp_path / "old").write_bytes(b"x")
+        (tmp_path / "new").write_bytes(b"x")
+        os.utime(tmp_path / "old", (0, 0))
+        cache.prune()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["new"]
+
+    def test_incomplete_review_is_not_cached(self, mock_provider, tmp_path):
+        mock_provider.review_code.return_value = ReviewResult(incomplete=True)
+        reviewer = Reviewer(provider=mock_provider, cache=ReviewCache(tmp_path))
+        reviewer.review_diff("diff")
+        reviewer.review_diff("diff")
+        assert mock_provider.review_code.call_count == 2
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ReviewCache(tmp_path)
+        key = cache.key("review", "p", "d")
+        (tmp_path / key).write_bytes(b"not a pickle")
+        assert cache.get(key) is None
+
+    def test_improved_commit_message_is_cached(self, mock_provider, tmp_path):
+        reviewer = Reviewer(provider=mock_provider, cache=ReviewCache(tmp_path))
+        assert reviewer.improve_commit_message("msg", "diff") == "[BSP-1] improved message"
+        assert reviewer.improve_commit_message("msg", "diff") == "[BSP-1] improved message"
+        assert mock_provider.improve_commit_msg.call_count == 1
+
+
+class TestCapFileDiffs:
+    def test_cuts_only_oversized_files(self):
+        big = "diff --git a/b.c b/b.c\n+1\n+2\n+3\n+4\n"
+        small = "diff --git a/s.c b/s.c\n+x\n"
+        capped = cap_file_diffs(big + small, 3)
+        assert capped == "diff --git a/b.c b/b.c\n+1\n+2\n... (file diff truncated for review)\n" + small
+
+    def test_leaves_small_diff_unchanged(self):
+        diff = "diff --git a/s.c b/s.c\n+x\n"
+        assert cap_file_diffs(diff, 10) == diff
+